@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Run many simulated or headless B0B games in parallel and print an aggregated report.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the src directory to the Python path BEFORE any other imports
+project_root = Path(__file__).parent
+src_dir = project_root / "src"
+sys.path.insert(0, str(src_dir))
+
+from simulation.batch_runner import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
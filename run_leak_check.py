@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Replay a recording many times into one reset bot and check memory stays flat.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the src directory to the Python path BEFORE any other imports
+project_root = Path(__file__).parent
+src_dir = project_root / "src"
+sys.path.insert(0, str(src_dir))
+
+from bot.bootstrap import bootstrap
+from telemetry.leak_check import main
+
+
+if __name__ == "__main__":
+    bootstrap()
+    sys.exit(main())
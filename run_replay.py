@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Replay a recorded B0B game into the managers offline and report slow steps.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the src directory to the Python path BEFORE any other imports
+project_root = Path(__file__).parent
+src_dir = project_root / "src"
+sys.path.insert(0, str(src_dir))
+
+from bot.bootstrap import bootstrap
+from telemetry.replay_driver import main
+
+
+if __name__ == "__main__":
+    bootstrap()
+    sys.exit(main())
@@ -26,6 +26,7 @@ from sc2.data import Race, Difficulty
 from sc2.player import Bot, Computer
 import bot.main
 print(f"[DEBUG] bot.main module: {bot.main.__file__}")
+from bot.bootstrap import bootstrap
 from bot.main import MyBot
 
 
@@ -35,6 +36,7 @@ def main():
     print(f"[DEBUG] MyBot class: {MyBot}")
     print(f"[DEBUG] MyBot module: {MyBot.__module__}")
     print(f"[DEBUG] MyBot bases: {MyBot.__bases__}")
+    bootstrap()
     print('[DEBUG] Instantiating MyBot...')
     bot_instance = MyBot()
     print('[DEBUG] Running game...')
@@ -0,0 +1,68 @@
+"""Explicit process setup for the bot: import path and logging.
+
+Importing the bot used to create the logs directory, delete bot.log and
+install log handlers as a side effect. Entry points call bootstrap() once
+instead, before creating the bot; importing bot modules does nothing but
+define classes.
+
+Log records are written by a background thread (see bot/log_pipeline.py),
+so logging from a step never waits for the disk or the console.
+
+USAGE:
+```python
+from bot.bootstrap import bootstrap
+logger = bootstrap()
+bot = MyBot()
+```
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+LOGGER_NAME = "B0B"
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def ensure_src_path() -> None:
+    """Put the src directory on sys.path so 'managers', 'config' etc. import as top-level packages."""
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+
+
+def setup_logging(log_dir: str = "logs", clear_log: bool = True, console_level: int = logging.INFO) -> logging.Logger:
+    """Set up the B0B logging pipeline and return the logger.
+    
+    The logger only queues records; a background thread writes them to
+    bot.log (DEBUG) and the console. Calling it again returns the logger
+    without adding more handlers.
+    
+    Args:
+        log_dir: Directory for bot.log and the per-game archives
+        clear_log: Archive the previous bot.log first (else append to it)
+        console_level: Level of the console handler (the file gets DEBUG)
+    """
+    from config.config import config as bot_config
+    from .log_pipeline import LogPipeline
+    
+    logger = logging.getLogger(LOGGER_NAME)
+    if logger.handlers:
+        return logger
+    logger.setLevel(logging.DEBUG)
+    
+    formatter = logging.Formatter(LOG_FORMAT)
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(console_level)
+    console_handler.setFormatter(formatter)
+    pipeline = LogPipeline(logger, log_dir, bot_config.head.log_queue_size, bot_config.head.log_keep_games,
+                           handlers=[console_handler], archive_previous=clear_log)
+    pipeline.file_handler.setFormatter(formatter)
+    pipeline.start()
+    return logger
+
+
+def bootstrap(log_dir: str = "logs", clear_log: bool = True) -> logging.Logger:
+    """Prepare the process to run the bot; call once from an entry point."""
+    ensure_src_path()
+    return setup_logging(log_dir, clear_log)
@@ -1,31 +1,84 @@
 from sc2.bot_ai import BotAI
 from sc2.data import Result, Race
+from sc2.unit_command import UnitCommand
 
-# Add the src directory to the Python path
-import sys
 from pathlib import Path
-current_dir = Path(__file__).parent
-src_dir = current_dir.parent
-sys.path.insert(0, str(src_dir))
 
-# Import all race-specific economy managers
-from managers.terran_economy_manager import TerranEconomyManager  # Terran
-from managers.protoss_economy_manager import ProtossEconomyManager  # Protoss
-from managers.zerg_economy_manager import ZergEconomyManager  # Zerg
-from managers.military_manager import MilitaryManager  # Terran military
-from managers.protoss_military_manager import ProtossMilitaryManager  # Protoss
-from managers.zerg_military_manager import ZergMilitaryManager  # Zerg military
+# Race-specific managers are imported in on_start, for the race being played (see managers/registry.py).
+# 'managers' and 'config' are top-level packages: entry points put src/ on sys.path (see bot/bootstrap.py).
+from managers.registry import load_managers
+from managers.base_tracker import BaseTracker  # Per-base model
 from managers.head_manager import HeadManager
+from config.config import config as bot_config
+
+from .gc_controller import GCController
+from .request_pipeline import RequestPipeline
+from .step_controller import StepController
+from .log_pipeline import rotate_game_log
 
 
 class CompetitiveBot(BotAI):
-    """Main bot class that handles the game logic and coordinates managers."""
+    """Main bot class that handles the game logic and coordinates managers.
+    
+    One instance can play many games in a row (see simulation/batch_runner.py
+    --warm): call reset() between games. Managers, the map cache and the
+    imports stay warm; only per-game state is cleared.
+    """
     
     def __init__(self):
         super().__init__()
         # Initialize the HeadManager first
         self.head = HeadManager(self)
+        self.head.concurrent_managers = bot_config.head.concurrent_managers
+        
+        # Per-base resources, saturation and threat
+        self.bases = BaseTracker(self)
+        
+        # Managers built for each race played, reused by later games (race -> (economy, military, larva))
+        self._manager_pool = {}
+        
+        # Map analyses loaded in this process, kept across games
+        self._map_cache = None
+        
+        # Garbage collection in the idle time between steps
+        self.gc_controller = None
+        if bot_config.head.gc_control:
+            self.gc_controller = GCController(bot_config.head.gc_idle_budget, bot_config.head.gc_full_every)
+        
+        # Game loops per step from the game phase and the measured step time
+        self.step_controller = None
+        if bot_config.head.adaptive_game_step:
+            head_config = bot_config.head
+            self.step_controller = StepController(
+                {'economy': head_config.game_step_economy, 'maneuver': head_config.game_step_maneuver,
+                 'combat': head_config.game_step_combat},
+                max_step=head_config.game_step_max, headroom=head_config.game_step_headroom,
+                calm_time=head_config.game_step_calm_time)
         
+        self._clear_game_references()
+    
+    def reset(self):
+        """Clear per-game state so this bot can play another game in the same process.
+        
+        python-sc2 resets its own state when the next game starts; this resets
+        the HeadManager and every manager that played the last game.
+        """
+        if self.stack_sampler:
+            self.stack_sampler.stop()
+        if self.request_pipeline:
+            self.request_pipeline.uninstall()
+        self.head.reset()
+        self.bases.reset()
+        if self.gc_controller:
+            self.gc_controller.stop()
+            self.gc_controller.reset()
+        if self.step_controller:
+            self.step_controller.stop()
+            self.step_controller.reset()
+        self._clear_game_references()
+    
+    def _clear_game_references(self):
+        """Drop the references that only live for one game."""
         # Military manager will be set based on race in on_start
         self.military_manager = None
         
@@ -34,70 +87,199 @@ class CompetitiveBot(BotAI):
         
         # Track game state
         self.game_started = False
+        
+        # Observation recorder, set in on_start if enabled
+        self.recorder = None
+        
+        # Cached map analysis (ramps, regions, expansion paths, placement slots)
+        self.map_analysis = None
+        
+        # Zerg larva budget shared by the economy and military managers, set in on_start
+        self.larva_allocator = None
+        
+        # Stack sampler for the game's flame graph, set in on_start if enabled
+        self.stack_sampler = None
+        
+        # Pipelined requests so concurrent managers' queries overlap, set in on_start
+        self.request_pipeline = None
+
+    def _prepare_first_step(self):
+        """Run python-sc2's first step map analysis, served from the map cache after the first game."""
+        if bot_config.head.enable_map_cache and self.townhalls:
+            from map_analysis import MapCache
+            
+            try:
+                if self._map_cache is None:
+                    self._map_cache = MapCache(bot_config.head.map_cache_dir)
+                self.map_analysis = self._map_cache.prepare_first_step(self)
+                return
+            except Exception as e:
+                print(f"Map cache unavailable, analyzing without it: {e}")
+                self.map_analysis = None
+        super()._prepare_first_step()
 
     async def on_start(self):
         """Initialize the game and all managers."""
         print("Game started")
         self.game_started = True
         
-        # Initialize the appropriate economy manager based on race
-        await self._initialize_economy_manager()
+        # Concurrent managers share the websocket; replays and synthetic clients have none
+        if bot_config.head.concurrent_managers and getattr(self.client, '_ws', None) is not None:
+            self.request_pipeline = RequestPipeline(self.client)
+            self.request_pipeline.install()
+        
+        # Start recording before the managers make their first queries
+        if bot_config.head.record_observations and not getattr(self.client, 'replaying', False):
+            await self._start_recording()
         
-        # Initialize the appropriate military manager based on race
-        await self._initialize_military_manager()
+        # Managers iterate our bases instead of anchoring on the first townhall
+        self.bases.update()
+        
+        # Import and create the managers for our race only, or reuse them from an earlier game
+        await self._initialize_managers()
         
         # Register managers with the HeadManager
+        self.head.register_manager('bases', self.bases)
         if self.economy_manager:
             self.head.register_manager('economy', self.economy_manager)
         if self.military_manager:
             self.head.register_manager('military', self.military_manager)
+        if self.larva_allocator:
+            self.head.register_manager('larva', self.larva_allocator)
         
         # Let the HeadManager handle manager initialization
         await self.head.on_start()
         
+        # Start per-step telemetry if enabled
+        if bot_config.head.enable_telemetry:
+            self._start_telemetry()
+        
+        # Attribute allocations to the managers if enabled
+        if bot_config.head.profile_allocations:
+            self._start_allocation_profiler()
+        
+        # Sample stacks for a flame graph if enabled
+        if bot_config.head.sample_stacks:
+            self._start_stack_sampler()
+        
+        # Everything alive now lives for the whole game: freeze it and keep full collections out of steps
+        if self.gc_controller:
+            self.gc_controller.start()
+        
+        # Adapt the game step to the phase; replays keep the recorded steps
+        if self.step_controller and not getattr(self.client, 'replaying', False):
+            self.step_controller.start(self.client)
+        
         # Log initial game state
         print(f"Starting position: {self.start_location}")
         print(f"Bot race: {self.race}")
         print(f"Enemy race: {self.enemy_race if hasattr(self, 'enemy_race') else 'Unknown'}")
 
-    async def _initialize_economy_manager(self):
-        """Initialize the appropriate economy manager based on the bot's race."""
-        if self.race == Race.Terran:
-            self.economy_manager = TerranEconomyManager(self)
-            print("Initialized Terran Economy Manager")
-        elif self.race == Race.Protoss:
-            self.economy_manager = ProtossEconomyManager(self)
-            print("Initialized Protoss Economy Manager")
-        elif self.race == Race.Zerg:
-            self.economy_manager = ZergEconomyManager(self)
-            print("Initialized Zerg Economy Manager")
-        else:
-            # Default to Terran if race is unknown
-            self.economy_manager = TerranEconomyManager(self)
-            print(f"Unknown race {self.race}, defaulting to Terran Economy Manager")
+    async def _initialize_managers(self):
+        """Initialize the economy and military managers registered for the bot's race.
+        
+        Managers from an earlier game with this race were reset with the bot and are reused.
+        """
+        if self.race in self._manager_pool:
+            self.economy_manager, self.military_manager, self.larva_allocator = self._manager_pool[self.race]
+            print(f"Reusing managers for {self.race.name}")
+            return
+        
+        # Zerg managers request larva instead of ordering it directly
+        if self.race == Race.Zerg:
+            from managers.larva_allocator import LarvaAllocator
+            self.larva_allocator = LarvaAllocator(self)
+        
+        economy_class, military_class = load_managers(self.race)
+        self.economy_manager = economy_class(self)
+        self.military_manager = military_class(self)
+        self._manager_pool[self.race] = (self.economy_manager, self.military_manager, self.larva_allocator)
+        print(f"Initialized {economy_class.__name__} and {military_class.__name__} for {self.race.name}")
+
+    def _start_telemetry(self):
+        """Attach a telemetry recorder to the HeadManager."""
+        import time
+        from telemetry.telemetry_recorder import TelemetryRecorder
+        
+        try:
+            path = Path(bot_config.head.telemetry_dir) / f"{time.strftime('%Y%m%d_%H%M%S')}_{self.race.name}.b0bt"
+            names = list(self.head.managers) + ['head']
+            if self.gc_controller:
+                names += ['gc', 'gc_idle']
+            self.head.telemetry = TelemetryRecorder(path, names)
+            print(f"Recording telemetry to {path}")
+        except Exception as e:
+            print(f"Could not start telemetry: {e}")
+
+    def _start_allocation_profiler(self):
+        """Attach an allocation profiler to the HeadManager."""
+        from telemetry.allocation_profiler import AllocationProfiler
+        
+        self.head.allocation_profiler = AllocationProfiler(
+            bot_config.head.allocation_frames, bot_config.head.allocation_sample_every)
+        self.head.allocation_profiler.start()
+        print("Profiling allocations per manager step")
 
-    async def _initialize_military_manager(self):
-        """Initialize the appropriate military manager based on the bot's race."""
-        if self.race == Race.Terran:
-            self.military_manager = MilitaryManager(self)
-            print("Initialized Terran Military Manager")
-        elif self.race == Race.Protoss:
-            self.military_manager = ProtossMilitaryManager(self)
-            print("Initialized Protoss Military Manager")
-        elif self.race == Race.Zerg:
-            self.military_manager = ZergMilitaryManager(self)
-            print("Initialized Zerg Military Manager")
-        else:
-            # Default to Terran if race is unknown
-            self.military_manager = MilitaryManager(self)
-            print(f"Unknown race {self.race}, defaulting to Terran Military Manager")
+    def _start_stack_sampler(self):
+        """Start sampling the bot's stack during steps."""
+        from telemetry.stack_sampler import StackSampler
+        
+        head_config = bot_config.head
+        self.stack_sampler = StackSampler(head_config.sample_interval, head_config.sample_only_over,
+                                          head_config.sample_range)
+        self.stack_sampler.start()
+        print(f"Sampling stacks every {head_config.sample_interval * 1000:.0f} ms")
+    
+    def _write_stack_samples(self):
+        """Stop the stack sampler and write the game's flame graph."""
+        import time
+        
+        sampler = self.stack_sampler
+        self.stack_sampler = None
+        sampler.stop()
+        suffix = '.speedscope.json' if bot_config.head.sample_format == 'speedscope' else '.folded'
+        name = f"{time.strftime('%Y%m%d_%H%M%S')}_{self.race.name}"
+        try:
+            path = sampler.write(Path(bot_config.head.profiles_dir) / f"{name}{suffix}", name)
+            print(f"Stack samples written to {path} ({sampler.samples} samples from "
+                  f"{sampler.kept_steps}/{sampler.steps} steps, overhead {sampler.overhead:.2%})")
+        except Exception as e:
+            print(f"Error writing stack samples: {e}")
+    
+    async def _start_recording(self):
+        """Record observations and query responses for offline replay."""
+        import time
+        from telemetry.observation_recorder import ObservationRecorder
+        
+        try:
+            path = Path(bot_config.head.recordings_dir) / f"{time.strftime('%Y%m%d_%H%M%S')}_{self.race.name}"
+            self.recorder = ObservationRecorder(self, path)
+            await self.recorder.start()
+            print(f"Recording observations to {path}")
+        except Exception as e:
+            print(f"Could not start observation recording: {e}")
+            self.recorder = None
 
     async def on_step(self, iteration: int):
         """Process each game step by delegating to the HeadManager."""
         try:
+            if self.gc_controller:
+                self.gc_controller.begin_step()
+            if self.step_controller:
+                self.step_controller.begin_step()
+            if self.recorder:
+                self.recorder.begin_step(iteration)
+            if self.stack_sampler:
+                self.stack_sampler.begin_step(self.time)
+            
             # Let the HeadManager coordinate all managers
             await self.head.on_step()
             
+            if self.stack_sampler:
+                self.stack_sampler.end_step()
+            if self.recorder:
+                self.recorder.end_step()
+            
             # Debug output every 10 seconds
             if iteration % 224 == 0:  # ~10 seconds at 'faster' speed
                 self._log_game_state()
@@ -107,6 +289,29 @@ class CompetitiveBot(BotAI):
             import traceback
             traceback.print_exc()
 
+    def do(self, action, subtract_cost=False, subtract_supply=False, can_afford_check=False, ignore_warning=False):
+        """python-sc2's do(); while managers step concurrently the command is also recorded
+        in the HeadManager's command buffer, which orders the stage's commands."""
+        buffer = self.head.command_buffer
+        if not buffer.capturing:
+            return super().do(action, subtract_cost, subtract_supply, can_afford_check, ignore_warning)
+        minerals, vespene, supply = self.minerals, self.vespene, self.supply_used
+        done = super().do(action, subtract_cost, subtract_supply, can_afford_check, ignore_warning)
+        if done is True and isinstance(action, UnitCommand):
+            buffer.record(action, minerals - self.minerals, vespene - self.vespene, self.supply_used - supply)
+        return done
+    
+    async def _after_step(self) -> int:
+        """Send the step's actions, collect garbage, then choose the game step for the next one."""
+        game_loop = await super()._after_step()
+        if self.gc_controller and self.gc_controller.active:
+            idle = self.gc_controller.collect_idle()
+            self.head.record_step_time('gc', self.gc_controller.step_pause)
+            self.head.record_step_time('gc_idle', idle)
+        if self.step_controller and self.step_controller.active:
+            self.step_controller.end_step(self)
+        return game_loop
+
     async def on_end(self, result: Result):
         """Handle game end and clean up resources."""
         print(f"\n=== Game Over ===")
@@ -119,6 +324,30 @@ class CompetitiveBot(BotAI):
         # Let the HeadManager handle cleanup
         if hasattr(self, 'head') and self.head:
             await self.head.on_end(result)
+        
+        if self.recorder:
+            try:
+                self.recorder.close()
+                print(f"Observations written to {self.recorder.path} ({self.recorder.steps_recorded} steps)")
+            except Exception as e:
+                print(f"Error closing observation recorder: {e}")
+            self.recorder = None
+        
+        if self.stack_sampler:
+            self._write_stack_samples()
+        
+        if self.gc_controller:
+            self.gc_controller.stop()
+        
+        if self.step_controller:
+            self.step_controller.stop()
+        
+        if self.request_pipeline:
+            self.request_pipeline.uninstall()
+        
+        # Archive this game's log; the log thread compresses it
+        import time
+        rotate_game_log(f"{time.strftime('%Y%m%d_%H%M%S')}_{self.race.name}_{getattr(result, 'name', result)}")
     
     def _log_game_state(self):
         """Log the current game state for debugging."""
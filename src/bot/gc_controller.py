@@ -0,0 +1,145 @@
+"""Garbage collection control: keep collector pauses out of on_step.
+
+Every step the managers allocate thousands of short-lived objects (Units
+filters, lambdas, state dicts, strings), and CPython's generational
+collector runs whenever its allocation counters trip, which can be in the
+middle of a step. A full (generation 2) collection walks every tracked
+object the bot has, and those pauses were our worst p99 step times.
+
+GCController, driven by CompetitiveBot:
+
+- start() after on_start: collects once, then gc.freeze() moves everything
+  alive (imports, game data, map analysis, managers) to the permanent
+  generation so later collections never walk it again
+- Automatic generation 2 collection is suspended for the whole game;
+  generations 0 and 1 stay automatic, they are small and cheap
+- collect_idle() after each step's actions are sent runs the young
+  generations and, when the full collection fits the idle budget (or has
+  been deferred too long), generation 2
+- Pauses inside the step and in idle time are recorded with the
+  HeadManager as 'gc' and 'gc_idle' step metrics
+
+USAGE:
+```python
+self.gc_controller = GCController(budget=0.003, full_every=200)
+self.gc_controller.start()         # after on_start
+self.gc_controller.begin_step()    # start of on_step
+self.gc_controller.collect_idle()  # after the step's actions are sent
+self.gc_controller.stop()          # on_end
+```
+"""
+
+import gc
+import time
+from typing import Dict, Tuple
+
+GEN2_SUSPENDED = 1 << 30  # Generation 2 threshold no game gets near: automatic full collections never run
+FULL_COST_SMOOTHING = 0.3  # Weight of the newest full collection in the cost estimate
+
+
+class GCController:
+    """Moves garbage collection from inside steps to the idle time between them."""
+
+    def __init__(self, budget: float = 0.003, full_every: int = 200):
+        """Initialize the controller.
+
+        Args:
+            budget: Seconds of idle collection allowed after each step
+            full_every: Steps after which a full collection runs even over budget
+        """
+        self.budget = budget
+        self.full_every = full_every
+        self.debug = False
+        self.active = False
+        self._threshold: Tuple[int, int, int] = gc.get_threshold()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear per-game statistics."""
+        self.step_pause = 0.0  # Collector time inside the current step
+        self.idle_pause = 0.0  # Idle collection time after the last step
+        self.full_cost = 0.0  # Estimated seconds of a full collection
+        self.collections: Dict[int, int] = {0: 0, 1: 0, 2: 0}  # generation -> idle collections run
+        self.forced_full = 0  # Full collections run over budget
+        self.frozen = 0  # Objects moved to the permanent generation at start
+        self._steps_since_full = 0
+        self._in_step = False
+        self._pause_start = None
+
+    def start(self) -> None:
+        """Freeze the startup objects and suspend automatic full collections."""
+        if self.active:
+            return
+        gc.collect()
+        gc.freeze()
+        self.frozen = gc.get_freeze_count()
+        self._threshold = gc.get_threshold()
+        gc.set_threshold(self._threshold[0], self._threshold[1], GEN2_SUSPENDED)
+        gc.callbacks.append(self._on_collect)
+        self.active = True
+        if self.debug:
+            print(f"[GC] Froze {self.frozen} objects, full collections moved out of steps")
+
+    def stop(self) -> None:
+        """Restore automatic collection and release the frozen objects of this game."""
+        if not self.active:
+            return
+        gc.callbacks.remove(self._on_collect)
+        gc.set_threshold(*self._threshold)
+        gc.unfreeze()
+        self.active = False
+        self._in_step = False
+        if self.debug:
+            print(f"[GC] Idle collections {self.collections}, {self.forced_full} forced full")
+
+    def begin_step(self) -> None:
+        """Start counting collector pauses for a step."""
+        self.step_pause = 0.0
+        self._in_step = True
+
+    def _on_collect(self, phase: str, info: dict) -> None:
+        """gc.callbacks hook: time automatic collections that run inside a step."""
+        if not self._in_step:
+            return
+        if phase == 'start':
+            self._pause_start = time.perf_counter()
+        elif self._pause_start is not None:
+            self.step_pause += time.perf_counter() - self._pause_start
+            self._pause_start = None
+
+    def collect_idle(self) -> float:
+        """Run the collections due, within the idle budget.
+
+        Returns:
+            Seconds spent collecting
+        """
+        self._in_step = False
+        if not self.active:
+            return 0.0
+        start = time.perf_counter()
+        threshold0, threshold1, _ = self._threshold
+        count0, count1, _ = gc.get_count()
+        # Collect the young generations before their automatic trigger would fire in the next step
+        if count1 >= threshold1 - 1:
+            gc.collect(1)
+            self.collections[1] += 1
+        elif count0 >= threshold0 // 2:
+            gc.collect(0)
+            self.collections[0] += 1
+
+        self._steps_since_full += 1
+        remaining = self.budget - (time.perf_counter() - start)
+        forced = self._steps_since_full >= self.full_every
+        if forced or (self.full_cost <= remaining and self._steps_since_full >= self.full_every // 4):
+            full_start = time.perf_counter()
+            gc.collect(2)
+            cost = time.perf_counter() - full_start
+            self.full_cost = cost if not self.collections[2] else (
+                FULL_COST_SMOOTHING * cost + (1 - FULL_COST_SMOOTHING) * self.full_cost)
+            self.collections[2] += 1
+            if forced and cost > remaining:
+                self.forced_full += 1
+            self._steps_since_full = 0
+
+        self.idle_pause = time.perf_counter() - start
+        return self.idle_pause
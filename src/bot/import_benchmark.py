@@ -0,0 +1,101 @@
+"""Cold start benchmark: time from a fresh interpreter to bot classes ready.
+
+Ladder hosts give a short window between game launch and the first step,
+and most of it can go to imports. Each sample runs a new interpreter that
+imports bot.main (what the entry points import) and then loads the
+managers of one race through the registry, so it measures exactly what a
+game pays before on_start. The median over several samples is compared
+with HeadConfig.import_budget.
+
+When over budget, a -X importtime run lists the slowest of our modules and
+their heavy dependencies, to show which import to make lazy.
+
+USAGE:
+    python run_import_benchmark.py [--samples 5] [--budget 1.5] [--race Zerg]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+# Packages listed in the slowest module report: ours plus the heavy dependencies they pull in
+REPORTED_PACKAGES = ('bot', 'managers', 'config', 'map_analysis', 'telemetry', 'simulation', 'sc2', 'numpy', 'scipy')
+
+# Runs in the fresh interpreter; prints the timings as JSON on the last line
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+sys.path.insert(0, {src!r})
+import bot.main
+bot_ready = time.perf_counter()
+from sc2.data import Race
+from managers.registry import load_managers
+load_managers(Race[{race!r}])
+done = time.perf_counter()
+print(json.dumps({{'bot': bot_ready - start, 'managers': done - bot_ready, 'total': done - start}}))
+"""
+
+
+def sample(race: str, importtime: bool = False) -> Tuple[Dict[str, float], str]:
+    """Time one cold start in a new interpreter; returns the timings and its stderr."""
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', _PROBE.format(src=str(SRC_DIR), race=race)]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def slowest_modules(importtime_log: str, count: int = 10) -> List[Tuple[str, float]]:
+    """Reported modules by cumulative import time (seconds), slowest first."""
+    modules: Dict[str, float] = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        if name.split('.')[0] in REPORTED_PACKAGES:
+            modules[name] = max(modules.get(name, 0.0), int(cumulative) / 1e6)
+    return sorted(modules.items(), key=lambda m: -m[1])[:count]
+
+
+def run(samples: int = 5, budget: Optional[float] = None, races: Tuple[str, ...] = ('Terran', 'Protoss', 'Zerg'),
+        verbose: bool = True) -> bool:
+    """Benchmark every race and check the median cold start against the budget.
+
+    Returns:
+        True if every race is within budget
+    """
+    if budget is None:
+        from config.config import config as bot_config
+        budget = bot_config.head.import_budget
+    within = True
+    for race in races:
+        totals = [sample(race)[0] for _ in range(samples)]
+        median = {key: statistics.median(t[key] for t in totals) for key in totals[0]}
+        ok = median['total'] <= budget
+        within &= ok
+        if verbose:
+            print(f"{race:8s} cold start {median['total']:.3f}s (bot {median['bot']:.3f}s, "
+                  f"managers {median['managers']:.3f}s) budget {budget:.3f}s {'OK' if ok else 'OVER'}")
+            if not ok:
+                _, log = sample(race, importtime=True)
+                for name, seconds in slowest_modules(log):
+                    print(f"    {seconds * 1000:7.1f} ms  {name}")
+    return within
+
+
+def main(argv=None) -> int:
+    """Command line entry point; exits non-zero when over budget."""
+    parser = argparse.ArgumentParser(description="Measure bot cold start import time")
+    parser.add_argument('--samples', type=int, default=5, help="Fresh interpreters per race")
+    parser.add_argument('--budget', type=float, default=None, help="Seconds (default: HeadConfig.import_budget)")
+    parser.add_argument('--race', action='append', choices=['Terran', 'Protoss', 'Zerg'],
+                        help="Race to measure (repeatable, default: all)")
+    args = parser.parse_args(argv)
+    races = tuple(args.race) if args.race else ('Terran', 'Protoss', 'Zerg')
+    return 0 if run(args.samples, args.budget, races) else 1
@@ -0,0 +1,272 @@
+"""Asynchronous logging: records are queued in the step, written by a background thread.
+
+The B0B logger used to write bot.log and the console synchronously from
+inside on_step, so a slow disk or a full console pipe stalled the game loop.
+The pipeline installed by bootstrap() instead gives the logger a single
+DroppingQueueHandler; a QueueListener thread hands the records to the file
+and console handlers.
+
+- The queue is bounded. When it fills up (the writer fell behind),
+  records below WARNING are dropped instead of blocking the step; the
+  last part of the queue is reserved for warnings and errors. A notice
+  with the number of dropped records is logged once the queue is half empty.
+- bot.log holds the current game. rotate_game_log() (called by
+  CompetitiveBot.on_end) closes it, compresses it to games/<name>.log.gz on
+  the writer thread and starts a new one. A bot.log left over from a crash
+  is archived the same way at startup instead of being deleted.
+- Only the newest keep_games archives are kept.
+
+USAGE:
+```python
+from bot.log_pipeline import LogPipeline, rotate_game_log, flush_logs
+
+pipeline = LogPipeline(logger, "logs", queue_size=10000, keep_games=50)
+pipeline.start()
+rotate_game_log("20240101_120000_Terran_Victory")  # game over
+flush_logs()                                        # wait for the writer
+```
+"""
+
+import atexit
+import gzip
+import logging
+import queue
+import shutil
+import time
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import List, Optional
+
+ROTATE_ATTR = 'b0b_rotate'  # Record attribute marking a rotation request for the file handler
+RESERVED_FRACTION = 0.1  # Part of the queue only warnings and errors may use
+ARCHIVE_DIR = "games"  # Subdirectory of the log directory for finished games
+
+_pipeline: Optional['LogPipeline'] = None  # Installed by LogPipeline.start()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: drops low-priority records when the queue is nearly full."""
+
+    def __init__(self, log_queue: queue.SimpleQueue, maxsize: int, keep_level: int = logging.WARNING):
+        """Initialize the handler.
+
+        Args:
+            log_queue: Queue read by the listener (SimpleQueue: put is a single C call)
+            maxsize: Records queued before every record is dropped
+            keep_level: Records at or above this level may use the reserved part of the queue
+        """
+        super().__init__(log_queue)
+        self.maxsize = maxsize
+        self.keep_level = keep_level
+        self.high_water = max(maxsize - int(maxsize * RESERVED_FRACTION), 1)
+        self.queued = 0  # Records put on the queue, compared with what the writer handled by flush()
+        self.dropped = 0  # Dropped since the last notice
+        self.dropped_total = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Queue the record, or drop it if the queue is under pressure."""
+        try:
+            size = self.queue.qsize()
+            if size >= self.maxsize or (record.levelno < self.keep_level and size >= self.high_water):
+                self.dropped += 1
+                self.dropped_total += 1
+                return
+            if self.dropped and size < self.high_water // 2:
+                self.enqueue(self._drop_notice())
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.queue.put_nowait(record)
+        self.queued += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the arguments into the message here, while they still hold their current values.
+
+        Lighter than QueueHandler.prepare(): the record is changed in place
+        (its message reads the same to any other handler) instead of copied,
+        and the formatting, exception text included, is left to the writer
+        thread.
+        """
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def _drop_notice(self) -> logging.LogRecord:
+        """Warning record reporting the records dropped since the last notice."""
+        notice = logging.makeLogRecord({
+            'name': 'B0B.Logging', 'levelno': logging.WARNING, 'levelname': 'WARNING',
+            'msg': f"Dropped {self.dropped} log records, the log writer fell behind",
+        })
+        self.dropped = 0
+        return notice
+
+
+class GameLogHandler(logging.Handler):
+    """Writes bot.log on the listener thread and archives it, compressed, per game."""
+
+    def __init__(self, log_dir, keep_games: int = 50, archive_previous: bool = True):
+        """Open bot.log in log_dir.
+
+        Args:
+            log_dir: Directory for bot.log and the games/ archives
+            keep_games: Compressed game logs kept
+            archive_previous: Archive a bot.log left by an earlier process (else append to it)
+        """
+        super().__init__(logging.DEBUG)
+        self.log_dir = Path(log_dir)
+        self.archive_dir = self.log_dir / ARCHIVE_DIR
+        self.path = self.log_dir / "bot.log"
+        self.keep_games = keep_games
+        self.handled = 0  # Records taken off the queue, rotations included
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        if archive_previous and self.path.exists() and self.path.stat().st_size:
+            modified = time.strftime('%Y%m%d_%H%M%S', time.localtime(self.path.stat().st_mtime))
+            self._archive(f"{modified}_previous")
+        self.stream = open(self.path, 'a', encoding='utf-8')
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write the record, or rotate when it is a rotation request."""
+        self.handled += 1
+        name = getattr(record, ROTATE_ATTR, None)
+        if name is not None:
+            self.rotate(name)
+            return
+        try:
+            self.stream.write(self.format(record) + "\n")
+            if not self.pending():
+                self.stream.flush()
+        except Exception:
+            self.handleError(record)
+
+    def pending(self) -> int:
+        """Records still queued for the writer (set by LogPipeline; 0 flushes every record)."""
+        return 0
+
+    def rotate(self, name: str) -> None:
+        """Archive the current bot.log as games/<name>.log.gz and start a new one."""
+        self.acquire()
+        try:
+            self.stream.close()
+            try:
+                self._archive(name)
+            except OSError as e:
+                print(f"Warning: Could not archive {self.path}: {e}")
+            self.stream = open(self.path, 'a', encoding='utf-8')
+        finally:
+            self.release()
+
+    def _archive(self, name: str) -> None:
+        """Compress bot.log into the archive directory and prune the oldest archives."""
+        self.archive_dir.mkdir(exist_ok=True)
+        with open(self.path, 'rb') as source, gzip.open(self.archive_dir / f"{name}.log.gz", 'wb') as target:
+            shutil.copyfileobj(source, target)
+        self.path.unlink()
+        archives = sorted(self.archive_dir.glob("*.log.gz"), key=lambda path: path.stat().st_mtime)
+        for old in archives[:max(len(archives) - self.keep_games, 0)]:
+            old.unlink()
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if self.stream and not self.stream.closed:
+                self.stream.flush()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            if self.stream:
+                self.stream.close()
+        finally:
+            self.release()
+        super().close()
+
+
+def _not_rotation(record: logging.LogRecord) -> bool:
+    """Filter keeping rotation requests away from the other handlers."""
+    return not hasattr(record, ROTATE_ATTR)
+
+
+class LogPipeline:
+    """The logger's queue handler plus the listener thread that owns the real handlers."""
+
+    def __init__(self, logger: logging.Logger, log_dir, queue_size: int = 10000, keep_games: int = 50,
+                 handlers: Optional[List[logging.Handler]] = None, archive_previous: bool = True):
+        """Build the pipeline; nothing is installed until start().
+
+        Args:
+            logger: Logger whose records go through the queue
+            log_dir: Directory for bot.log and the game archives
+            queue_size: Records the queue holds before dropping low-priority ones
+            keep_games: Compressed game logs kept
+            handlers: Further handlers run on the listener thread (e.g. console)
+            archive_previous: Archive a leftover bot.log instead of appending to it
+        """
+        self.logger = logger
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.file_handler = GameLogHandler(log_dir, keep_games, archive_previous)
+        self.file_handler.pending = self.queue.qsize  # Flush the file once the queue is drained
+        self.handlers = [self.file_handler] + list(handlers or [])
+        for handler in self.handlers[1:]:
+            handler.addFilter(_not_rotation)
+        self.queue_handler = DroppingQueueHandler(self.queue, queue_size)
+        self.listener = QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+        self.running = False
+
+    def start(self) -> None:
+        """Install the queue handler and start the writer thread."""
+        global _pipeline
+        self.logger.addHandler(self.queue_handler)
+        self.listener.start()
+        self.running = True
+        _pipeline = self
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Write the queued records, stop the writer thread and close the files."""
+        global _pipeline
+        if not self.running:
+            return
+        self.logger.removeHandler(self.queue_handler)
+        self.listener.stop()
+        self.running = False
+        for handler in self.handlers:
+            handler.close()
+        if _pipeline is self:
+            _pipeline = None
+
+    def rotate(self, name: str) -> None:
+        """Queue a rotation: records logged before it go to the archive of this game."""
+        record = logging.makeLogRecord({'name': self.logger.name, 'levelno': logging.CRITICAL,
+                                        'msg': f"rotate {name}", ROTATE_ATTR: name})
+        self.queue_handler.enqueue(record)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until the writer has handled every queued record.
+
+        Returns:
+            True if the queue was drained within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while self.running and self.file_handler.handled < self.queue_handler.queued:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        for handler in self.handlers:
+            handler.flush()
+        return True
+
+
+def rotate_game_log(name: str) -> None:
+    """Archive the log of the game that just ended as games/<name>.log.gz (no-op without a pipeline)."""
+    if _pipeline:
+        _pipeline.rotate(name)
+
+
+def flush_logs(timeout: float = 5.0) -> bool:
+    """Wait for queued log records to be written (True if there is no pipeline)."""
+    return _pipeline.flush(timeout) if _pipeline else True
@@ -1,55 +1,13 @@
 """Main bot module containing the MyBot class."""
 
 import logging
-import os
-from pathlib import Path
 
 # Import the race-aware bot instead of hardcoded managers
-from src.bot.bot import CompetitiveBot
+from .bot import CompetitiveBot
+from .log_pipeline import flush_logs
 
-# Set up logging
-log_dir = Path("logs")
-log_dir.mkdir(exist_ok=True)
-log_file = log_dir / "bot.log"
-
-# Clear previous log file if it exists
-if log_file.exists():
-    try:
-        os.remove(log_file)
-    except OSError as e:
-        print(f"Warning: Could not remove log file: {e}")
-
-
-# Configure logging
-def setup_logging():
-    """Set up logging configuration and return the file logger."""
-    logger = logging.getLogger("B0B")
-    logger.setLevel(logging.DEBUG)
-    
-    # Create file handler
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setLevel(logging.DEBUG)
-
-    # Create console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    
-    # Create formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
-    
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-
-    return logger
-
-
-# Initialize logger
-logger = setup_logging()
+# Handlers are installed by bootstrap() (see bot/bootstrap.py), not at import
+logger = logging.getLogger("B0B")
 
 
 class MyBot(CompetitiveBot):
@@ -60,22 +18,24 @@ class MyBot(CompetitiveBot):
         print("[DEBUG] MyBot __init__ called")
         logger.info("[DEBUG] MyBot __init__ called")
         super().__init__()
-        self._closed = False
         self.logger = logger.getChild('MyBot')
         self.logger.info("Initializing B0B bot...")
         self.initialized = False
         self.logger.info("Bot instance created")
     
-    def __del__(self):
-        self.close()
-        
+    def reset(self):
+        """Clear per-game state so this bot can play another game (see CompetitiveBot.reset)."""
+        super().reset()
+        self.initialized = False
+    
     def close(self):
-        if not self._closed:
-            for handler in logging.getLogger('B0B').handlers[:]:
-                if hasattr(handler, 'close'):
-                    handler.close()
-                logging.getLogger('B0B').removeHandler(handler)
-            self._closed = True
+        """Wait for the queued log records to be written.
+        
+        The logging pipeline belongs to the process (see bot/log_pipeline.py),
+        so it stays installed for the next game played by this or another bot
+        instance.
+        """
+        flush_logs()
     
     async def on_start(self):
         """Called once at the start of the game."""
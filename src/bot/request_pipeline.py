@@ -0,0 +1,118 @@
+"""Pipelined requests: lets concurrent coroutines share the game's websocket.
+
+python-sc2 sends a request and then waits for its response on the same
+websocket, so two coroutines querying at once would both wait in
+receive() (which aiohttp refuses) or take each other's responses. The game
+answers requests in the order it received them, so RequestPipeline sends
+every request at once, tags it with an id, and a reader task owned by the
+pipeline reads responses off the socket and hands each to the request with
+the matching id. Concurrent queries then cost one round trip together
+instead of one each. The reader runs while requests are in flight, so a
+requesting coroutine that is cancelled (game end, a timeout around a
+manager) does not strand the others.
+
+The pipeline replaces python-sc2's private Protocol.__request (name-mangled
+to _Protocol__request) on the client; install() raises if a python-sc2
+release no longer has it.
+
+Installed by CompetitiveBot when managers step concurrently; replays and
+synthetic clients have no websocket and keep their own _execute.
+
+USAGE:
+```python
+pipeline = RequestPipeline(self.client)
+pipeline.install()
+...
+pipeline.uninstall()
+```
+"""
+
+import asyncio
+from collections import OrderedDict
+
+from s2clientprotocol import sc2api_pb2 as sc_pb
+from sc2.protocol import ConnectionAlreadyClosedError
+
+
+class RequestPipeline:
+    """Replaces the client's request/response round trip with a pipelined one."""
+
+    def __init__(self, client):
+        """Initialize the pipeline.
+
+        Args:
+            client: The sc2 Client of the game
+        """
+        self.client = client
+        self.max_in_flight = 0  # Most requests waiting for a response at once
+        self._next_id = 1
+        self._pending: OrderedDict = OrderedDict()  # request id -> future, in send order
+        self._send_lock = asyncio.Lock()
+        self._reader = None  # Task reading responses while requests are in flight
+
+    @property
+    def installed(self) -> bool:
+        return '_Protocol__request' in vars(self.client)
+
+    def install(self) -> None:
+        """Route the client's requests through the pipeline.
+
+        Raises:
+            RuntimeError: If python-sc2's Protocol no longer has the private round trip the pipeline replaces
+        """
+        if not hasattr(type(self.client), '_Protocol__request'):
+            raise RuntimeError("python-sc2 Protocol has no _Protocol__request to replace; "
+                               "the request pipeline does not support this python-sc2 version")
+        self.client._Protocol__request = self.request
+
+    def uninstall(self) -> None:
+        """Restore python-sc2's own round trip, failing requests still in flight."""
+        if self._reader is not None and not self._reader.done():
+            self._reader.cancel()
+        self._fail_pending(ConnectionAlreadyClosedError("Request pipeline uninstalled."))
+        if self.installed:
+            del self.client._Protocol__request
+
+    async def request(self, request: sc_pb.Request) -> sc_pb.Response:
+        """Send request and return its response, while other requests are in flight."""
+        future = asyncio.get_running_loop().create_future()
+        async with self._send_lock:
+            request_id = request.id = self._next_id
+            self._next_id = self._next_id % 0xFFFFFFFF + 1
+            self._pending[request_id] = future
+            self.max_in_flight = max(self.max_in_flight, len(self._pending))
+            try:
+                await self.client._ws.send_bytes(request.SerializeToString())
+            except TypeError as exc:
+                del self._pending[request_id]
+                raise ConnectionAlreadyClosedError("Connection already closed.") from exc
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.get_running_loop().create_task(self._read_until_idle())
+        return await future
+
+    async def _read_until_idle(self) -> None:
+        """Read responses and resolve their requests until none are in flight."""
+        try:
+            while self._pending:
+                data = await self.client._ws.receive_bytes()
+                response = sc_pb.Response()
+                response.ParseFromString(data)
+                # The game echoes the id; responses without one arrive in send order
+                future = self._pending.pop(response.id, None) if response.id else None
+                if future is None:
+                    _, future = self._pending.popitem(last=False)
+                if not future.done():  # Its requester may have been cancelled
+                    future.set_result(response)
+        except BaseException as exc:
+            # Also on cancellation: nobody reads for the pending requests any more
+            closed = isinstance(exc, (TypeError, asyncio.CancelledError))
+            self._fail_pending(ConnectionAlreadyClosedError("Connection already closed.") if closed else exc)
+            if not isinstance(exc, Exception):
+                raise
+
+    def _fail_pending(self, error: BaseException) -> None:
+        """Resolve every request in flight with error."""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
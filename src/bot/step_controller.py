@@ -0,0 +1,171 @@
+"""Adaptive game step: fine steps in fights, coarse ones when nothing happens.
+
+python-sc2 advances the game client.game_step loops (4 by default) between
+two bot steps, for the whole game. Four loops is slower reaction than a
+fight needs and more steps than an early economy needs, and on realtime
+ladders a step that takes longer than its loops (game_step / 22.4 s)
+makes the bot skip observations.
+
+StepController, driven by CompetitiveBot, classifies every step into a
+phase and sets client.game_step for the next one:
+
+- combat: a base is threatened, or army units are within COMBAT_RADIUS of
+  enemy units or structures -> combat step (fine)
+- maneuver: army units have orders, or enemy units are visible
+  -> maneuver step
+- economy: anything else -> economy step (coarse)
+
+A finer step applies at once; a coarser one only after calm_time game
+seconds without needing the finer one, so steps do not flap. The bot's
+wall time per step (on_step until the actions and idle collection are
+done) is tracked over the last LATENCY_WINDOW steps, and game_step never
+drops below the loops that time needs at headroom of the realtime budget,
+even in combat. Every change is logged.
+
+USAGE:
+```python
+self.step_controller = StepController({'economy': 8, 'maneuver': 4, 'combat': 2})
+self.step_controller.start(self.client)   # on_start
+self.step_controller.begin_step()         # start of on_step
+self.step_controller.end_step(self)       # after the step's actions are sent
+```
+"""
+
+import logging
+import math
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from sc2.ids.unit_typeid import UnitTypeId
+
+logger = logging.getLogger('B0B.StepController')
+
+LOOPS_PER_SECOND = 22.4  # Game loops per second at 'faster' speed
+LATENCY_WINDOW = 45  # Steps whose slowest wall time sets the minimum game step
+COMBAT_RADIUS = 12  # Army units this close to enemies are fighting
+PHASES = ('economy', 'maneuver', 'combat')  # Coarsest to finest
+NON_ARMY_TYPES = {
+    UnitTypeId.SCV, UnitTypeId.MULE, UnitTypeId.PROBE, UnitTypeId.DRONE, UnitTypeId.LARVA, UnitTypeId.EGG,
+    UnitTypeId.OVERLORD, UnitTypeId.OVERLORDCOCOON, UnitTypeId.QUEEN,
+}
+
+
+class StepController:
+    """Sets client.game_step from the game phase and the measured step time."""
+
+    def __init__(self, steps: Dict[str, int], min_step: int = 1, max_step: int = 16,
+                 headroom: float = 0.8, calm_time: float = 3.0):
+        """Initialize the controller.
+
+        Args:
+            steps: Phase ('economy', 'maneuver', 'combat') -> game loops per step
+            min_step: Finest game step allowed
+            max_step: Coarsest game step allowed, also when the realtime budget asks for more
+            headroom: Share of a step's realtime budget the bot may use
+            calm_time: Game seconds without the finer phase before steps get coarser
+        """
+        self.steps = steps
+        self.min_step = min_step
+        self.max_step = max_step
+        self.headroom = headroom
+        self.calm_time = calm_time
+        self.debug = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear per-game state so the controller can drive another game."""
+        self.client = None
+        self.phase = 'economy'
+        self.game_step: Optional[int] = None
+        self.changes = 0  # game_step changes this game
+        self.phase_steps: Dict[str, int] = {phase: 0 for phase in PHASES}
+        self.latency = deque(maxlen=LATENCY_WINDOW)  # Wall seconds of the last steps
+        self._hold_until = 0.0  # Game time before which the step may not get coarser
+        self._step_start = None
+
+    @property
+    def active(self) -> bool:
+        """True while the controller drives a client."""
+        return self.client is not None
+
+    def start(self, client) -> None:
+        """Take over client.game_step, starting with the economy step."""
+        self.client = client
+        self.game_step = client.game_step
+        self._apply(self._clamp(self.steps['economy']), 0.0, "game start")
+
+    def stop(self) -> None:
+        """Stop adjusting the client's game step."""
+        if self.client is not None and self.debug:
+            print(f"[Step] {self.changes} game_step changes, steps per phase {self.phase_steps}")
+        self.client = None
+        self._step_start = None
+
+    def begin_step(self) -> None:
+        """Start timing the bot's part of a step."""
+        self._step_start = time.perf_counter()
+
+    def end_step(self, ai) -> int:
+        """Record the step's wall time and set the game step for the next one.
+
+        Args:
+            ai: The bot, after the step's actions were sent
+
+        Returns:
+            The game step in effect for the next step
+        """
+        if self.client is None or self._step_start is None:
+            return self.game_step or 0
+        self.latency.append(time.perf_counter() - self._step_start)
+        self._step_start = None
+
+        self.phase = self.classify(ai)
+        self.phase_steps[self.phase] += 1
+        wanted = self._clamp(self.steps[self.phase])
+        if wanted <= self.game_step:
+            # This phase needs the current step or finer: no coarsening for a while
+            self._hold_until = ai.time + self.calm_time
+        elif ai.time < self._hold_until:
+            wanted = self.game_step
+
+        floor = self.budget_floor()
+        target = self._clamp(max(wanted, floor))
+        if target != self.game_step:
+            reason = self.phase if target == wanted else f"{self.phase}, realtime floor {floor}"
+            self._apply(target, ai.time, reason)
+        return self.game_step
+
+    def budget_floor(self) -> int:
+        """Fewest game loops per step that still fit the slowest recent step in the realtime budget."""
+        if not self.latency:
+            return self.min_step
+        return math.ceil(max(self.latency) * LOOPS_PER_SECOND / self.headroom)
+
+    @staticmethod
+    def classify(ai) -> str:
+        """Game phase of the current state: 'combat', 'maneuver' or 'economy'."""
+        bases = getattr(ai, 'bases', None)
+        if bases is not None and bases.threatened():
+            return 'combat'
+        army = ai.units.exclude_type(NON_ARMY_TYPES)
+        enemies = ai.enemy_units + ai.enemy_structures
+        if army and enemies and army.in_distance_of_group(enemies, COMBAT_RADIUS):
+            return 'combat'
+        if ai.enemy_units or any(unit.orders for unit in army):
+            return 'maneuver'
+        return 'economy'
+
+    def _clamp(self, step: int) -> int:
+        return max(self.min_step, min(self.max_step, step))
+
+    def _apply(self, step: int, game_time: float, reason: str) -> None:
+        """Set the client's game step and log the change."""
+        if step == self.game_step:
+            return
+        worst = max(self.latency) * 1000 if self.latency else 0.0
+        logger.info(f"game_step {self.game_step} -> {step} at {game_time:.1f}s ({reason}, "
+                    f"slowest recent step {worst:.1f} ms, budget {step / LOOPS_PER_SECOND * 1000:.0f} ms)")
+        self.client.game_step = step
+        self.game_step = step
+        self.changes += 1
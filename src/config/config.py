@@ -30,8 +30,8 @@ class EconomyConfig:
     min_time_before_expand: float = 120.0  # seconds
     
     # Supply management
-    supply_buffer: int = 5
-    emergency_supply_threshold: int = 2
+    supply_margin: int = 1  # Free supply the supply planner keeps beyond its projection
+    supply_lead_time: float = 3.0  # Seconds for a worker to reach a depot/pylon site
     
     # Resource collection
     target_mineral_workers: int = 16
@@ -60,24 +60,32 @@ class MilitaryConfig:
     def __post_init__(self):
         """Initialize default values if not provided."""
         if self.build_orders is None:
+            # Played by MilitaryManager, keyed by the HeadManager strategies. Refineries
+            # and bunkers are left to the EconomyManager.
             self.build_orders = {
                 'bio_rush': [
                     (UnitTypeId.SUPPLYDEPOT, 13, "Supply Depot at 13 supply"),
                     (UnitTypeId.BARRACKS, 14, "First Barracks at 14 supply"),
-                    (UnitTypeId.REFINERY, 15, "First Refinery"),
-                    (UnitTypeId.BUNKER, 17, "Bunker for defense"),
                     (UnitTypeId.BARRACKS, 19, "Second Barracks"),
+                    (UnitTypeId.FACTORY, 21, "Factory to unlock the Starport"),
                     (UnitTypeId.STARPORT, 22, "Starport for air units"),
                     (UnitTypeId.BARRACKS, 23, "Third Barracks"),
+                    (UnitTypeId.ENGINEERINGBAY, 25, "Engineering Bay for upgrades"),
                 ],
-                'mech_rush': [
+                'mech': [
                     (UnitTypeId.SUPPLYDEPOT, 13, "Supply Depot at 13 supply"),
                     (UnitTypeId.BARRACKS, 14, "First Barracks"),
-                    (UnitTypeId.FACTORY, 20, "Factory for mech units"),
-                    (UnitTypeId.REFINERY, 15, "First Refinery"),
-                    (UnitTypeId.BARRACKS, 19, "Second Barracks"),
+                    (UnitTypeId.FACTORY, 19, "Factory for mech units"),
+                    (UnitTypeId.BARRACKS, 22, "Second Barracks"),
                     (UnitTypeId.FACTORY, 25, "Second Factory"),
-                ]
+                ],
+                'air': [
+                    (UnitTypeId.SUPPLYDEPOT, 13, "Supply Depot at 13 supply"),
+                    (UnitTypeId.BARRACKS, 14, "First Barracks"),
+                    (UnitTypeId.FACTORY, 19, "Factory to unlock the Starport"),
+                    (UnitTypeId.STARPORT, 23, "First Starport"),
+                    (UnitTypeId.STARPORT, 27, "Second Starport"),
+                ],
             }
         
         if self.army_compositions is None:
@@ -87,10 +95,15 @@ class MilitaryConfig:
                     UnitTypeId.MARAUDER: 5,
                     UnitTypeId.MEDIVAC: 2,
                 },
-                'mech_rush': {
+                'mech': {
                     UnitTypeId.SIEGETANK: 8,
                     UnitTypeId.HELLION: 12,
                     UnitTypeId.THOR: 2,
+                },
+                'air': {
+                    UnitTypeId.VIKINGFIGHTER: 8,
+                    UnitTypeId.BANSHEE: 4,
+                    UnitTypeId.LIBERATOR: 2,
                 }
             }
 
@@ -107,8 +120,62 @@ class HeadConfig:
     enable_debug: bool = True
     log_level: str = "INFO"
     
+    # Logging pipeline (records are written by a background thread, see bot/log_pipeline.py)
+    log_queue_size: int = 10000  # Queued records before DEBUG/INFO records are dropped
+    log_keep_games: int = 50  # Compressed per-game logs kept in logs/games
+    
     # Performance settings
     step_interval: float = 0.1  # seconds
+    concurrent_managers: bool = True  # Step managers of equal priority concurrently (see managers/command_buffer.py)
+    
+    # Telemetry settings (per-step records, see telemetry/telemetry_recorder.py)
+    enable_telemetry: bool = False
+    telemetry_dir: str = "telemetry"
+    
+    # Observation recording (replayable offline, see telemetry/replay_driver.py)
+    record_observations: bool = False
+    recordings_dir: str = "recordings"
+    
+    # Map analysis cache (analysis runs once per map, see map_analysis/map_cache.py)
+    enable_map_cache: bool = True
+    map_cache_dir: str = "map_cache"
+    
+    # Cold start budget in seconds, checked by run_import_benchmark.py
+    import_budget: float = 1.5
+    
+    # Memory growth allowed per warm game in bytes, checked by run_leak_check.py
+    leak_budget: int = 64 * 1024
+    
+    # Per-manager allocation profiling, opt-in as tracing slows the bot (see telemetry/allocation_profiler.py)
+    profile_allocations: bool = False
+    allocation_frames: int = 5  # Stack frames stored per allocation
+    allocation_sample_every: int = 50  # Steps between call site snapshots
+    
+    # Sampling profiler writing a flame graph per game (see telemetry/stack_sampler.py)
+    sample_stacks: bool = False
+    sample_interval: float = 0.005  # Seconds between stack samples
+    sample_only_over: float = 0.0  # Keep only steps slower than this (seconds), 0 keeps every step
+    sample_range: float = 60.0  # Game seconds per time range in the flame graph
+    sample_format: str = "speedscope"  # "speedscope" (JSON) or "collapsed" (flamegraph.pl)
+    profiles_dir: str = "profiles"
+    
+    # Garbage collection between steps instead of inside them (see bot/gc_controller.py)
+    gc_control: bool = True
+    gc_idle_budget: float = 0.003  # Seconds of collection allowed after each step
+    gc_full_every: int = 200  # Steps after which a full collection runs even over budget
+    
+    # Adaptive game step: game loops per bot step by game phase (see bot/step_controller.py)
+    adaptive_game_step: bool = True
+    game_step_economy: int = 8
+    game_step_maneuver: int = 4
+    game_step_combat: int = 2
+    game_step_max: int = 16  # Coarsest step, also when the realtime budget asks for more
+    game_step_headroom: float = 0.8  # Share of a step's realtime budget (game_step / 22.4 s) the bot may use
+    game_step_calm_time: float = 3.0  # Game seconds without fighting before steps get coarser
+    
+    # Background analysis jobs, e.g. the threat map (see managers/analysis_executor.py)
+    analysis_workers: int = 2
+    analysis_pool: str = "thread"  # "thread" (NumPy jobs) or "process" (pure Python jobs)
 
 
 @dataclass
@@ -1,17 +1,29 @@
 """Manager modules for the bot."""
 
-# This file makes the managers directory a Python package
-# Import all manager classes here to make them easily accessible
-from .terran_economy_manager import TerranEconomyManager
-from .protoss_economy_manager import ProtossEconomyManager
-from .zerg_economy_manager import ZergEconomyManager
-from .military_manager import MilitaryManager
-from .head_manager import HeadManager
+# This file makes the managers directory a Python package.
+# Manager classes are importable from here but only loaded on first access,
+# so importing one manager module does not load every race (see registry.py).
+import importlib
+
+_LAZY = {
+    'TerranEconomyManager': '.terran_economy_manager',
+    'ProtossEconomyManager': '.protoss_economy_manager',
+    'ZergEconomyManager': '.zerg_economy_manager',
+    'MilitaryManager': '.military_manager',
+    'HeadManager': '.head_manager',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
-    'TerranEconomyManager', 
-    'ProtossEconomyManager', 
-    'ZergEconomyManager', 
-    'MilitaryManager', 
+    'TerranEconomyManager',
+    'ProtossEconomyManager',
+    'ZergEconomyManager',
+    'MilitaryManager',
     'HeadManager'
 ]
@@ -0,0 +1,223 @@
+"""Add-on aware placement and reactor/tech lab planning for Terran production.
+
+Every Barracks, Factory and Starport, built or about to be built, has a 2x2
+add-on slot on its right side (center offset (2.5, -0.5)). The slot is
+reserved: production is only placed where its own slot is free, and no
+other structure (depots included) may be placed over a reserved slot, so
+add-ons never need a structure to lift.
+
+AddonPlanner decides per structure between a reactor and a tech lab from
+the target army composition and builds it in place.
+
+USAGE:
+```python
+from managers.addon_planner import AddonPlanner, overlaps_addon_slot
+
+planner = AddonPlanner(ai)
+position = await planner.find_placement(UnitTypeId.BARRACKS, near=base_position)
+await planner.step({UnitTypeId.MARINE: 30, UnitTypeId.MARAUDER: 6})
+
+# In any other placement code
+if overlaps_addon_slot(ai, UnitTypeId.SUPPLYDEPOT, location):
+    ...
+```
+"""
+
+import math
+from typing import Dict, List, Optional
+
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+
+ADDON_OFFSET = Point2((2.5, -0.5))
+ADDON_HALF_SIZE = 1.0
+
+# Production structure -> (tech lab ability, reactor ability)
+ADDON_ABILITIES = {
+    UnitTypeId.BARRACKS: (AbilityId.BUILD_TECHLAB_BARRACKS, AbilityId.BUILD_REACTOR_BARRACKS),
+    UnitTypeId.FACTORY: (AbilityId.BUILD_TECHLAB_FACTORY, AbilityId.BUILD_REACTOR_FACTORY),
+    UnitTypeId.STARPORT: (AbilityId.BUILD_TECHLAB_STARPORT, AbilityId.BUILD_REACTOR_STARPORT),
+}
+PRODUCTION_BUILD_ABILITIES = {
+    AbilityId.TERRANBUILD_BARRACKS,
+    AbilityId.TERRANBUILD_FACTORY,
+    AbilityId.TERRANBUILD_STARPORT,
+}
+
+# Units that need a tech lab, by the structure that makes them
+TECHLAB_UNITS = {
+    UnitTypeId.BARRACKS: {UnitTypeId.MARAUDER, UnitTypeId.GHOST},
+    UnitTypeId.FACTORY: {UnitTypeId.SIEGETANK, UnitTypeId.THOR},
+    UnitTypeId.STARPORT: {UnitTypeId.RAVEN, UnitTypeId.BANSHEE, UnitTypeId.BATTLECRUISER},
+}
+# Units a reactor doubles, by the structure that makes them
+REACTOR_UNITS = {
+    UnitTypeId.BARRACKS: {UnitTypeId.MARINE, UnitTypeId.REAPER},
+    UnitTypeId.FACTORY: {UnitTypeId.HELLION, UnitTypeId.WIDOWMINE, UnitTypeId.CYCLONE},
+    UnitTypeId.STARPORT: {UnitTypeId.VIKINGFIGHTER, UnitTypeId.MEDIVAC, UnitTypeId.LIBERATOR},
+}
+
+PLACEMENT_STEP = 3  # Lattice spacing of candidate production positions
+PLACEMENT_RADIUS = 15
+
+
+def ordered_production(ai) -> List[Point2]:
+    """Positions of production structures workers have been ordered to build."""
+    return [
+        order.target for worker in ai.workers for order in worker.orders
+        if order.ability.id in PRODUCTION_BUILD_ABILITIES and isinstance(order.target, Point2)
+    ]
+
+
+def addon_slots(ai) -> List[Point2]:
+    """Add-on slot centers of every production structure, built or about to be built."""
+    positions = [structure.position for structure in ai.structures.of_type(ADDON_ABILITIES.keys())]
+    return [position.offset(ADDON_OFFSET) for position in positions + ordered_production(ai)]
+
+
+def footprint_half_size(ai, unit_type: UnitTypeId) -> float:
+    """Half the side of a structure's square footprint."""
+    ability = ai.game_data.units[unit_type.value].creation_ability
+    radius = getattr(ability._proto, 'footprint_radius', 0) if ability is not None else 0
+    return radius or 1.5
+
+
+def overlaps_addon_slot(ai, unit_type: UnitTypeId, position: Point2, slots: Optional[List[Point2]] = None) -> bool:
+    """Whether placing unit_type at position would cover a reserved add-on slot."""
+    if slots is None:
+        slots = addon_slots(ai)
+    reach = footprint_half_size(ai, unit_type) + ADDON_HALF_SIZE
+    return any(abs(position.x - slot.x) < reach and abs(position.y - slot.y) < reach for slot in slots)
+
+
+class AddonPlanner:
+    """Places production with room for add-ons and builds reactors or tech labs."""
+
+    def __init__(self, ai):
+        """Initialize the planner.
+
+        Args:
+            ai: The main bot AI instance
+        """
+        self.ai = ai
+        self.debug = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear per-game state so the planner can play another game."""
+        self.addons_started = 0
+
+    async def find_placement(self, unit_type: UnitTypeId, near: Point2,
+                             max_distance: int = PLACEMENT_RADIUS) -> Optional[Point2]:
+        """Closest position to near that keeps every add-on slot free.
+
+        Production structures also need their own add-on slot to fit. 3x3
+        candidates come from the cached map analysis when it covers this base,
+        otherwise from a lattice around near. All candidates are checked with
+        one placement query for the structure and one for the add-on slots.
+        """
+        has_addon = unit_type in ADDON_ABILITIES
+        slots = addon_slots(self.ai)
+        # Ordered structures are not on the placement grid yet
+        ordered = ordered_production(self.ai)
+        half = footprint_half_size(self.ai, unit_type)
+        filtered = []
+        for position in self._candidates(near, max_distance, half):
+            if overlaps_addon_slot(self.ai, unit_type, position, slots):
+                continue
+            blocked = [(position, half + 1.5)]
+            if has_addon:
+                addon = position.offset(ADDON_OFFSET)
+                # The new add-on slot must not cover another slot or an ordered structure
+                if any(abs(addon.x - slot.x) < 2 * ADDON_HALF_SIZE and abs(addon.y - slot.y) < 2 * ADDON_HALF_SIZE
+                       for slot in slots):
+                    continue
+                blocked.append((addon, 1.5 + ADDON_HALF_SIZE))
+            if any(abs(p.x - q.x) < reach and abs(p.y - q.y) < reach for q in ordered for p, reach in blocked):
+                continue
+            filtered.append(position)
+        if not filtered:
+            return None
+
+        fits = await self.ai.can_place(unit_type, filtered)
+        if has_addon:
+            addon_fits = await self.ai.can_place(UnitTypeId.SUPPLYDEPOT, [p.offset(ADDON_OFFSET) for p in filtered])
+        else:
+            addon_fits = fits
+        for position, fit, addon_fit in zip(filtered, fits, addon_fits):
+            if fit and addon_fit:
+                return position
+        return None
+
+    def _candidates(self, near: Point2, max_distance: int, half: float) -> List[Point2]:
+        """Candidate centers for a footprint of the given half size around near, closest first."""
+        analysis = getattr(self.ai, 'map_analysis', None)
+        if analysis is not None and half == 1.5:
+            expansion = analysis.nearest_expansion(near)
+            slots = [slot for slot in analysis.slots_for(expansion) if slot.distance_to(near) <= max_distance]
+            if slots:
+                return sorted(slots, key=lambda p: p.distance_to(near))
+
+        # Odd footprints are centered on cell centers, even ones on cell corners
+        offset = 0.5 if half % 1 else 0.0
+        center = Point2((math.floor(near.x) + offset, math.floor(near.y) + offset))
+        step = PLACEMENT_STEP if half == 1.5 else 2
+        steps = range(-max_distance, max_distance + 1, step)
+        points = [center.offset((dx, dy)) for dx in steps for dy in steps if dx * dx + dy * dy <= max_distance ** 2]
+        return sorted(points, key=lambda p: p.distance_to(near))
+
+    def wanted_techlabs(self, producer: UnitTypeId, composition: Dict[UnitTypeId, int], count: int) -> int:
+        """Tech labs wanted on count structures of a type, from the supply share of tech lab units."""
+        techlab = sum(n * self.ai.calculate_supply_cost(u) for u, n in composition.items()
+                      if u in TECHLAB_UNITS[producer])
+        reactor = sum(n * self.ai.calculate_supply_cost(u) for u, n in composition.items()
+                      if u in REACTOR_UNITS[producer])
+        if not techlab:
+            return 0
+        return min(count, max(1, round(count * techlab / (techlab + reactor))))
+
+    async def step(self, composition: Dict[UnitTypeId, int]) -> int:
+        """Start add-ons on idle production structures that have none.
+
+        Args:
+            composition: Target army composition (unit type -> count)
+
+        Returns:
+            Number of add-ons started
+        """
+        started = 0
+        for producer, (techlab_ability, reactor_ability) in ADDON_ABILITIES.items():
+            structures = self.ai.structures(producer).ready
+            if not structures:
+                continue
+            # A structure commanded earlier this step (e.g. told to train) is busy
+            received = self.ai.unit_tags_received_action
+            bare = structures.filter(lambda s: not s.has_add_on and s.is_idle and s.tag not in received)
+            if not bare:
+                continue
+            techlabs = structures.filter(lambda s: s.has_techlab).amount
+            missing_techlabs = self.wanted_techlabs(producer, composition, structures.amount) - techlabs
+
+            placeable = await self.ai.can_place(UnitTypeId.SUPPLYDEPOT, [s.add_on_position for s in bare])
+            for structure, fits in zip(bare, placeable):
+                if not fits:
+                    if self.debug:
+                        print(f"[Add-on Planner] No room for an add-on at {structure.position}")
+                    continue
+                ability = techlab_ability if missing_techlabs > 0 else reactor_ability
+                addon_type = UnitTypeId.TECHLAB if missing_techlabs > 0 else UnitTypeId.REACTOR
+                if not self.ai.can_afford(addon_type):
+                    break
+                structure(ability)
+                # Spend the resources now so later can_afford checks this step see them gone. The
+                # game data prices add-on abilities at 0, so subtract_cost=True would subtract nothing
+                cost = self.ai.calculate_cost(addon_type)
+                self.ai.minerals -= cost.minerals
+                self.ai.vespene -= cost.vespene
+                missing_techlabs -= 1
+                started += 1
+                if self.debug:
+                    print(f"[Add-on Planner] {addon_type.name} on {producer.name} at {structure.position}")
+        self.addons_started += started
+        return started
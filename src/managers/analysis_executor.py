@@ -0,0 +1,257 @@
+"""Background analysis: heavy computations run off the step, results are read later.
+
+Distance fields, threat maps and similar analyses take longer than a
+step can spend on them. The HeadManager owns one AnalysisExecutor; a
+manager submits a job under a name together with a snapshot of the state
+it needs (plain values and NumPy arrays copied on the step, never the bot
+or its Units, which are only safe on the step thread). The job runs on a
+thread or process pool while the game goes on.
+
+- Every name has a double-buffered slot. A finished job writes its result
+  to the back buffer from the worker; poll(), called by the HeadManager at
+  the start of every step, swaps it to the front. Managers read the front,
+  which stays the same for the whole step.
+- A result carries the game loop of its snapshot, so a reader knows how
+  many loops stale it is.
+- Submitting a name again supersedes its previous job: a queued job is
+  cancelled, a running one finishes but its result is dropped.
+- Nothing on the step thread waits for a job.
+
+Thread workers suit NumPy work (it releases the GIL); process workers
+suit pure Python work, with module-level job functions and picklable
+snapshots. submit_shared() hands process workers the step's units and
+grids through shared memory instead of pickling them (see
+managers/shared_snapshot.py).
+
+USAGE:
+```python
+self.head.analysis.submit('threat', compute_threat_map, threat_snapshot(self.ai))
+...
+result = self.head.analysis.result('threat')          # None until the first job finished
+if result and result.staleness(self.ai.state.game_loop) < 90:
+    use(result.value)
+```
+"""
+
+import atexit
+import logging
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from .shared_snapshot import SharedSnapshotWriter, SnapshotHandle, SnapshotOverwritten, run_on_snapshot
+
+logger = logging.getLogger('B0B.Analysis')
+
+POOL_KINDS = ('thread', 'process')
+
+
+@dataclass
+class AnalysisResult:
+    """A finished job's value with the game loop of the snapshot it was computed from."""
+
+    name: str
+    value: Any
+    game_loop: int  # Game loop of the snapshot
+    duration: float  # Wall seconds the job ran
+
+    def staleness(self, game_loop: int) -> int:
+        """Game loops between the snapshot and game_loop."""
+        return game_loop - self.game_loop
+
+
+class AnalysisSlot:
+    """Front and back buffer for one job name."""
+
+    def __init__(self):
+        self.front: Optional[AnalysisResult] = None  # Read by the managers
+        self.back: Optional[AnalysisResult] = None  # Written by the workers, None when nothing new
+        self.future: Optional[Future] = None  # Latest submitted job
+        self.generation = 0  # Incremented per submit; older jobs' results are dropped
+
+    def swap(self) -> bool:
+        """Make the newest finished result the front one (step thread only)."""
+        if self.back is None:
+            return False
+        self.front, self.back = self.back, None
+        return True
+
+
+class AnalysisExecutor:
+    """Runs analysis jobs on a worker pool and publishes their results into double-buffered slots."""
+
+    def __init__(self, ai, workers: int = 2, kind: str = 'thread'):
+        """Initialize the executor; the pool is started by the first submit.
+
+        Args:
+            ai: The main bot AI instance
+            workers: Worker threads or processes
+            kind: 'thread' or 'process'
+        """
+        if kind not in POOL_KINDS:
+            raise ValueError(f"Unknown analysis pool {kind!r}, expected one of {POOL_KINDS}")
+        self.ai = ai
+        self.workers = workers
+        self.kind = kind
+        self.debug = False
+        self._pool = None
+        self._shared: Optional[SharedSnapshotWriter] = None  # Created by the first submit_shared
+        self._lock = threading.Lock()  # Guards the back buffers against the workers
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear per-game state so the executor can serve another game; the pool stays up."""
+        self.cancel_all()
+        self.close_snapshot()
+        self.slots: Dict[str, AnalysisSlot] = {}
+        self.submitted = 0
+        self.completed = 0  # Results published to a back buffer
+        self.cancelled = 0  # Queued jobs cancelled by a newer submit
+        self.superseded = 0  # Results dropped because a newer job or step replaced their input meanwhile
+        self.failed = 0
+        self.job_time: Dict[str, float] = {}  # name -> wall seconds spent in finished jobs
+
+    def submit(self, name: str, fn: Callable, *args) -> Future:
+        """Run fn(*args) in the background and publish its result under name.
+
+        Args:
+            name: Slot the result is published to; supersedes the previous job of this name
+            fn: The job (module-level for a process pool)
+            *args: The job's snapshot of the state; must not be touched on the step afterwards
+
+        Returns:
+            The job's future
+        """
+        slot = self.slots.setdefault(name, AnalysisSlot())
+        if slot.future is not None and not slot.future.done() and slot.future.cancel():
+            self.cancelled += 1
+        slot.generation += 1
+        future = self._get_pool().submit(_timed, fn, *args)
+        future.add_done_callback(
+            lambda done, generation=slot.generation, loop=self.ai.state.game_loop:
+            self._publish(name, slot, generation, loop, done))
+        slot.future = future
+        self.submitted += 1
+        return future
+
+    def submit_shared(self, name: str, fn: Callable) -> Future:
+        """Run fn(snapshot) in the background over this step's units and grids in shared memory.
+
+        The step is copied into shared memory once however many jobs use it;
+        the job receives only a SnapshotHandle and maps it as NumPy views.
+
+        Args:
+            name: Slot the result is published to; supersedes the previous job of this name
+            fn: Module-level function taking a SharedSnapshot
+
+        Returns:
+            The job's future
+        """
+        return self.submit(name, run_on_snapshot, fn, self.snapshot())
+
+    def snapshot(self) -> SnapshotHandle:
+        """Publish this step's units and grids to shared memory (at most once per step)."""
+        if self._shared is None:
+            self._shared = SharedSnapshotWriter(self.ai)
+            self._shared.debug = self.debug
+        return self._shared.publish()
+
+    def close_snapshot(self) -> None:
+        """Unlink the shared memory snapshot; the next submit_shared creates one for the new map."""
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def poll(self) -> List[str]:
+        """Publish the results finished since the last step; called at the start of every step.
+
+        Returns:
+            Names with a new front result
+        """
+        with self._lock:
+            return [name for name, slot in self.slots.items() if slot.swap()]
+
+    def result(self, name: str) -> Optional[AnalysisResult]:
+        """The front result of name, or None if no job of that name has finished yet."""
+        slot = self.slots.get(name)
+        return slot.front if slot else None
+
+    def value(self, name: str, max_staleness: Optional[int] = None) -> Any:
+        """The front result's value, or None if there is none or it is more than max_staleness loops old."""
+        result = self.result(name)
+        if result is None:
+            return None
+        if max_staleness is not None and result.staleness(self.ai.state.game_loop) > max_staleness:
+            return None
+        return result.value
+
+    def pending(self, name: str) -> bool:
+        """True while the latest job of name is queued or running."""
+        slot = self.slots.get(name)
+        return slot is not None and slot.future is not None and not slot.future.done()
+
+    def cancel_all(self) -> None:
+        """Cancel queued jobs and drop the results of running ones."""
+        for slot in getattr(self, 'slots', {}).values():
+            if slot.future is not None and not slot.future.done():
+                slot.future.cancel()
+            slot.generation += 1
+
+    def shutdown(self) -> None:
+        """Stop the pool without waiting for running jobs; also run at process exit once a pool started."""
+        self.cancel_all()
+        self.close_snapshot()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            atexit.unregister(self.shutdown)
+
+    def summary(self) -> List[str]:
+        """One line with the job counts, then one per job name with its time."""
+        lines = [f"{self.submitted} jobs, {self.completed} published, {self.cancelled} cancelled, "
+                 f"{self.superseded} superseded, {self.failed} failed"]
+        for name, seconds in sorted(self.job_time.items(), key=lambda item: -item[1]):
+            lines.append(f"{name:<20} {seconds * 1000:9.1f} ms")
+        return lines
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.kind == 'process':
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='b0b-analysis')
+            atexit.register(self.shutdown)  # Worker processes must not outlive the runner
+        return self._pool
+
+    def _publish(self, name: str, slot: AnalysisSlot, generation: int, game_loop: int, future: Future) -> None:
+        """Done callback (worker thread): write the result to the back buffer unless superseded."""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if isinstance(error, SnapshotOverwritten):
+            with self._lock:
+                self.superseded += 1
+            return
+        if error is not None:
+            self.failed += 1
+            logger.error(f"Analysis job {name} failed: {error!r}")
+            return
+        value, duration = future.result()
+        with self._lock:
+            self.job_time[name] = self.job_time.get(name, 0.0) + duration
+            if generation != slot.generation:
+                self.superseded += 1
+                return
+            slot.back = AnalysisResult(name, value, game_loop, duration)
+            self.completed += 1
+        if self.debug:
+            print(f"[Analysis] {name} from loop {game_loop} done in {duration * 1000:.1f} ms")
+
+
+def _timed(fn: Callable, *args):
+    """Run the job and measure it where it runs (module level so process pools can pickle it)."""
+    start = time.perf_counter()
+    value = fn(*args)
+    return value, time.perf_counter() - start
@@ -0,0 +1,252 @@
+"""Per-base model shared by the economy and military managers of every race.
+
+Managers used to anchor every decision on townhalls.first, so geysers at
+other bases were never taken and only the first base was defended.
+BaseTracker, registered with the HeadManager to run before the managers,
+rebuilds one Base per townhall every step with:
+
+- Its mineral fields, free geysers and gas buildings
+- Mineral and gas saturation (assigned vs ideal harvesters)
+- Threat: enemy units within DEFENSE_RADIUS and their supply
+- Production placement slots from the cached map analysis
+- A threat map of the visible enemy units, computed in the background by
+  the HeadManager's analysis executor (see map_analysis/threat_map.py)
+
+Managers iterate the bases for gas, supply and production placement,
+defend the most threatened base, and rally at the most forward one.
+
+USAGE:
+```python
+for geyser in self.ai.bases.open_geysers():
+    ...
+threatened = self.ai.bases.threatened()
+if threatened:
+    target = threatened[0].enemies.closest_to(threatened[0].position)
+```
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from sc2.position import Point2
+from sc2.units import Units
+
+RESOURCE_RADIUS = 10  # Mineral fields and geysers closer than this to a townhall belong to it
+DEFENSE_RADIUS = 30  # Enemy units this close to a base threaten it
+PURSUIT_RADIUS = 50  # Enemy units this close to a base are worth chasing
+SUPPLY_STRUCTURE_RADIUS = 12  # Supply structures this close to a base count toward it
+OCCUPIED_RADIUS = 15  # An expansion with a townhall this close is taken
+GAS_MIN_SATURATION = 0.5  # A base takes gas once its mineral line is this full
+THREAT_MAP_INTERVAL = 22  # Game loops between threat map jobs (about a second)
+THREAT_MAP_MAX_STALENESS = 90  # Game loops after which a threat map is ignored (about four seconds)
+
+
+@dataclass
+class Base:
+    """One of our townhalls with its resources, saturation and threat."""
+
+    townhall_tag: int
+    position: Point2
+    is_ready: bool
+    expansion: Optional[int] = None  # Index into the map analysis expansions
+    minerals: List = field(default_factory=list)
+    geysers: List = field(default_factory=list)  # Geysers without a gas building of ours
+    gas_buildings: List = field(default_factory=list)
+    mineral_workers: int = 0
+    ideal_mineral_workers: int = 0
+    gas_workers: int = 0
+    ideal_gas_workers: int = 0
+    enemies: Optional[Units] = None  # Enemy units within DEFENSE_RADIUS
+    threat: float = 0.0  # Supply of those enemy units
+    slots: List[Point2] = field(default_factory=list)  # 3x3 placement slots around the base
+
+    @property
+    def saturation(self) -> float:
+        """Mineral workers over the ideal count (0 with no minerals left)."""
+        return self.mineral_workers / self.ideal_mineral_workers if self.ideal_mineral_workers else 0.0
+
+
+class BaseTracker:
+    """Rebuilds the per-base model once per step."""
+
+    priority = 0  # HeadManager step order: before every manager that reads the bases
+
+    def __init__(self, ai):
+        """Initialize the tracker.
+
+        Args:
+            ai: The main bot AI instance
+        """
+        self.ai = ai
+        self.head = None  # Will be set by HeadManager
+        self.debug = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear per-game state so the tracker can play another game."""
+        self.bases: List[Base] = []
+        self._expansions: Dict[int, Optional[int]] = {}  # townhall tag -> expansion index
+        self._slots: Dict[int, List[Point2]] = {}  # expansion index -> placement slots
+        self._next_threat_map = 0  # Game loop of the next threat map job
+
+    async def on_step(self):
+        """Refresh the bases for this step."""
+        self.update()
+        self._request_threat_map()
+
+    def update(self) -> List[Base]:
+        """Rebuild one Base per townhall."""
+        analysis = getattr(self.ai, 'map_analysis', None)
+        enemies = self.ai.enemy_units.filter(lambda u: not u.is_structure)
+        gas_buildings = self.ai.gas_buildings
+        bases = []
+        for townhall in self.ai.townhalls:
+            position = townhall.position
+            if townhall.tag not in self._expansions:
+                self._expansions[townhall.tag] = analysis.nearest_expansion(position) if analysis else None
+            expansion = self._expansions[townhall.tag]
+
+            base_gas = gas_buildings.closer_than(RESOURCE_RADIUS, position)
+            geysers = [
+                geyser for geyser in self.ai.vespene_geyser.closer_than(RESOURCE_RADIUS, position)
+                if not base_gas.closer_than(1, geyser)
+            ]
+            near = enemies.closer_than(DEFENSE_RADIUS, position) if enemies else Units([], self.ai)
+            bases.append(Base(
+                townhall_tag=townhall.tag,
+                position=position,
+                is_ready=townhall.is_ready,
+                expansion=expansion,
+                minerals=list(self.ai.mineral_field.closer_than(RESOURCE_RADIUS, position)),
+                geysers=geysers,
+                gas_buildings=list(base_gas),
+                mineral_workers=townhall.assigned_harvesters,
+                ideal_mineral_workers=townhall.ideal_harvesters,
+                gas_workers=sum(g.assigned_harvesters for g in base_gas.ready),
+                ideal_gas_workers=sum(g.ideal_harvesters for g in base_gas.ready),
+                enemies=near,
+                threat=sum(self.ai.calculate_supply_cost(u.type_id) for u in near),
+                slots=self._slots_for(expansion),
+            ))
+
+        # Drop townhalls that are gone
+        tags = {base.townhall_tag for base in bases}
+        self._expansions = {tag: e for tag, e in self._expansions.items() if tag in tags}
+        self.bases = bases
+        if self.debug and self.ai.time % 10 < 0.1:
+            summary = ', '.join(f"{b.position.rounded}: {b.saturation:.0%} threat {b.threat:.0f}" for b in bases)
+            print(f"[Base Tracker] {summary}")
+        return bases
+
+    def _request_threat_map(self) -> None:
+        """Submit a threat map job every THREAT_MAP_INTERVAL loops while enemy units are visible."""
+        game_loop = self.ai.state.game_loop
+        if self.head is None or not self.ai.enemy_units or game_loop < self._next_threat_map:
+            return
+        from map_analysis import compute_threat_map, threat_map_from_view, threat_snapshot
+
+        analysis = self.head.analysis
+        if analysis.kind == 'process':
+            # Hand the worker the step in shared memory instead of pickling the grid
+            analysis.submit_shared('threat', threat_map_from_view)
+        else:
+            analysis.submit('threat', compute_threat_map, threat_snapshot(self.ai))
+        self._next_threat_map = game_loop + THREAT_MAP_INTERVAL
+
+    def threat_map(self):
+        """The latest ThreatMap, or None if there is none from the last THREAT_MAP_MAX_STALENESS loops."""
+        if self.head is None:
+            return None
+        return self.head.analysis.value('threat', THREAT_MAP_MAX_STALENESS)
+
+    def _slots_for(self, expansion: Optional[int]) -> List[Point2]:
+        analysis = getattr(self.ai, 'map_analysis', None)
+        if analysis is None or expansion is None:
+            return []
+        if expansion not in self._slots:
+            self._slots[expansion] = analysis.slots_for(expansion)
+        return self._slots[expansion]
+
+    @property
+    def main(self) -> Optional[Base]:
+        """The base closest to our start location."""
+        if not self.bases:
+            return None
+        return min(self.bases, key=lambda b: b.position.distance_to(self.ai.start_location))
+
+    def ready(self) -> List[Base]:
+        """Finished bases, the main first."""
+        main = self.main
+        return sorted((b for b in self.bases if b.is_ready), key=lambda b: b is not main)
+
+    def closest(self, position: Point2) -> Optional[Base]:
+        """The base closest to a position."""
+        if not self.bases:
+            return None
+        return min(self.bases, key=lambda b: b.position.distance_to(position))
+
+    def open_geysers(self, min_saturation: float = GAS_MIN_SATURATION) -> List:
+        """Free geysers at finished bases whose mineral line is at least min_saturation."""
+        return [
+            geyser for base in self.ready() if base.saturation >= min_saturation
+            for geyser in base.geysers
+        ]
+
+    def threatened(self) -> List[Base]:
+        """Bases with enemy units in DEFENSE_RADIUS, the most threatened (then closest enemy) first."""
+        return sorted(
+            (b for b in self.bases if b.enemies),
+            key=lambda b: (-b.threat, min(u.distance_to(b.position) for u in b.enemies)),
+        )
+
+    def enemies_near(self, radius: float = PURSUIT_RADIUS) -> Units:
+        """Enemy units within radius of any base."""
+        return self.ai.enemy_units.filter(
+            lambda u: not u.is_structure and any(u.distance_to(b.position) < radius for b in self.bases)
+        )
+
+    def supply_order(self, unit_type) -> List[Base]:
+        """Finished bases with the fewest supply structures of a type first (the main on ties)."""
+        structures = self.ai.structures(unit_type)
+        bases = self.ready()
+        return sorted(bases, key=lambda b: structures.closer_than(SUPPLY_STRUCTURE_RADIUS, b.position).amount)
+
+    def forward(self) -> Optional[Base]:
+        """The base closest to the enemy start location."""
+        if not self.bases:
+            return None
+        goal = self.ai.enemy_start_locations[0] if self.ai.enemy_start_locations else self.ai.game_info.map_center
+        return min(self.bases, key=lambda b: b.position.distance_to(goal))
+
+    def rally_point(self, distance: float = 10) -> Optional[Point2]:
+        """Point in front of the most forward base, toward the map center."""
+        base = self.forward()
+        if base is None:
+            return None
+        return base.position.towards(self.ai.game_info.map_center, distance)
+
+    def free_expansions(self) -> List[Point2]:
+        """Expansions without a townhall, closest to any of our bases first.
+
+        Distance is the ground distance between expansions from the cached
+        map analysis when available, straight-line otherwise. Expansions the
+        latest threat map shows enemy units at come last.
+        """
+        locations = [
+            location for location in self.ai.expansion_locations_list
+            if not self.ai.townhalls.closer_than(OCCUPIED_RADIUS, location)
+        ]
+        if not self.bases:
+            return locations
+        analysis = getattr(self.ai, 'map_analysis', None)
+        owned = [b.expansion for b in self.bases if b.expansion is not None]
+        if analysis is not None and owned:
+            def distance(location):
+                return float(analysis.expansion_paths[owned, analysis.nearest_expansion(location)].min())
+        else:
+            def distance(location):
+                return min(location.distance_to(b.position) for b in self.bases)
+        threat_map = self.threat_map()
+        if threat_map is not None:
+            return sorted(locations, key=lambda location: (threat_map.threat_at(location) > 0, distance(location)))
+        return sorted(locations, key=distance)
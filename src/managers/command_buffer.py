@@ -0,0 +1,155 @@
+"""Ordered per-step command buffer for managers that step concurrently.
+
+The HeadManager runs managers of equal priority concurrently (see
+HeadManager.on_step), so their unit commands reach BotAI.do() in whatever
+order their queries happen to return. While such a stage runs, every
+command is recorded here with the manager that issued it (a context
+variable set in the manager's task), and commit() puts the stage's
+commands into ai.actions as if the managers had run one after another in
+registration order:
+
+- Commands are ordered by manager, then by the order the manager issued them;
+  every command a manager issued is kept, as a sequential run would send it
+- When two managers give the same unit an order that replaces the unit's
+  current one (move, attack, gather, a worker's build), only the later
+  manager's stays: the game would have executed that one anyway. Train,
+  add-on, research and rally commands, effects (chrono boost, MULE,
+  inject) and every structure command never replace another and are
+  never dropped
+- Costs are replayed against the minerals, gas and supply the stage
+  started with; a command the earlier managers already spent the
+  resources for is dropped, and its cost refunded, instead of failing in
+  the game
+
+USAGE:
+```python
+buffer = CommandBuffer(ai)
+buffer.begin(['economy', 'military'])
+await asyncio.gather(*(run(name) for name in ...))  # run() wraps its manager in buffer.manager(name)
+counts = buffer.commit()                               # manager name -> commands kept
+```
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger('B0B.CommandBuffer')
+
+PROTECTED_MARKERS = ('TRAIN', 'BUILD_REACTOR', 'BUILD_TECHLAB', 'RESEARCH', 'RALLY')  # Ability names that queue up
+
+_current_manager: ContextVar[Optional[str]] = ContextVar('b0b_current_manager', default=None)
+
+
+class CommandBuffer:
+    """Collects the commands of concurrently stepping managers and commits them in a fixed order."""
+
+    def __init__(self, ai):
+        """Initialize the buffer.
+
+        Args:
+            ai: The main bot AI instance
+        """
+        self.ai = ai
+        self.debug = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear per-game state so the buffer can serve another game."""
+        self.capturing = False
+        self.conflicts = 0  # Commands replaced by a later command for the same unit this game
+        self.unaffordable = 0  # Commands dropped for resources an earlier manager spent this game
+        self._order: Dict[str, int] = {}
+        self._entries: List[Tuple] = []
+        self._start = 0
+        self._budget = (0, 0, 0)
+
+    def begin(self, names: List[str]) -> None:
+        """Start recording the commands of the managers in names, committed in that order."""
+        self._order = {name: index for index, name in enumerate(names)}
+        self._entries = []
+        self._start = len(self.ai.actions)
+        self._budget = (self.ai.minerals, self.ai.vespene, self.ai.supply_left)
+        self.capturing = True
+
+    @contextmanager
+    def manager(self, name: str):
+        """Attribute the commands issued inside the block (and the tasks it starts) to manager name."""
+        token = _current_manager.set(name)
+        try:
+            yield
+        finally:
+            _current_manager.reset(token)
+
+    def record(self, action, minerals: int, vespene: int, supply: float) -> None:
+        """Note a command BotAI.do() just appended, with the resources it subtracted."""
+        name = _current_manager.get()
+        order = self._order.get(name, len(self._order))
+        self._entries.append((order, len(self._entries), action, minerals, vespene, supply))
+
+    def commit(self) -> Dict[str, int]:
+        """Rewrite the stage's commands in ai.actions in manager order, without conflicts.
+
+        Returns:
+            Manager name -> commands kept
+        """
+        self.capturing = False
+        ai = self.ai
+        recorded = {id(entry[2]) for entry in self._entries}
+        # Commands appended outside any manager (none expected) stay first, as they were
+        stage = [action for action in ai.actions[self._start:] if id(action) not in recorded]
+        entries = sorted(self._entries, key=lambda entry: (entry[0], entry[1]))
+
+        # A replacing order overrides the replacing orders other managers gave the unit before it
+        issued: Dict[int, List[Tuple[int, int]]] = {}  # unit tag -> (index, manager order) of its replacing orders
+        replaced = set()
+        for index, (order, _, action, *_costs) in enumerate(entries):
+            if not _replaces(action):
+                continue
+            earlier = issued.setdefault(action.unit.tag, [])
+            replaced.update(other for other, other_order in earlier if other_order != order)
+            earlier.append((index, order))
+
+        names = {order: name for name, order in self._order.items()}
+        counts: Dict[str, int] = {name: 0 for name in self._order}
+        minerals, vespene, supply_left = self._budget
+        for index, (order, _, action, cost_minerals, cost_vespene, cost_supply) in enumerate(entries):
+            if index in replaced:
+                self.conflicts += 1
+                self._refund(cost_minerals, cost_vespene, cost_supply)
+                if self.debug:
+                    print(f"[Commands] {names.get(order)}: {action} replaced by a later command")
+                continue
+            if (cost_minerals > 0 and cost_minerals > minerals) or (cost_vespene > 0 and cost_vespene > vespene) \
+                    or (cost_supply > 0 and cost_supply > supply_left):
+                self.unaffordable += 1
+                self._refund(cost_minerals, cost_vespene, cost_supply)
+                logger.debug(f"{names.get(order)}: dropped {action}, resources already spent this step")
+                continue
+            minerals -= cost_minerals
+            vespene -= cost_vespene
+            supply_left -= cost_supply
+            stage.append(action)
+            if order in names:
+                counts[names[order]] += 1
+
+        del ai.actions[self._start:]
+        ai.actions.extend(stage)
+        self._entries = []
+        return counts
+
+    def _refund(self, minerals: int, vespene: int, supply: float) -> None:
+        """Give back what BotAI.do() subtracted for a dropped command."""
+        self.ai.minerals += minerals
+        self.ai.vespene += vespene
+        self.ai.supply_used -= supply
+        self.ai.supply_left += supply
+
+
+def _replaces(action) -> bool:
+    """True if the command replaces the unit's current order instead of queueing up behind it."""
+    if action.queue or action.unit.is_structure:
+        return False
+    name = action.ability.name
+    return not name.startswith('EFFECT_') and not any(marker in name for marker in PROTECTED_MARKERS)
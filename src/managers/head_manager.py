@@ -4,7 +4,10 @@ Head Manager - The central coordinator for all bot managers.
 This module contains the HeadManager class that coordinates between different
 managers (Economy, Military, etc.) to make high-level strategic decisions.
 """
+import asyncio
 import logging
+import time
+from itertools import groupby
 from typing import Dict, Any, Optional, List, Type, Union
 from sc2.data import Race, Result, ActionResult
 from sc2.ids.unit_typeid import UnitTypeId
@@ -12,6 +15,11 @@ from sc2.ids.upgrade_id import UpgradeId
 from sc2.unit import Unit
 from sc2.position import Point2
 
+from config.config import config as bot_config
+
+from .analysis_executor import AnalysisExecutor
+from .command_buffer import CommandBuffer
+
 # Configure logger
 logger = logging.getLogger('B0B.HeadManager')
 
@@ -34,9 +42,64 @@ class HeadManager:
         self.managers = {}  # type: Dict[str, Any]
         self.strategy = strategy
         self.debug = debug
+        # Step managers of equal priority concurrently (their commands go through the command buffer)
+        self.concurrent_managers = True
+        self.command_buffer = CommandBuffer(ai)
+        # Heavy analyses run in the background, their results are read on later steps
+        self.analysis = AnalysisExecutor(ai, bot_config.head.analysis_workers, bot_config.head.analysis_pool)
+        self.reset()
+        self.strategies = {
+            'bio_rush': {
+                'description': 'Marine/Marauder/Medivac composition with fast expand',
+                'priority': ['economy', 'military'],
+                'conditions': {
+                    'expand_when': {'minerals': 400, 'bases': 1},
+                    'attack_when': {'supply': 30, 'upgrades': ['Stimpack']}
+                }
+            },
+            'mech': {
+                'description': 'Siege Tank/Hellion composition',
+                'priority': ['economy', 'tech', 'military'],
+                'conditions': {
+                    'expand_when': {'minerals': 500, 'bases': 1},
+                    'attack_when': {'supply': 40, 'upgrades': []}
+                }
+            },
+            'air': {
+                'description': 'Viking/Banshee/Liberator composition',
+                'priority': ['tech', 'economy', 'military'],
+                'conditions': {
+                    'expand_when': {'minerals': 600, 'bases': 2},
+                    'attack_when': {'supply': 50, 'upgrades': []}
+                }
+            }
+        }
+    
+    def reset(self) -> None:
+        """Clear per-game state so the same HeadManager can play another game.
+
+        Registered managers are reset and unregistered (the bot registers the
+        managers for the next game's race). The strategy and strategies stay.
+        """
+        for name, manager in self.managers.items():
+            if hasattr(manager, 'reset'):
+                try:
+                    manager.reset()
+                except Exception as e:
+                    logger.error(f"Error resetting {name} manager: {str(e)}", exc_info=True)
+            if hasattr(manager, '_initialized'):
+                manager._initialized = False
+        self.managers = {}  # type: Dict[str, Any]
+        self.command_buffer.reset()
+        self.analysis.reset()
         self._initialized = False
         self._last_step_time = 0.0
         self._step_count = 0
+        self.telemetry = None  # Set by the bot per game
+        self.allocation_profiler = None  # Optional AllocationProfiler, set by the bot per game
+        self.step_metrics = {}  # manager name -> wall-clock step time stats
+        self.last_step_times = {}  # manager name -> wall-clock time of the last step
+        self.last_step_actions = {}  # manager name -> actions issued in the last step
         
         # Game state tracking
         self.game_state = {
@@ -78,37 +141,12 @@ class HeadManager:
                 'supply_used': 0,
                 'supply_cap': 0,
                 'supply_blocked': False,
+                'supply_blocked_time': 0.0,
                 'is_competitive': True,
                 'map_name': '',
                 'game_loop': 0
             }
         }
-        self.strategies = {
-            'bio_rush': {
-                'description': 'Marine/Marauder/Medivac composition with fast expand',
-                'priority': ['economy', 'military'],
-                'conditions': {
-                    'expand_when': {'minerals': 400, 'bases': 1},
-                    'attack_when': {'supply': 30, 'upgrades': ['Stimpack']}
-                }
-            },
-            'mech': {
-                'description': 'Siege Tank/Hellion composition',
-                'priority': ['economy', 'tech', 'military'],
-                'conditions': {
-                    'expand_when': {'minerals': 500, 'bases': 1},
-                    'attack_when': {'supply': 40, 'upgrades': []}
-                }
-            },
-            'air': {
-                'description': 'Viking/Banshee/Liberator composition',
-                'priority': ['tech', 'economy', 'military'],
-                'conditions': {
-                    'expand_when': {'minerals': 600, 'bases': 2},
-                    'attack_when': {'supply': 50, 'upgrades': []}
-                }
-            }
-        }
     
     def register_manager(self, name: str, manager) -> None:
         """Register a manager with the HeadManager.
@@ -169,10 +207,19 @@ class HeadManager:
             
         self._step_count += 1
         current_time = self.ai.time
+        head_start = time.perf_counter()
         
+        profiler = self.allocation_profiler
         try:
+            # Results of background analyses finished since the last step become readable
+            self.analysis.poll()
+            
             # Update game state first
+            if profiler:
+                profiler.begin('state')
             self._update_game_state()
+            if profiler:
+                profiler.end('state')
             
             # Calculate time delta since last step
             time_delta = current_time - self._last_step_time
@@ -182,21 +229,24 @@ class HeadManager:
             if self._step_count % 100 == 0:
                 logger.debug(f"Step {self._step_count} at {current_time:.1f}s")
             
-            # Execute manager steps in priority order
-            for name, manager in sorted(self.managers.items(), 
-                                     key=lambda x: getattr(x[1], 'priority', 10)):
-                step_start = self.ai.time
-                try:
-                    if hasattr(manager, 'on_step'):
-                        await manager.on_step()
-                        
-                    # Log slow steps
-                    step_time = self.ai.time - step_start
-                    if step_time > 0.1:  # 100ms threshold
-                        logger.warning(f"Slow step in {name}: {step_time:.3f}s")
-                        
-                except Exception as e:
-                    logger.error(f"Error in {name}.on_step: {str(e)}", exc_info=True)
+            # Execute manager steps in priority order; managers of equal priority are independent
+            ordered = sorted(self.managers.items(), key=lambda x: getattr(x[1], 'priority', 10))
+            for _, stage in groupby(ordered, key=lambda x: getattr(x[1], 'priority', 10)):
+                stage = list(stage)
+                if len(stage) == 1 or not self.concurrent_managers or profiler:
+                    for name, manager in stage:
+                        await self._step_manager(name, manager, profiler)
+                else:
+                    await self._step_concurrently(stage)
+            
+            head_time = time.perf_counter() - head_start
+            self._record_step_time('head', head_time)
+            self.last_step_times['head'] = head_time
+            self.last_step_actions['head'] = len(self.ai.actions)
+            
+            if self.telemetry:
+                self.telemetry.set_manager('head', head_time, len(self.ai.actions))
+                self._record_telemetry()
             
         except Exception as e:
             logger.critical(f"Fatal error in HeadManager.on_step: {str(e)}", exc_info=True)
@@ -204,6 +254,55 @@ class HeadManager:
             if not self._handle_step_error(e):
                 raise
     
+    async def _step_manager(self, name: str, manager, profiler=None) -> None:
+        """Run one manager's on_step, timing it and counting its actions."""
+        if profiler:
+            profiler.begin(name)
+        step_start = time.perf_counter()
+        actions_before = len(self.ai.actions)
+        try:
+            if hasattr(manager, 'on_step'):
+                await manager.on_step()
+                
+            # Log slow steps
+            step_time = time.perf_counter() - step_start
+            if profiler:
+                profiler.end(name)
+            self._record_step_time(name, step_time)
+            self.last_step_times[name] = step_time
+            self.last_step_actions[name] = len(self.ai.actions) - actions_before
+            if self.telemetry:
+                self.telemetry.set_manager(name, step_time, self.last_step_actions[name])
+            if step_time > 0.1:  # 100ms threshold
+                logger.warning(f"Slow step in {name}: {step_time:.3f}s")
+                
+        except Exception as e:
+            logger.error(f"Error in {name}.on_step: {str(e)}", exc_info=True)
+    
+    async def _step_concurrently(self, stage: List) -> None:
+        """Run independent managers together so their game queries overlap.
+        
+        The stage takes as long as its slowest query chain instead of the sum
+        of them. Step times are wall time from the stage start, so they
+        include the time other managers of the stage ran in between. Commands
+        are committed in registration order (see managers/command_buffer.py).
+        """
+        buffer = self.command_buffer
+        buffer.begin([name for name, _ in stage])
+        
+        async def run(name, manager):
+            with buffer.manager(name):
+                await self._step_manager(name, manager)
+        
+        try:
+            await asyncio.gather(*(run(name, manager) for name, manager in stage))
+        finally:
+            counts = buffer.commit()
+        self.last_step_actions.update(counts)
+        if self.telemetry:
+            for name, count in counts.items():
+                self.telemetry.set_manager(name, actions=count)
+    
     async def on_end(self, result: Result) -> None:
         """Called when the game ends.
         
@@ -232,9 +331,78 @@ class HeadManager:
         except Exception as e:
             logger.critical(f"Fatal error in HeadManager.on_end: {str(e)}", exc_info=True)
         finally:
+            # Flush telemetry before clean up
+            if self.telemetry:
+                try:
+                    self.telemetry.close()
+                    logger.info(f"Telemetry written to {self.telemetry.path}")
+                except Exception as e:
+                    logger.error(f"Error closing telemetry: {str(e)}", exc_info=True)
+            
+            # Results of jobs still running would belong to the next game
+            self.analysis.cancel_all()
+            self.analysis.close_snapshot()
+            if self.analysis.submitted:
+                logger.info("Background analysis:")
+                for line in self.analysis.summary():
+                    logger.info(line)
+            
+            if self.allocation_profiler:
+                logger.info("Allocations per manager step:")
+                for line in self.allocation_profiler.summary():
+                    logger.info(line)
+                self.allocation_profiler.stop()
+            
             # Clean up resources
             self._cleanup()
     
+    def record_step_time(self, name: str, duration: float) -> None:
+        """Record time spent outside the managers for this step (e.g. 'gc' pauses).
+        
+        Telemetry records it with the next step, as it is measured after this one.
+        """
+        self._record_step_time(name, duration)
+        self.last_step_times[name] = duration
+        if self.telemetry:
+            self.telemetry.set_manager(name, duration)
+    
+    def _record_step_time(self, name: str, duration: float) -> None:
+        """Accumulate wall-clock step time for a manager (or 'head' for the whole step)."""
+        metrics = self.step_metrics.get(name)
+        if metrics is None:
+            metrics = self.step_metrics[name] = {'count': 0, 'total': 0.0, 'max': 0.0}
+        metrics['count'] += 1
+        metrics['total'] += duration
+        if duration > metrics['max']:
+            metrics['max'] = duration
+    
+    def _record_telemetry(self) -> None:
+        """Append this step's record to the telemetry recorder (manager columns are set as they are measured)."""
+        try:
+            economy = self.game_state['economy']
+            army_value = self.game_state['military']['army_value']
+            self.telemetry.record(
+                self.ai.time, self.ai.state.game_loop, self.ai.minerals, self.ai.vespene,
+                economy['mineral_income'], economy['gas_income'],
+                self.ai.supply_used, self.ai.supply_cap, economy['worker_count'],
+                army_value['minerals'] + army_value['vespene'],
+            )
+        except Exception as e:
+            logger.error(f"Error recording telemetry: {str(e)}", exc_info=True)
+            self.telemetry = None
+    
+    def get_step_metrics(self) -> Dict[str, Dict[str, float]]:
+        """Get wall-clock step time stats per manager, in seconds."""
+        return {
+            name: {
+                'count': m['count'],
+                'total': m['total'],
+                'mean': m['total'] / m['count'] if m['count'] else 0.0,
+                'max': m['max'],
+            }
+            for name, m in self.step_metrics.items()
+        }
+    
     def _handle_step_error(self, error: Exception) -> bool:
         """Handle errors that occur during game steps.
         
@@ -272,6 +440,11 @@ class HeadManager:
                           f"Minerals: {self.ai.minerals} | Vespene: {self.ai.vespene}")
                 logger.info(f"[ECONOMY] Collection Rate: {score.collection_rate_minerals + score.collection_rate_vespene}/min")
             
+            planner = getattr(self.managers.get('economy'), 'supply_planner', None)
+            if planner is not None:
+                logger.info(f"[ECONOMY] Supply Blocked: {planner.blocked_time:.1f}s "
+                          f"in {planner.blocked_episodes} blocks")
+            
             # Military summary
             if hasattr(self.ai, 'units') and hasattr(self.ai, 'enemy_units'):
                 logger.info(f"[MILITARY] Army Supply: {self.ai.supply_army:.1f}/200 | "
@@ -298,14 +471,11 @@ class HeadManager:
     def _cleanup(self) -> None:
         """Clean up resources."""
         try:
-            # Clear references to prevent memory leaks
+            # Managers stay registered until reset() so a warm runner can reuse them
             for name in list(self.managers.keys()):
                 if hasattr(self.managers[name], '_initialized'):
                     setattr(self.managers[name], '_initialized', False)
             
-            # Clear manager references
-            self.managers.clear()
-            
             # Reset state
             self._initialized = False
             self._step_count = 0
@@ -333,6 +503,7 @@ class HeadManager:
                 'supply_used': self.ai.supply_used,
                 'supply_cap': self.ai.supply_cap,
                 'supply_blocked': self.ai.supply_cap - self.ai.supply_used < 2,
+                'supply_blocked_time': self._supply_blocked_time(),
                 'game_loop': self.ai.state.game_loop,
                 'map_name': getattr(self.ai.game_info, 'map_name', 'unknown')
             })
@@ -488,6 +659,11 @@ class HeadManager:
         except Exception as e:
             logger.error(f"Error logging state summary: {str(e)}", exc_info=True)
     
+    def _supply_blocked_time(self) -> float:
+        """Seconds spent supply blocked so far, as tracked by the economy manager's SupplyPlanner."""
+        planner = getattr(self.managers.get('economy'), 'supply_planner', None)
+        return planner.blocked_time if planner is not None else 0.0
+    
     def _calculate_tech_level(self) -> int:
         """Calculate the current tech level (1-3)."""
         tech_level = 1
@@ -528,10 +704,10 @@ class HeadManager:
                 return 0.0
                 
             total_workers = self.ai.workers.amount
-            total_bases = self.ai.townhalls.amount
             
-            # Assume 16 workers per base is optimal saturation
-            optimal_workers = total_bases * 16
+            # Ideal harvesters reported by the game: 2 per remaining patch, 3 per active geyser
+            optimal_workers = sum(townhall.ideal_harvesters for townhall in self.ai.townhalls.ready)
+            optimal_workers += sum(building.ideal_harvesters for building in self.ai.gas_buildings.ready)
             saturation = min(total_workers / optimal_workers, 1.0) if optimal_workers > 0 else 0.0
             
             return saturation
@@ -568,6 +744,10 @@ class HeadManager:
         if strategy_name in self.strategies:
             old_strategy = self.strategy
             self.strategy = strategy_name
+            # A registered military manager follows (otherwise it gets the strategy on registration)
+            military = self.managers.get('military')
+            if military is not None and hasattr(military, 'strategy'):
+                military.strategy = strategy_name
             print(f"[Head] Strategy changed from {old_strategy} to {strategy_name}")
             return True
         return False
@@ -0,0 +1,136 @@
+"""Per-step larva budget shared by the Zerg economy and military managers.
+
+Larva is the Zerg production queue, and every manager used to take it with
+larva.random, so several managers (and several hatchery loops) could order
+the same larva in one step. Instead, managers file requests during their
+on_step and the allocator, registered with the HeadManager to run after
+them, hands out distinct larvae once per step:
+
+1. Requests are served in priority order (supply, then workers, then army)
+2. Each request gets the larvae nearest to where its units are needed
+3. A request that cannot be paid for holds back every lower-priority request
+   that needs the same resource, so priorities decide spending too
+
+USAGE:
+```python
+# In a manager's on_step
+self.ai.larva_allocator.request(UnitTypeId.DRONE, count=2, priority=PRIORITY_WORKERS,
+                                near=hatchery.position, source='economy')
+```
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sc2.ids.unit_typeid import UnitTypeId
+
+PRIORITY_SUPPLY = 30
+PRIORITY_WORKERS = 20
+PRIORITY_ARMY = 10
+
+
+@dataclass
+class LarvaRequest:
+    """Units a manager wants morphed from larva this step."""
+
+    unit_type: UnitTypeId
+    count: Optional[int]  # None: as many as larva and resources allow
+    priority: int
+    near: object = None  # Point2 the units are needed at
+    source: str = ''
+
+
+class LarvaAllocator:
+    """Collects larva requests and assigns each larva to at most one of them per step."""
+
+    priority = 100  # HeadManager step order: after every manager that files requests
+
+    def __init__(self, ai):
+        """Initialize the allocator.
+
+        Args:
+            ai: The main bot AI instance
+        """
+        self.ai = ai
+        self.head = None  # Will be set by HeadManager
+        self.debug = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear per-game state so the allocator can play another game."""
+        self.requests: List[LarvaRequest] = []
+        self.allocated: Dict[str, int] = {}  # source -> larvae allocated last step
+        self.unused = 0  # Larvae left over last step
+        self.total_allocated = 0
+        self.idle_larva_time = 0.0  # Larva-seconds spent unused
+        self._last_step = None
+
+    def request(self, unit_type: UnitTypeId, count: Optional[int] = 1, priority: int = PRIORITY_ARMY,
+                near=None, source: str = '') -> None:
+        """File a request to be served at the end of this step."""
+        if count is None or count > 0:
+            self.requests.append(LarvaRequest(unit_type, count, priority, near, source))
+
+    async def on_step(self):
+        """Serve this step's requests."""
+        try:
+            self.allocate()
+        finally:
+            self.requests = []
+
+    def allocate(self) -> int:
+        """Assign distinct larvae to the pending requests.
+
+        Returns:
+            Number of larvae given an order
+        """
+        now = self.ai.time
+        pool = {larva.tag: larva for larva in self.ai.larva if larva.tag not in self.ai.unit_tags_received_action}
+        allocated: Dict[str, int] = {}
+        supply_left = self.ai.supply_left
+        blocked_minerals = blocked_vespene = False
+
+        # Stable sort: equal priorities are served in the order they were filed
+        for request in sorted(self.requests, key=lambda r: -r.priority):
+            cost = self.ai.calculate_cost(request.unit_type)
+            supply = self.ai.calculate_supply_cost(request.unit_type)
+            if (blocked_minerals and cost.minerals) or (blocked_vespene and cost.vespene):
+                continue
+            served = 0
+            while pool and (request.count is None or served < request.count):
+                if self.ai.minerals < cost.minerals or self.ai.vespene < cost.vespene:
+                    # Keep what this request is waiting for away from lower priorities
+                    blocked_minerals |= self.ai.minerals < cost.minerals
+                    blocked_vespene |= self.ai.vespene < cost.vespene
+                    break
+                if supply > supply_left:
+                    break
+                if request.near is not None:
+                    larva = min(pool.values(), key=lambda l: l.distance_to_squared(request.near))
+                else:
+                    larva = next(iter(pool.values()))
+                del pool[larva.tag]
+                larva.train(request.unit_type)
+                supply_left -= supply
+                served += 1
+            if served:
+                allocated[request.source] = allocated.get(request.source, 0) + served
+                if self.debug:
+                    print(f"[Larva Allocator] {served} x {request.unit_type.name} for {request.source or 'unknown'}")
+
+        if self._last_step is not None:
+            self.idle_larva_time += self.unused * (now - self._last_step)
+        self._last_step = now
+        self.unused = len(pool)
+        self.allocated = allocated
+        count = sum(allocated.values())
+        self.total_allocated += count
+        return count
+
+    def metrics(self) -> Dict[str, float]:
+        """Larva usage over the game so far."""
+        return {
+            'allocated': self.total_allocated,
+            'unused': self.unused,
+            'idle_larva_time': self.idle_larva_time,
+        }
@@ -6,7 +6,7 @@ It handles army production, build orders, and basic combat control.
 
 TEMPLATE USAGE FOR OTHER BOTS:
 1. Copy this file to your bot's managers directory
-2. Customize the build_orders dictionary for your strategy
+2. Customize the build orders in config/config.py (MilitaryConfig.build_orders)
 3. Modify the _get_desired_army_composition method for your army composition
 4. Adjust the attack logic in _control_army for your combat style
 
@@ -18,17 +18,17 @@ CUSTOMIZATION POINTS:
 
 EXAMPLE CUSTOMIZATION:
 ```python
-# Add a new build order
-self.build_orders['mech_rush'] = [
+# Add a new build order (self.build_orders is BotConfig.military.build_orders)
+config.add_build_order('mech', [
     (UnitTypeId.SUPPLYDEPOT, 13, "Supply Depot at 13 supply"),
     (UnitTypeId.BARRACKS, 14, "First Barracks"),
     (UnitTypeId.FACTORY, 20, "Factory for mech units"),
     # ... more steps
-]
+])
 
 # Modify army composition
 def _get_desired_army_composition(self):
-    if self.current_strategy == "mech_rush":
+    if self.strategy == "mech":
         return {
             UnitTypeId.SIEGETANK: 8,
             UnitTypeId.HELLION: 12,
@@ -45,6 +45,18 @@ from sc2.ids.unit_typeid import UnitTypeId
 from sc2.ids.upgrade_id import UpgradeId
 from sc2.position import Point2
 
+from config.config import config as bot_config
+
+from .addon_planner import AddonPlanner
+
+# Attributes created on first use during a game (checked with hasattr), dropped by reset()
+GAME_FLAGS = (
+    '_initialized', '_build_order_initialized', '_first_depot_started', '_first_depot_completed',
+    '_last_continuous_production', 'build_order_completed', 'last_wave_time', 'wave_size_threshold',
+    'wave_cooldown',
+)
+
+
 class MilitaryManager:
     """Manages the bot's military units, production, and combat logic."""
     
@@ -58,15 +70,22 @@ class MilitaryManager:
         """
         self.ai = ai
         self.strategy = strategy  # Store the strategy
-        self.army_tags = set()  # Track all army units
-        self.attack_target = None
-        self.attack_started = False
-        self.rally_point = None
-        self.last_army_management = 0
-        self.last_upgrade_check = 0
-        self.attack_triggered = False
         self.debug = True  # Enable debug output
         self.head = head_manager  # Reference to head manager
+        self.addons = AddonPlanner(ai)  # Add-on aware placement, reactors and tech labs
+        self.attack_interval = 30  # seconds between attacks
+        
+        # Build orders per strategy, shared with BotConfig so tuned orders (see
+        # simulation/economy_simulator.py) are the ones played
+        self.build_orders = bot_config.military.build_orders
+        self.reset()
+    
+    def reset(self):
+        """Clear per-game state so the manager can play another game."""
+        # Flags set on first use during a game
+        for name in GAME_FLAGS:
+            self.__dict__.pop(name, None)
+        self.addons.reset()
         
         # Tech requirements
         self.tech_buildings = {
@@ -75,37 +94,17 @@ class MilitaryManager:
             'starport_tech': False  # Reactor on Starport
         }
         
-        # Build order definitions
-        self.build_orders = {
-            'bio_rush': [
-                (UnitTypeId.SUPPLYDEPOT, 13, "Supply Depot at 13 supply"),
-                (UnitTypeId.BARRACKS, 14, "First Barracks at 14 supply"),
-                (UnitTypeId.BARRACKS, 19, "Second Barracks"),
-                (UnitTypeId.STARPORT, 22, "Starport for air units"),
-                # Delay second refinery until after first attack wave
-                (UnitTypeId.BARRACKS, 23, "Third Barracks"),
-                (UnitTypeId.ENGINEERINGBAY, 25, "Engineering Bay for upgrades"),
-                # Removed Command Center - EconomyManager handles expansion
-                # Removed Refinery - EconomyManager handles gas
-                # Removed Bunker - EconomyManager handles bunker for gas micro
-            ],
-            'mech': [
-                # Different build order for mech strategy
-            ],
-            'air': [
-                # Different build order for air strategy
-            ]
-        }
-        
         # Current build order state
         self.build_order = []
+        self.build_order_triggers = []  # Supply trigger for each build order step
         self.current_build_index = 0
         self.last_supply_check = 0
         self.last_attack_time = 0
-        self.attack_interval = 30  # seconds between attacks
         self.build_order_started = False
         self.last_build_attempt = 0
         self.build_attempts = {}  # Track failed build attempts
+        self.last_upgrade_check = 0
+        self.attack_triggered = False
         
         # Army management
         self.army_tags = set()  # Track all army units
@@ -123,9 +122,7 @@ class MilitaryManager:
             
         # Set initial rally point towards the enemy
         if self.ai.townhalls:
-            self.rally_point = self.ai.townhalls.first.position.towards(
-                self.ai.game_info.map_center, 10
-            )
+            self.rally_point = self.ai.bases.rally_point(10)
         
         # Set initialized flag first to prevent recursive calls
         self._initialized = True
@@ -202,11 +199,8 @@ class MilitaryManager:
                 if self.debug and self.ai.time % 10 < 0.1:  # Log every 10 seconds
                     print("[Military] No build order available, waiting...")
             
-            # Build tech lab if scheduled and barracks is ready
-            # REMOVED - No tech needed for simple marine build
-            
-            # Build reactors on other barracks for increased production
-            # REMOVED - No reactors needed for simple marine build
+            # Reactors and tech labs on idle production, in the slots kept free at placement
+            await self.addons.step(self._get_desired_army_composition())
             
             # Continuous production logic - always run regardless of build order status
             await self._continuous_production()
@@ -220,9 +214,7 @@ class MilitaryManager:
             # Control army units
             await self._control_army()
             
-            # Emergency supply depot if we're supply blocked
-            if self.ai.supply_left < 2 and self.ai.supply_cap < 200:
-                await self._emergency_supply()
+            # Supply depots are planned by the economy manager's SupplyPlanner
                 
         except Exception as e:
             if self.debug:
@@ -235,14 +227,16 @@ class MilitaryManager:
         try:
             # Use the build order from the build_orders dictionary
             if self.strategy in self.build_orders:
-                # Convert the build order format from (unit_type, supply, description) to just unit_type
+                # Split the build order format from (unit_type, supply, description) into types and triggers
                 self.build_order = [step[0] for step in self.build_orders[self.strategy]]
+                self.build_order_triggers = [step[1] for step in self.build_orders[self.strategy]]
                 if self.debug:
                     print(f"[Military] Using build order for strategy: {self.strategy}")
                     print(f"[Military] Build order: {[step[2] for step in self.build_orders[self.strategy]]}")
             else:
                 # Fallback to bio_rush if strategy not found
                 self.build_order = [step[0] for step in self.build_orders['bio_rush']]
+                self.build_order_triggers = [step[1] for step in self.build_orders['bio_rush']]
                 if self.debug:
                     print(f"[Military] Strategy {self.strategy} not found, using bio_rush")
             
@@ -266,6 +260,11 @@ class MilitaryManager:
             # Get current build step
             unit_type = self.build_order[self.current_build_index]
             
+            # Wait for the step's supply trigger (the timings tuned by the economy simulator)
+            if self.current_build_index < len(self.build_order_triggers):
+                if self.ai.supply_used < self.build_order_triggers[self.current_build_index]:
+                    return
+            
             # Try to build the structure
             if await self._try_build_structure(unit_type):
                 # Move to next step
@@ -277,37 +276,6 @@ class MilitaryManager:
             if self.debug:
                 print(f"[Military] Error in _execute_build_order: {e}")
     
-    async def _add_tech_lab_to_first_barracks(self):
-        """Add a tech lab to the first barracks for research capabilities."""
-        try:
-            # Add cooldown to prevent mass flying
-            current_time = self.ai.time
-            if hasattr(self, '_last_tech_lab_attempt') and current_time - self._last_tech_lab_attempt < 5:
-                return False
-            self._last_tech_lab_attempt = current_time
-            
-            # Find the first barracks that doesn't have a tech lab
-            for barrack in self.ai.structures(UnitTypeId.BARRACKS).ready:
-                if not barrack.has_add_on and self.ai.can_afford(UnitTypeId.BARRACKSTECHLAB):
-                    # Check if barracks can lift off and move to make room
-                    if barrack.is_ready and not barrack.orders:
-                        # Try to lift off and move slightly to make room
-                        barrack(AbilityId.LIFT_BARRACKS)
-                        if self.debug:
-                            print(f"[Military] Lifting barracks at {barrack.position} to make room for tech lab")
-                    else:
-                        # Try to build tech lab directly
-                        barrack(AbilityId.BUILD_TECHLAB_BARRACKS)
-                        if self.debug:
-                            print("[Military] Adding tech lab to first barracks")
-                    return True
-            return False
-            
-        except Exception as e:
-            if self.debug:
-                print(f"[Military] Error adding tech lab to barracks: {e}")
-            return False
-    
     async def _try_build_structure(self, unit_type):
         """Try to build a structure with better placement logic."""
         try:
@@ -327,6 +295,12 @@ class MilitaryManager:
                 if self.debug:
                     print(f"[Military] Cannot afford {unit_type}")
                 return False
+            
+            # Wait for the structure's tech requirement, e.g. a Factory before a Starport
+            if self.ai.tech_requirement_progress(unit_type) < 1:
+                if self.debug:
+                    print(f"[Military] Tech requirement for {unit_type} not finished")
+                return False
                 
             # Check if we have a townhall to build near
             if not self.ai.townhalls:
@@ -386,10 +360,16 @@ class MilitaryManager:
             return False
     
     async def _get_strategic_placement(self, unit_type):
-        """Get strategic placement position for different structure types."""
+        """Get strategic placement position, trying the main first and then the other bases."""
+        for base in self.ai.bases.ready():
+            placement = await self._get_base_placement(unit_type, base.position)
+            if placement:
+                return placement
+        return None
+    
+    async def _get_base_placement(self, unit_type, base_position):
+        """Get strategic placement position for different structure types around one base."""
         try:
-            townhall = self.ai.townhalls.first
-            base_position = townhall.position
             map_center = self.ai.game_info.map_center
             
             # Calculate forward direction (towards map center)
@@ -426,30 +406,25 @@ class MilitaryManager:
                 return None
                 
             else:
-                # Default placement near base
-                return await self.ai.find_placement(unit_type, near=base_position, placement_step=2)
+                # Default placement near base, clear of add-on slots
+                return await self.addons.find_placement(unit_type, base_position)
                 
         except Exception as e:
             if self.debug:
-                print(f"[Military] Error in _get_strategic_placement: {e}")
+                print(f"[Military] Error in _get_base_placement: {e}")
             return None
     
     async def _get_supply_depot_placement(self, base_position, forward_direction):
         """Get placement for supply depots."""
         try:
-            # Simple placement near base
-            placement = await self.ai.find_placement(
-                UnitTypeId.SUPPLYDEPOT,
-                near=base_position,
-                placement_step=2,
-                max_distance=8
-            )
+            # Simple placement near base, clear of add-on slots
+            placement = await self.addons.find_placement(UnitTypeId.SUPPLYDEPOT, base_position, max_distance=8)
             
             if placement:
                 return placement
                 
             # Fallback to near base
-            return await self.ai.find_placement(UnitTypeId.SUPPLYDEPOT, near=base_position, placement_step=2)
+            return await self.addons.find_placement(UnitTypeId.SUPPLYDEPOT, base_position)
             
         except Exception as e:
             if self.debug:
@@ -457,30 +432,20 @@ class MilitaryManager:
             return None
     
     async def _get_barracks_placement(self, base_position, forward_direction):
-        """Get placement for barracks."""
+        """Get placement for barracks with room for an add-on."""
         try:
             # Simple placement near base
-            placement = await self.ai.find_placement(
-                UnitTypeId.BARRACKS,
-                near=base_position,
-                placement_step=2,
-                max_distance=10
-            )
+            placement = await self.addons.find_placement(UnitTypeId.BARRACKS, base_position, max_distance=10)
             
-            if placement and await self.ai.can_place(UnitTypeId.BARRACKS, placement):
+            if placement:
                 if self.debug:
                     print(f"[Military] Found barracks placement at {placement}")
                 return placement
             
             # Fallback: try any valid placement near the base
-            fallback_placement = await self.ai.find_placement(
-                UnitTypeId.BARRACKS,
-                near=base_position,
-                placement_step=3,
-                max_distance=15
-            )
+            fallback_placement = await self.addons.find_placement(UnitTypeId.BARRACKS, base_position, max_distance=15)
             
-            if fallback_placement and await self.ai.can_place(UnitTypeId.BARRACKS, fallback_placement):
+            if fallback_placement:
                 if self.debug:
                     print(f"[Military] Found fallback barracks placement at {fallback_placement}")
                 return fallback_placement
@@ -493,23 +458,18 @@ class MilitaryManager:
             return None
     
     async def _get_factory_placement(self, base_position, forward_direction):
-        """Get placement for factories in production area."""
+        """Get placement for factories in production area, with room for an add-on."""
         try:
             # Place factories closer to base
             factory_area = base_position + forward_direction * 4 + Point2((0, 4))  # Reduced distances
             
-            placement = await self.ai.find_placement(
-                UnitTypeId.FACTORY,
-                near=factory_area,
-                placement_step=2,
-                max_distance=6  # Reduced from 10
-            )
+            placement = await self.addons.find_placement(UnitTypeId.FACTORY, factory_area, max_distance=6)
             
             if placement:
                 return placement
                 
             # Fallback to near base
-            return await self.ai.find_placement(UnitTypeId.FACTORY, near=base_position, placement_step=2)
+            return await self.addons.find_placement(UnitTypeId.FACTORY, base_position)
             
         except Exception as e:
             if self.debug:
@@ -517,23 +477,18 @@ class MilitaryManager:
             return None
     
     async def _get_starport_placement(self, base_position, forward_direction):
-        """Get placement for Starports."""
+        """Get placement for Starports, with room for an add-on."""
         try:
             # Place starports near barracks but not blocking them
             starport_position = base_position + forward_direction * 8 + Point2((4, 0))
             
-            placement = await self.ai.find_placement(
-                UnitTypeId.STARPORT,
-                near=starport_position,
-                placement_step=2,
-                max_distance=6
-            )
+            placement = await self.addons.find_placement(UnitTypeId.STARPORT, starport_position, max_distance=6)
             
             if placement:
                 return placement
                 
             # Fallback to near base
-            return await self.ai.find_placement(UnitTypeId.STARPORT, near=base_position, placement_step=2)
+            return await self.addons.find_placement(UnitTypeId.STARPORT, base_position)
             
         except Exception as e:
             if self.debug:
@@ -546,18 +501,14 @@ class MilitaryManager:
             # Place Engineering Bay away from refinery paths
             engineering_bay_position = base_position + forward_direction * 5 + Point2((0, 4))  # Reduced distances
             
-            placement = await self.ai.find_placement(
-                UnitTypeId.ENGINEERINGBAY,
-                near=engineering_bay_position,
-                placement_step=2,
-                max_distance=6  # Reduced from 10
-            )
+            placement = await self.addons.find_placement(UnitTypeId.ENGINEERINGBAY, engineering_bay_position,
+                                                         max_distance=6)
             
             if placement:
                 return placement
                 
             # Fallback to near base
-            return await self.ai.find_placement(UnitTypeId.ENGINEERINGBAY, near=base_position, placement_step=2)
+            return await self.addons.find_placement(UnitTypeId.ENGINEERINGBAY, base_position)
             
         except Exception as e:
             if self.debug:
@@ -595,8 +546,13 @@ class MilitaryManager:
                     
                 # Find suitable production facility - ONLY BARRACKS
                 if unit_type == UnitTypeId.MARINE:
-                    for barrack in self.ai.structures(UnitTypeId.BARRACKS).idle:
-                        if self.ai.can_afford(UnitTypeId.MARINE):
+                    # A reactor runs two queues; building an add-on fills the only one
+                    for barrack in self.ai.structures(UnitTypeId.BARRACKS).ready:
+                        # A barracks given an add-on this step cannot train until it is done
+                        if barrack.tag in self.ai.unit_tags_received_action:
+                            continue
+                        queues = 2 if barrack.has_reactor else 1
+                        if len(barrack.orders) < queues and self.ai.can_afford(UnitTypeId.MARINE):
                             barrack.train(UnitTypeId.MARINE)
                             if self.debug:
                                 print(f"[Military] Training {unit_type}")
@@ -622,41 +578,6 @@ class MilitaryManager:
         # No upgrades needed for simple marine build
         pass
     
-    async def _emergency_supply(self):
-        """Build emergency supply depots if we're close to being supply blocked."""
-        try:
-            if (self.ai.supply_left < 3 and 
-                self.ai.already_pending(UnitTypeId.SUPPLYDEPOT) == 0 and
-                self.ai.can_afford(UnitTypeId.SUPPLYDEPOT)):
-                
-                # Find a location near the command center
-                for cc in self.ai.townhalls.ready:
-                    # Get position away from the map center, but not towards natural
-                    pos = cc.position.towards(self.ai.game_info.map_center, 8)
-                    
-                    # Try to find a valid placement location
-                    location = await self.ai.find_placement(
-                        UnitTypeId.SUPPLYDEPOT,
-                        near=pos,
-                        placement_step=3,
-                        max_distance=12
-                    )
-                    
-                    if location:
-                        worker = self.ai.select_build_worker(location)
-                        if worker:
-                            worker.build(UnitTypeId.SUPPLYDEPOT, location)
-                            if self.debug:
-                                print("[Military] Building emergency Supply Depot")
-                            return True
-            return False
-        except Exception as e:
-            if self.debug:
-                print(f"[Military] Error in _emergency_supply: {e}")
-                import traceback
-                traceback.print_exc()
-            return False
-    
     def _update_army_composition(self):
         """Update the count of each unit type in the army."""
         # Define combat unit types
@@ -722,11 +643,9 @@ class MilitaryManager:
                     print("[Military] No army units available")
                 return
                 
-            # Set rally point if not set
-            if not self.rally_point and self.ai.townhalls:
-                self.rally_point = self.ai.townhalls.first.position.towards(
-                    self.ai.game_info.map_center, 15
-                )
+            # Rally in front of the most forward base, which moves as we expand
+            if self.ai.townhalls:
+                self.rally_point = self.ai.bases.rally_point(15)
             
             # Find enemy units and structures
             enemies = self.ai.enemy_units | self.ai.enemy_structures
@@ -735,6 +654,17 @@ class MilitaryManager:
             army_size = army.amount
             current_time = self.ai.time
             
+            # Defend the most threatened base before anything else
+            threatened = self.ai.bases.threatened()
+            if threatened:
+                base = threatened[0]
+                closest_enemy = base.enemies.closest_to(base.position)
+                for unit in army:
+                    unit.attack(closest_enemy)
+                if self.debug and current_time % 5 < 0.1:
+                    print(f"[Military] DEFENDING base at {base.position} against {base.enemies.amount} enemy units")
+                return
+            
             # Initialize wave timing if not set
             if not hasattr(self, 'last_wave_time'):
                 self.last_wave_time = 0
@@ -876,12 +806,9 @@ class MilitaryManager:
         try:
             # Calculate rally point towards the enemy (forward position)
             if self.ai.townhalls:
-                base_position = self.ai.townhalls.first.position
-                map_center = self.ai.game_info.map_center
-                
-                # Rally point is towards the map center from our base, at a reasonable distance
+                # Rally point is towards the map center from our most forward base, at a reasonable distance
                 # This ensures units gather in a forward position for attacks
-                rally_point = base_position.towards(map_center, 10)
+                rally_point = self.ai.bases.rally_point(10)
                 
                 # Set rally point for all barracks
                 for barrack in self.ai.structures(UnitTypeId.BARRACKS).ready:
@@ -895,62 +822,6 @@ class MilitaryManager:
             if self.debug:
                 print(f"[Military] Error setting barracks rally points: {e}")
 
-    async def _add_reactors_to_barracks(self):
-        """Add reactors to barracks for increased production."""
-        try:
-            # Add cooldown to prevent all barracks from flying at once
-            current_time = self.ai.time
-            if hasattr(self, '_last_reactor_attempt') and current_time - self._last_reactor_attempt < 3:
-                return
-            self._last_reactor_attempt = current_time
-            
-            # Find barracks without reactors
-            barracks_without_reactors = self.ai.structures(UnitTypeId.BARRACKS).filter(lambda b: not b.has_add_on)
-            
-            # Only work on one barracks at a time to prevent mass flying
-            for barrack in barracks_without_reactors:
-                if self.ai.can_afford(UnitTypeId.REACTOR):
-                    # Try to build reactor directly first (since we placed barracks with space)
-                    if barrack.is_ready and not barrack.orders:
-                        barrack.build(UnitTypeId.REACTOR)
-                        if self.debug:
-                            print(f"[Military] Building reactor on barracks at {barrack.position}")
-                        break  # Only work on one barracks at a time
-                    else:
-                        # If direct build fails, try lifting and moving
-                        if barrack.is_ready and not barrack.orders:
-                            barrack(AbilityId.LIFT_BARRACKS)
-                            if self.debug:
-                                print(f"[Military] Lifting barracks at {barrack.position} to make room for reactor")
-                        break  # Only work on one barracks at a time
-            
-            # Handle flying barracks - land them and build add-ons
-            flying_barracks = self.ai.structures(UnitTypeId.BARRACKSFLYING)
-            for flying_barrack in flying_barracks:
-                if not flying_barrack.orders:  # Not already doing something
-                    # Find a good landing spot near the original position
-                    landing_position = flying_barrack.position
-                    placement = await self.ai.find_placement(
-                        UnitTypeId.BARRACKS,
-                        near=landing_position,
-                        placement_step=1,
-                        max_distance=3
-                    )
-                    
-                    if placement:
-                        flying_barrack(AbilityId.LAND_BARRACKS, placement)
-                        if self.debug:
-                            print(f"[Military] Landing flying barracks at {placement}")
-                    else:
-                        # Fallback - land at current position
-                        flying_barrack(AbilityId.LAND_BARRACKS, flying_barrack.position)
-                        if self.debug:
-                            print(f"[Military] Landing flying barracks at current position")
-                    
-        except Exception as e:
-            if self.debug:
-                print(f"[Military] Error adding reactors to barracks: {e}")
-
     async def _attack_with_army(self):
         """Send army to attack enemy base."""
         try:
@@ -0,0 +1,171 @@
+"""Orbital Commands, MULEs and scans for the Terran economy manager.
+
+Command centers are morphed to Orbital Commands once a Barracks is ready,
+whenever one is idle and the morph is affordable. The scheduler steps before
+SCV training, so the morph gets the command center first; SCV production is
+never held for it, as nothing would keep the minerals for the morph.
+
+Orbital energy goes to MULEs as soon as there are 50 to spare. A MULE is
+dropped on the best free patch of the most saturated mineral line: rich
+patches first, then the fullest patch close to the townhall. Scans take
+priority: other managers call request_scan(), and cloaked enemies seen near
+our units request one automatically. A request waits for energy until it
+expires. Once the enemy has shown cloaking
+tech, 50 energy is kept in reserve for a scan.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+
+CALLDOWN_ENERGY = 50  # MULE and scan both cost 50 energy
+MULE_DURATION = 64.0
+MULE_YIELD = 225  # Minerals a MULE mines over its lifetime on a normal patch
+SCAN_COOLDOWN = 10.0  # Seconds between automatic scans
+SCAN_REQUEST_TIMEOUT = 20.0  # Seconds a scan request waits for energy
+CLOAK_SCAN_RANGE = 15.0  # Cloaked enemies this close to our units trigger a scan
+
+RICH_MINERALS = {
+    UnitTypeId.RICHMINERALFIELD,
+    UnitTypeId.RICHMINERALFIELD750,
+    UnitTypeId.PURIFIERRICHMINERALFIELD,
+    UnitTypeId.PURIFIERRICHMINERALFIELD750,
+}
+
+# Enemy units and structures that mean cloaked units are on the way
+CLOAK_THREATS = {
+    UnitTypeId.DARKSHRINE,
+    UnitTypeId.DARKTEMPLAR,
+    UnitTypeId.BANSHEE,
+    UnitTypeId.GHOST,
+    UnitTypeId.GHOSTACADEMY,
+    UnitTypeId.LURKERDENMP,
+    UnitTypeId.LURKERMP,
+    UnitTypeId.LURKERMPBURROWED,
+    UnitTypeId.MOTHERSHIP,
+}
+
+
+class OrbitalScheduler:
+    """Morphs Orbital Commands and spends their energy on MULEs and scans."""
+
+    def __init__(self, ai, distributor):
+        """Initialize the scheduler.
+
+        Args:
+            ai: The main bot AI instance
+            distributor: WorkerDistributor, for mineral line saturation
+        """
+        self.ai = ai
+        self.distributor = distributor
+        self.debug = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear per-game state so the scheduler can play another game."""
+        self.scan_reserve = False  # Set once the enemy has shown cloaking tech
+        self.scan_requests: List[Tuple[Point2, float]] = []  # (position, game time it expires)
+        self.mules = 0
+        self.scans = 0
+        self._mule_until: Dict[int, float] = {}  # patch tag -> game time its MULE expires
+        self._last_scan = -SCAN_COOLDOWN
+
+    def step(self) -> None:
+        """Morph due command centers, then cast scans and MULEs."""
+        self._update_threats()
+        self._morph()
+        orbitals = self.ai.structures(UnitTypeId.ORBITALCOMMAND).ready
+        if not orbitals:
+            return
+        casters = sorted(orbitals, key=lambda o: -o.energy)
+        casters = self._scan(casters)
+        self._drop_mules(casters)
+
+    def request_scan(self, position: Point2, timeout: float = SCAN_REQUEST_TIMEOUT) -> None:
+        """Ask for a scan at a position; it is cast on the next step energy allows, within timeout seconds."""
+        self.scan_requests.append((position, self.ai.time + timeout))
+
+    def _orbital_unlocked(self) -> bool:
+        return bool(self.ai.structures.of_type({UnitTypeId.BARRACKS, UnitTypeId.BARRACKSFLYING}).ready)
+
+    def _morph(self) -> None:
+        if not self._orbital_unlocked():
+            return
+        for townhall in self.ai.townhalls.ready.of_type(UnitTypeId.COMMANDCENTER).idle:
+            if not self.ai.can_afford(UnitTypeId.ORBITALCOMMAND):
+                break
+            # Spend the 150 minerals now so the next command center's check sees them gone
+            townhall(AbilityId.UPGRADETOORBITAL_ORBITALCOMMAND, subtract_cost=True)
+            if self.debug:
+                print(f"[Orbital Scheduler] Morphing Orbital Command at {townhall.position}")
+
+    def _update_threats(self) -> None:
+        """Request scans on cloaked enemies near our units and note cloaking tech."""
+        enemies = self.ai.enemy_units | self.ai.enemy_structures
+        if not self.scan_reserve and enemies.of_type(CLOAK_THREATS):
+            self.scan_reserve = True
+            if self.debug:
+                print("[Orbital Scheduler] Enemy cloaking tech seen, keeping scan energy")
+
+        if self.ai.time - self._last_scan < SCAN_COOLDOWN or self.scan_requests:
+            return
+        cloaked = self.ai.enemy_units.filter(lambda u: u.is_cloaked and not u.is_revealed)
+        if not cloaked:
+            return
+        own = self.ai.units | self.ai.structures
+        for enemy in cloaked:
+            if own.closer_than(CLOAK_SCAN_RANGE, enemy):
+                self.request_scan(enemy.position)
+                break
+
+    def _scan(self, casters: List) -> List:
+        """Cast pending scans; returns the casters left for MULEs.
+
+        Requests without energy to serve them wait for a later step until they expire.
+        """
+        now = self.ai.time
+        self.scan_requests = [(position, expires) for position, expires in self.scan_requests if expires > now]
+        while self.scan_requests and casters and casters[0].energy >= CALLDOWN_ENERGY:
+            position, _ = self.scan_requests.pop(0)
+            casters[0](AbilityId.SCANNERSWEEP_SCAN, position)
+            self._last_scan = now
+            self.scans += 1
+            casters = casters[1:]
+        return casters
+
+    def _drop_mules(self, casters: List) -> None:
+        now = self.ai.time
+        self._mule_until = {tag: t for tag, t in self._mule_until.items() if t > now}
+        reserve = CALLDOWN_ENERGY if self.scan_reserve else 0
+        for index, orbital in enumerate(casters):
+            # Only the first (fullest) orbital keeps the scan reserve
+            spare = orbital.energy - (reserve if index == 0 else 0)
+            if spare < CALLDOWN_ENERGY:
+                continue
+            patch = self._mule_patch()
+            if patch is None:
+                return
+            orbital(AbilityId.CALLDOWNMULE_CALLDOWNMULE, patch)
+            self._mule_until[patch.tag] = now + MULE_DURATION
+            self.mules += 1
+            if self.debug:
+                print(f"[Orbital Scheduler] MULE on {patch.type_id.name} at {patch.position}")
+
+    def _mule_patch(self) -> Optional[object]:
+        """Best patch without a MULE in the most saturated mineral line."""
+        sites = [site for site in self.distributor.sites.values() if not site.is_gas]
+        if not sites:
+            return None
+        fields = {field.tag: field for field in self.ai.mineral_field}
+        for site in sorted(sites, key=lambda s: len(s.workers) / max(s.capacity, 1), reverse=True):
+            candidates = [
+                fields[patch.tag] for patch in site.targets
+                if patch.tag in fields and patch.tag not in self._mule_until
+                and fields[patch.tag].mineral_contents >= MULE_YIELD
+            ]
+            if candidates:
+                # site.targets is sorted by distance to the townhall, so ties go to the closer patch
+                return max(candidates, key=lambda p: (p.type_id in RICH_MINERALS, p.mineral_contents // 200))
+        return None
@@ -3,6 +3,11 @@
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.position import Point2
 
+from .mineral_miner import MineralMiner
+from .supply_planner import SupplyPlanner
+from .worker_distributor import WorkerDistributor
+from .worker_planner import WorkerPlanner
+
 class ProtossEconomyManager:
     """Manages the Protoss bot's economy including probes, resources, and gas mining."""
     
@@ -10,29 +15,34 @@ class ProtossEconomyManager:
         """Initialize the ProtossEconomyManager with a reference to the main AI object."""
         self.ai = ai
         self.head = None  # Will be set by HeadManager
-        self.worker_ratio = 24  # Target probe count per nexus
         self.gas_workers_per_assimilator = 3  # Protoss uses 3 probes per assimilator
-        self.supply_buffer = 8  # Pylon buffer to avoid supply block
         self.expand_when_minerals = 500  # When to expand
         self.min_time_before_expand = 0  # Can expand immediately
+        self.debug = True  # Enable debug output
+        
+        # Mineral line and assimilator saturation, updated incrementally
+        self.worker_distributor = WorkerDistributor(ai, gas_workers_per_building=self.gas_workers_per_assimilator)
+        self.mineral_miner = MineralMiner(ai, self.worker_distributor)
+        self.worker_planner = WorkerPlanner(ai, self.worker_distributor)
+        self.supply_planner = SupplyPlanner(ai, UnitTypeId.PYLON)
+        self.reset()
+
+    def reset(self):
+        """Clear per-game state so the manager can play another game."""
         self.assimilator_started = set()  # Track started assimilators
         self.last_pylon_time = 0
         self.last_probe_train_time = 0
-        self.last_worker_distribution = 0
         self.last_pylon_attempt = 0  # Track last pylon attempt time
         self.pylon_attempt_count = 0  # Count consecutive pylon attempts
-        self.debug = True  # Enable debug output
         self.building_placement_attempts = {}  # Track building placement attempts
         self.first_pylon_built = False  # Track if first pylon is built
-        
-        # Track probe assignments to assimilators
-        self.assimilator_assignments = {}  # assimilator_tag -> set of probe_tags
-        self.probe_assimilator_map = {}   # probe_tag -> assimilator_tag
+        for component in (self.worker_distributor, self.mineral_miner, self.worker_planner, self.supply_planner):
+            component.reset()
 
     async def on_start(self):
         """Called once at the start of the game."""
         print("Protoss Economy Manager initialized")
-        await self.ai.distribute_workers()
+        self.worker_distributor.update()
 
     async def on_step(self):
         current_time = self.ai.time
@@ -49,6 +59,7 @@ class ProtossEconomyManager:
                 await self.train_probes(nexus)
 
             # Build pylon
+            self.supply_planner.update()
             await self.build_pylon()
 
             # Build assimilators
@@ -57,11 +68,12 @@ class ProtossEconomyManager:
             # Manage gas probes
             await self.manage_gas_probes()
             
-            # Distribute workers periodically
-            if current_time - self.last_worker_distribution > 10.0:
-                await self.ai.distribute_workers()
-                self.last_worker_distribution = current_time
-
+            # Send surplus probes to a base about to finish
+            self.worker_planner.step()
+            
+            # Precise gather/return commands for mineral probes
+            self.mineral_miner.step()
+            
             # Check if we should expand
             if (self.head and self.head.should_expand() and current_time > self.min_time_before_expand and self.ai.minerals > self.expand_when_minerals):
                 await self.expand_now()
@@ -75,9 +87,9 @@ class ProtossEconomyManager:
     async def train_probes(self, structure):
         """Train probes from the specified structure if below target probe count."""
         if (structure.is_idle and 
-            self.ai.supply_workers < self.ai.townhalls.amount * self.worker_ratio and 
             self.ai.can_afford(UnitTypeId.PROBE) and
-            self.ai.supply_left > 0):  # Don't train if we're supply blocked
+            self.ai.supply_left > 0 and  # Don't train if we're supply blocked
+            self.worker_planner.claim()):  # Below the saturation target of our bases
             structure.train(UnitTypeId.PROBE)
             return True
         return False
@@ -94,10 +106,8 @@ class ProtossEconomyManager:
         if current_time - self.last_pylon_attempt > 10.0:
             self.pylon_attempt_count = 0
             
-        # Check if we need supply - be more aggressive
-        if (self.ai.supply_left >= self.supply_buffer or 
-            self.ai.supply_cap >= 200 or 
-            self.ai.already_pending(UnitTypeId.PYLON) > 0):
+        # Start one only if projected usage over its build time exceeds the projected cap
+        if self.supply_planner.needed() <= 0:
             return False
             
         # Check if we can afford it
@@ -115,21 +125,24 @@ class ProtossEconomyManager:
             self.last_pylon_attempt = current_time
             return False
             
-        nexus = self.ai.townhalls.first
-        
         # Get mineral patches to avoid worker paths
         mineral_patches = self.ai.mineral_field
         gas_geysers = self.ai.vespene_geyser
         existing_structures = self.ai.structures
         
-        # Try to find a good location for the pylon
-        location = await self._find_safe_building_location(
-            UnitTypeId.PYLON,
-            nexus.position,
-            mineral_patches,
-            gas_geysers,
-            existing_structures
-        )
+        # Try to find a good location for the pylon, at the base with the fewest pylons first
+        # so every base gets power for warp-ins and defenses
+        location = None
+        for base in self.ai.bases.supply_order(UnitTypeId.PYLON):
+            location = await self._find_safe_building_location(
+                UnitTypeId.PYLON,
+                base.position,
+                mineral_patches,
+                gas_geysers,
+                existing_structures
+            )
+            if location:
+                break
         
         if location:
             # Get the best probe for the job
@@ -268,8 +281,8 @@ class ProtossEconomyManager:
         if not self.ai.townhalls or not self.ai.can_afford(UnitTypeId.ASSIMILATOR):
             return False
             
-        # Get all vespene geysers
-        geysers = self.ai.vespene_geyser.closer_than(15, self.ai.townhalls.first)
+        # Free geysers at every finished base with a working mineral line
+        geysers = self.ai.bases.open_geysers()
         
         for geyser in geysers:
             # Check if we already have an assimilator here or are building one
@@ -287,76 +300,14 @@ class ProtossEconomyManager:
         return False
 
     async def manage_gas_probes(self):
-        """Manage probe distribution between minerals and gas."""
+        """Keep assimilators and mineral lines saturated without redistributing every probe."""
         try:
-            # Update probe assignments
-            self._update_assimilator_assignments()
-            
-            # Get all assimilators
-            for assimilator in self.ai.structures(UnitTypeId.ASSIMILATOR).ready:
-                assimilator_tag = assimilator.tag
-                worker_count = len(self.assimilator_assignments.get(assimilator_tag, set()))
-                
-                # If we have too few workers on this assimilator
-                if worker_count < self.gas_workers_per_assimilator:
-                    # Find mineral probes to send to gas
-                    mineral_probes = self.ai.workers.filter(
-                        lambda w: w.is_gathering and w.is_carrying_minerals
-                    )
-                    if mineral_probes and mineral_probes.amount > 8:  # Keep at least 8 on minerals
-                        probe = mineral_probes.random
-                        probe.gather(assimilator)
-                        if self.debug and self.ai.time % 10 < 0.1:
-                            print(f"[Protoss Economy] Sent mineral probe to gas")
-                
-                # If we have too many workers on this assimilator
-                elif worker_count > self.gas_workers_per_assimilator:
-                    # Send extra workers to gather minerals
-                    excess_workers = worker_count - self.gas_workers_per_assimilator
-                    for probe in self.ai.workers.random_group_of(min(excess_workers, worker_count)):
-                        if probe.is_carrying_vespene:
-                            # If probe is carrying gas, return it first
-                            probe.return_resource()
-                        else:
-                            # Otherwise, send to gather minerals
-                            await self.ai.distribute_workers()
-                            if self.debug and self.ai.time % 10 < 0.1:
-                                print(f"[Protoss Economy] Sent excess gas probe to minerals")
-                            
+            self.worker_distributor.gas_workers_per_building = self.gas_workers_per_assimilator
+            self.worker_distributor.update()
         except Exception as e:
             if self.debug:
                 print(f"[Protoss Economy] Error in manage_gas_probes: {e}")
 
-    def _update_assimilator_assignments(self):
-        """Update the tracking of which probes are assigned to which assimilators."""
-        try:
-            # Clear old assignments
-            self.assimilator_assignments.clear()
-            self.probe_assimilator_map.clear()
-            
-            # Get all assimilators
-            assimilators = self.ai.structures(UnitTypeId.ASSIMILATOR).ready
-            
-            # For each assimilator, find probes that are gathering from it
-            for assimilator in assimilators:
-                assimilator_tag = assimilator.tag
-                self.assimilator_assignments[assimilator_tag] = set()
-                
-                # Find probes gathering from this assimilator
-                probes_at_assimilator = self.ai.workers.filter(
-                    lambda w: w.is_gathering and 
-                    w.order_target and 
-                    w.order_target.tag == assimilator_tag
-                )
-                
-                for probe in probes_at_assimilator:
-                    self.assimilator_assignments[assimilator_tag].add(probe.tag)
-                    self.probe_assimilator_map[probe.tag] = assimilator_tag
-                    
-        except Exception as e:
-            if self.debug:
-                print(f"[Protoss Economy] Error in _update_assimilator_assignments: {e}")
-
     async def expand_now(self):
         """Build a new nexus at the closest available expansion location."""
         try:
@@ -378,17 +329,8 @@ class ProtossEconomyManager:
             if not expansion_locations:
                 return False
                 
-            # Get the main base (first nexus)
-            if not hasattr(self.ai, 'townhalls') or not self.ai.townhalls or not self.ai.townhalls.first:
-                return False
-                
-            main_base = self.ai.townhalls.first
-            
-            # Sort expansion locations by distance to main base
-            sorted_locations = sorted(
-                expansion_locations,
-                key=lambda loc: main_base.position.distance_to(loc) if hasattr(main_base, 'position') else 0
-            )
+            # Free expansions, closest (by ground) to any of our bases first
+            sorted_locations = self.ai.bases.free_expansions()
             
             # Find the first available expansion location
             for location in sorted_locations:
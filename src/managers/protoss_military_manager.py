@@ -4,6 +4,8 @@ from sc2.ids.unit_typeid import UnitTypeId
 from sc2.ids.ability_id import AbilityId
 from sc2.position import Point2
 
+from .protoss_production import ChronoScheduler, WarpgateProduction
+
 class ProtossMilitaryManager:
     """Manages the Protoss bot's military including unit production and army control."""
     
@@ -13,6 +15,13 @@ class ProtossMilitaryManager:
         self.head = None  # Will be set by HeadManager
         self.debug = True  # Enable debug output
         
+        # Warpgate production and Chrono Boost
+        self.production = WarpgateProduction(ai)
+        self.chrono = ChronoScheduler(ai)
+        self.reset()
+
+    def reset(self):
+        """Clear per-game state so the manager can play another game."""
         # Build order tracking
         self.build_order_completed = False
         self.build_order_step = 0
@@ -36,14 +45,15 @@ class ProtossMilitaryManager:
         self.gateways = []
         self.cyber_core = None
         self.stargate = None
+        self.production.reset()
+        self.chrono.reset()
 
     async def on_start(self):
         """Called once at the start of the game."""
         print("Protoss Military Manager initialized")
         # Set rally point near the nexus
         if self.ai.townhalls:
-            nexus = self.ai.townhalls.first
-            self.rally_point = nexus.position.towards(self.ai.game_info.map_center, 8)  # Closer to nexus
+            self.rally_point = self.ai.bases.rally_point(8)  # In front of the most forward base
 
     async def on_step(self):
         """Called every game step."""
@@ -126,7 +136,8 @@ class ProtossMilitaryManager:
         if not self.ai.townhalls:
             return False
             
-        nexus = self.ai.townhalls.first
+        # Tech and production stay in the main
+        nexus = self.ai.bases.main
         
         # Get mineral patches and gas geysers to avoid worker paths
         mineral_patches = self.ai.mineral_field
@@ -240,23 +251,15 @@ class ProtossMilitaryManager:
         return True
 
     async def _train_units(self):
-        """Train military units."""
-        # Train Zealots from Gateways
-        gateways = self.ai.structures(UnitTypeId.GATEWAY).ready
-        for gateway in gateways:
-            if gateway.is_idle and self.ai.can_afford(UnitTypeId.ZEALOT):
-                gateway.train(UnitTypeId.ZEALOT)
-                if self.debug and self.ai.time % 10 < 0.1:
-                    print("[Protoss Military] Training Zealot")
-                    
-        # Train Stalkers from Gateways (if Cyber Core is ready)
-        cyber_cores = self.ai.structures(UnitTypeId.CYBERNETICSCORE).ready
-        if cyber_cores:
-            for gateway in gateways:
-                if gateway.is_idle and self.ai.can_afford(UnitTypeId.STALKER):
-                    gateway.train(UnitTypeId.STALKER)
-                    if self.debug and self.ai.time % 10 < 0.1:
-                        print("[Protoss Military] Training Stalker")
+        """Train military units: warp-ins near the army, Void Rays from Stargates, Chrono Boost."""
+        # Warp in at the army when there is one, otherwise at the rally point
+        army = self.ai.units.of_type({UnitTypeId.ZEALOT, UnitTypeId.STALKER})
+        near = army.center if army else self.rally_point
+        
+        # Stalkers once the Cyber Core is ready, Zealots otherwise
+        made = await self.production.step(near, [UnitTypeId.STALKER, UnitTypeId.ZEALOT])
+        if made and self.debug and self.ai.time % 10 < 0.1:
+            print(f"[Protoss Military] Producing {made} gateway units")
                         
         # Train Void Rays from Stargates
         stargates = self.ai.structures(UnitTypeId.STARGATE).ready
@@ -265,6 +268,9 @@ class ProtossMilitaryManager:
                 stargate.train(UnitTypeId.VOIDRAY)
                 if self.debug and self.ai.time % 10 < 0.1:
                     print("[Protoss Military] Training Void Ray")
+        
+        # Spend Nexus energy on the busiest structures
+        self.chrono.step()
 
     async def _control_army(self):
         """Control the army - gather units and attack."""
@@ -282,21 +288,19 @@ class ProtossMilitaryManager:
         
         # Update rally point to be closer to the nearest command center
         if self.ai.townhalls:
-            nexus = self.ai.townhalls.first
-            self.rally_point = nexus.position.towards(self.ai.game_info.map_center, 8)
+            self.rally_point = self.ai.bases.rally_point(8)
         
-        # Check for enemy units near our base (defensive trigger)
-        enemy_units_near_base = self.ai.enemy_units.filter(
-            lambda unit: unit.position.distance_to(self.ai.townhalls.first.position) < 30
-        )
+        # Check for enemy units near any of our bases (defensive trigger)
+        threatened = self.ai.bases.threatened()
         
-        # If enemy units are near our base, go full defensive mode
-        if enemy_units_near_base and army_size > 0:
+        # If enemy units are near a base, go full defensive mode at the most threatened one
+        if threatened and army_size > 0:
+            base = threatened[0]
             if self.debug:
-                print(f"[Protoss Military] DEFENSIVE MODE: {enemy_units_near_base.amount} enemy units near base!")
+                print(f"[Protoss Military] DEFENSIVE MODE: {base.enemies.amount} enemy units near base at {base.position}!")
             
-            # Attack the closest enemy unit to our base
-            closest_enemy = enemy_units_near_base.closest_to(self.ai.townhalls.first)
+            # Attack the closest enemy unit to that base
+            closest_enemy = base.enemies.closest_to(base.position)
             
             for unit in army:
                 unit.attack(closest_enemy)
@@ -305,18 +309,17 @@ class ProtossMilitaryManager:
                 print(f"[Protoss Military] Army attacking enemy at {closest_enemy.position}")
             return
         
-        # Check for enemy units in a wider radius (counter-attack range)
-        enemy_units_in_range = self.ai.enemy_units.filter(
-            lambda unit: unit.position.distance_to(self.ai.townhalls.first.position) < 50
-        )
+        # Check for enemy units in a wider radius of any base (counter-attack range)
+        enemy_units_in_range = self.ai.bases.enemies_near()
         
         # If enemy units are in counter-attack range and we have a decent army, pursue them
         if enemy_units_in_range and army_size >= 3:
             if self.debug and self.ai.time % 10 < 0.1:
                 print(f"[Protoss Military] COUNTER-ATTACK: Pursuing {enemy_units_in_range.amount} enemy units!")
             
-            # Attack the closest enemy unit
-            closest_enemy = enemy_units_in_range.closest_to(self.ai.townhalls.first)
+            # Attack the closest enemy unit to our bases
+            closest_enemy = min(enemy_units_in_range,
+                                key=lambda u: min(u.distance_to(b.position) for b in self.ai.bases.bases))
             
             for unit in army:
                 unit.attack(closest_enemy)
@@ -357,7 +360,7 @@ class ProtossMilitaryManager:
                 attack_type = "OFFENSIVE"
             elif self.ai.enemy_units and army_size >= 12:  # Only attack nearby enemies if we have a large army
                 # Attack nearby enemy units (defensive)
-                target = self.ai.enemy_units.closest_to(self.ai.townhalls.first)
+                target = self.ai.enemy_units.closest_to(self.ai.bases.forward().position)
                 attack_type = "DEFENSIVE"
             else:
                 # No good target, stay at rally point
@@ -0,0 +1,240 @@
+"""Protoss production engine: warpgate warp-ins and Chrono Boost.
+
+WarpgateProduction researches Warp Gate, morphs gateways and warps units in
+at powered positions near the army. Which warpgates can warp which unit is
+read from the game with one available-abilities query for all warpgates,
+made only when something is affordable, so cooldowns, unfinished morphs and
+warp-ins the game rejected need no bookkeeping. Candidate positions around
+each pylon are computed once from the pathing grid and cached until the set
+of pylons or structures changes.
+
+ChronoScheduler spends Nexus energy on the structure whose queued work has
+the highest value per second: the cost of its queued units and research
+divided by their remaining build time, weighted by how much of the boost
+that work can use.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.buff_id import BuffId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.ids.upgrade_id import UpgradeId
+from sc2.position import Point2
+
+# Warpgate ability per unit, available while the warpgate is off cooldown
+WARP_ABILITIES = {
+    UnitTypeId.ZEALOT: AbilityId.WARPGATETRAIN_ZEALOT,
+    UnitTypeId.ADEPT: AbilityId.TRAINWARP_ADEPT,
+    UnitTypeId.STALKER: AbilityId.WARPGATETRAIN_STALKER,
+    UnitTypeId.SENTRY: AbilityId.WARPGATETRAIN_SENTRY,
+    UnitTypeId.HIGHTEMPLAR: AbilityId.WARPGATETRAIN_HIGHTEMPLAR,
+    UnitTypeId.DARKTEMPLAR: AbilityId.WARPGATETRAIN_DARKTEMPLAR,
+}
+PYLON_POWER_RADIUS = 6.5
+WARP_SPACING = 1.5  # Distance between warp-in positions
+UNIT_CLEARANCE = 1.0  # Warp-ins need this much room from other units
+
+CHRONO_ENERGY = 50
+CHRONO_DURATION = 20.0  # Seconds of +50% speed
+CHRONO_SPEEDUP = 0.5
+GAS_VALUE = 1.5  # Vespene is worth this many minerals when ranking queued work
+GAME_LOOPS_PER_SECOND = 22.4
+
+
+class WarpgateProduction:
+    """Gateway and warpgate unit production for the Protoss military manager."""
+
+    def __init__(self, ai):
+        """Initialize the engine.
+
+        Args:
+            ai: The main bot AI instance
+        """
+        self.ai = ai
+        self.debug = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear per-game state so the engine can play another game."""
+        self.warped_in = 0
+        self._positions: Dict[int, np.ndarray] = {}  # pylon tag -> (N, 2) powered positions
+        self._position_signature = None
+
+    async def step(self, near: Optional[Point2], unit_types: List[UnitTypeId]) -> int:
+        """Research Warp Gate, morph gateways and warp in units.
+
+        Args:
+            near: Where the units are needed (army center or rally point)
+            unit_types: Units in order of preference; the first affordable one is made
+
+        Returns:
+            Number of units warped in or trained
+        """
+        self._research_warpgate()
+        made = 0
+        for gateway in self.ai.structures(UnitTypeId.GATEWAY).ready.idle:
+            if self.ai.already_pending_upgrade(UpgradeId.WARPGATERESEARCH) == 1:
+                gateway(AbilityId.MORPH_WARPGATE)
+                continue
+            unit_type = self._choose(unit_types)
+            if unit_type is None:
+                break
+            gateway.train(unit_type)
+            made += 1
+
+        warpgates = self.ai.structures(UnitTypeId.WARPGATE).ready
+        if warpgates:
+            made += await self._warp_in(warpgates, near, unit_types)
+        return made
+
+    def _research_warpgate(self) -> None:
+        if self.ai.already_pending_upgrade(UpgradeId.WARPGATERESEARCH) > 0:
+            return
+        cores = self.ai.structures(UnitTypeId.CYBERNETICSCORE).ready.idle
+        if cores and self.ai.can_afford(UpgradeId.WARPGATERESEARCH):
+            cores.first.research(UpgradeId.WARPGATERESEARCH)
+            if self.debug:
+                print("[Protoss Production] Researching Warp Gate")
+
+    def _choose(self, unit_types: List[UnitTypeId], abilities=None) -> Optional[UnitTypeId]:
+        """First unit type we have the tech, resources and supply for.
+
+        Args:
+            unit_types: Units in order of preference
+            abilities: Available abilities of a warpgate; only units it can warp in now qualify
+        """
+        for unit_type in unit_types:
+            if abilities is not None and WARP_ABILITIES.get(unit_type) not in abilities:
+                continue
+            if self.ai.tech_requirement_progress(unit_type) < 1:
+                continue
+            if self.ai.can_afford(unit_type):
+                return unit_type
+        return None
+
+    async def _warp_in(self, warpgates, near: Optional[Point2], unit_types: List[UnitTypeId]) -> int:
+        """Warp units in with every warpgate the game reports ready."""
+        if self._choose(unit_types) is None:
+            return 0
+        positions = self._warp_positions(near)
+        if not len(positions):
+            return 0
+        available = await self.ai.get_available_abilities(warpgates)
+
+        made = 0
+        for gate, abilities in zip(warpgates, available):
+            if made >= len(positions):
+                break
+            unit_type = self._choose(unit_types, abilities)
+            if unit_type is None:
+                continue
+            x, y = positions[made]
+            if gate.warp_in(unit_type, Point2((float(x), float(y)))):
+                made += 1
+        self.warped_in += made
+        if made and self.debug:
+            print(f"[Protoss Production] Warped in {made} units")
+        return made
+
+    def _warp_positions(self, near: Optional[Point2]) -> np.ndarray:
+        """Free powered positions, those of the pylon closest to near first."""
+        pylons = self.ai.structures(UnitTypeId.PYLON).ready
+        if not pylons:
+            return np.empty((0, 2))
+        signature = (frozenset(pylons.tags), self.ai.structures.amount)
+        if signature != self._position_signature:
+            self._position_signature = signature
+            self._positions = {pylon.tag: self._pylon_positions(pylon) for pylon in pylons}
+
+        if near is not None:
+            pylons = pylons.sorted_by_distance_to(near)
+        candidates = np.concatenate([self._positions[pylon.tag] for pylon in pylons])
+        units = self.ai.units
+        if units and len(candidates):
+            occupied = np.array([[u.position.x, u.position.y] for u in units])
+            d2 = ((candidates[:, None, :] - occupied[None, :, :]) ** 2).sum(axis=2)
+            candidates = candidates[d2.min(axis=1) >= UNIT_CLEARANCE ** 2]
+        return candidates
+
+    def _pylon_positions(self, pylon) -> np.ndarray:
+        """Pathable lattice points inside a pylon's power field."""
+        steps = np.arange(-PYLON_POWER_RADIUS, PYLON_POWER_RADIUS + 0.01, WARP_SPACING)
+        dx, dy = np.meshgrid(steps, steps)
+        offsets = np.column_stack((dx.ravel(), dy.ravel()))
+        # Outside the pylon itself (2x2) and inside its power field
+        r2 = (offsets ** 2).sum(axis=1)
+        offsets = offsets[(r2 <= (PYLON_POWER_RADIUS - 0.5) ** 2) & (r2 >= 2.25)]
+        points = offsets + (pylon.position.x, pylon.position.y)
+
+        grid = self.ai.game_info.pathing_grid.data_numpy
+        xs = points[:, 0].astype(int)
+        ys = points[:, 1].astype(int)
+        inside = (xs >= 0) & (ys >= 0) & (xs < grid.shape[1]) & (ys < grid.shape[0])
+        points, xs, ys = points[inside], xs[inside], ys[inside]
+        points = points[grid[ys, xs] != 0]
+        # Nearest the pylon first
+        order = ((points - (pylon.position.x, pylon.position.y)) ** 2).sum(axis=1).argsort()
+        return points[order]
+
+
+class ChronoScheduler:
+    """Spends Nexus energy on the structure whose queued work gains most from Chrono Boost."""
+
+    def __init__(self, ai):
+        """Initialize the scheduler.
+
+        Args:
+            ai: The main bot AI instance
+        """
+        self.ai = ai
+        self.debug = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear per-game state so the scheduler can play another game."""
+        self.boosts = 0
+
+    def step(self) -> int:
+        """Chrono Boost the best targets with every Nexus that has the energy.
+
+        Returns:
+            Number of boosts cast
+        """
+        casters = [nexus for nexus in self.ai.townhalls.ready if nexus.energy >= CHRONO_ENERGY]
+        if not casters:
+            return 0
+        targets = []
+        for structure in self.ai.structures.ready:
+            if not structure.orders or structure.has_buff(BuffId.CHRONOBOOSTENERGYCOST):
+                continue
+            score = self.score(structure)
+            if score > 0:
+                targets.append((score, structure))
+        targets.sort(key=lambda t: -t[0])
+
+        cast = 0
+        for nexus, (score, target) in zip(casters, targets):
+            nexus(AbilityId.EFFECT_CHRONOBOOSTENERGYCOST, target)
+            cast += 1
+            if self.debug:
+                print(f"[Chrono] Boosting {target.type_id.name} (value {score:.0f})")
+        self.boosts += cast
+        return cast
+
+    def score(self, structure) -> float:
+        """Resource value Chrono Boost would bring forward on this structure's queue."""
+        value = 0.0
+        remaining = 0.0
+        for i, order in enumerate(structure.orders):
+            cost = self.ai.game_data.calculate_ability_cost(order.ability)
+            if not cost.time:
+                continue
+            build_time = cost.time / GAME_LOOPS_PER_SECOND
+            value += cost.minerals + GAS_VALUE * cost.vespene
+            remaining += build_time * (1.0 - order.progress) if i == 0 else build_time
+        if remaining <= 0:
+            return 0.0
+        # Value per second of queued work, times the seconds the boost saves on it
+        return value / remaining * min(remaining, CHRONO_DURATION) * CHRONO_SPEEDUP
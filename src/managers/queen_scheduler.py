@@ -0,0 +1,236 @@
+"""Queen injects and creep spread for the Zerg economy manager.
+
+Without queens larva comes only from natural hatchery spawns. QueenScheduler
+keeps one injecting queen per hatchery plus a few spare creep queens:
+
+- Injectors are assigned per hatchery tag and inject whenever they have the
+  energy and the hatchery's inject timer has run out
+- Creep queens place tumors on the creep frontier, and every burrowed tumor
+  spreads once, both toward the enemy
+
+The creep frontier (creep cells bordering pathable cells without creep) is
+computed with numpy shifts over the whole creep grid, then filtered by
+placement, tumor spacing and expansion locations.
+"""
+
+from typing import Dict, Optional, Set
+
+import numpy as np
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.buff_id import BuffId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+
+HATCHERY_TYPES = {UnitTypeId.HATCHERY, UnitTypeId.LAIR, UnitTypeId.HIVE}
+TUMOR_TYPES = {UnitTypeId.CREEPTUMOR, UnitTypeId.CREEPTUMORBURROWED, UnitTypeId.CREEPTUMORQUEEN}
+ABILITY_ENERGY = 25  # Inject and creep tumor both cost 25 energy
+INJECT_DURATION = 29.0  # Seconds until injected larva pop
+INJECTOR_LEASH = 8.0  # An injector further than this from its hatchery walks back
+TUMOR_RANGE = 10.0  # Distance a tumor can spread a new tumor
+QUEEN_CREEP_RANGE = 12.0  # Distance a creep queen walks to place a tumor
+TUMOR_SPACING = 7.0  # Minimum distance between tumors
+TUMOR_SPREAD_DELAY = 1.0  # Seconds after a tumor burrows before it is told to spread
+EXPANSION_CLEARANCE = 6.0  # Tumors block townhalls placed over them
+FRONTIER_INTERVAL = 2.0  # Game seconds between creep frontier recalculations
+
+
+def creep_frontier(creep: np.ndarray, pathable: np.ndarray, placeable: np.ndarray) -> np.ndarray:
+    """Placeable creep cells next to pathable cells without creep.
+
+    Args:
+        creep: (H, W) bool creep grid
+        pathable: (H, W) bool pathing grid
+        placeable: (H, W) bool placement grid
+
+    Returns:
+        (N, 2) float array of cell centers as (x, y)
+    """
+    open_ground = pathable & ~creep
+    border = np.zeros_like(creep)
+    # A cell borders open ground if any of its 8 neighbours is open ground
+    border[1:, :] |= open_ground[:-1, :]
+    border[:-1, :] |= open_ground[1:, :]
+    border[:, 1:] |= open_ground[:, :-1]
+    border[:, :-1] |= open_ground[:, 1:]
+    border[1:, 1:] |= open_ground[:-1, :-1]
+    border[:-1, :-1] |= open_ground[1:, 1:]
+    border[1:, :-1] |= open_ground[:-1, 1:]
+    border[:-1, 1:] |= open_ground[1:, :-1]
+    ys, xs = np.nonzero(border & creep & placeable)
+    return np.column_stack((xs + 0.5, ys + 0.5))
+
+
+class QueenScheduler:
+    """Trains queens, assigns injectors to hatcheries and spreads creep."""
+
+    def __init__(self, ai, creep_queens: int = 2, max_queens: int = 8):
+        """Initialize the scheduler.
+
+        Args:
+            ai: The main bot AI instance
+            creep_queens: Queens kept beyond one injector per hatchery
+            max_queens: Upper bound on queens trained
+        """
+        self.ai = ai
+        self.creep_queens = creep_queens
+        self.max_queens = max_queens
+        self.debug = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear per-game state so the scheduler can play another game."""
+        self.injectors: Dict[int, int] = {}  # hatchery tag -> queen tag
+        self.inject_ready_at: Dict[int, float] = {}  # hatchery tag -> game time its inject runs out
+        self.injects = 0
+        self.tumors_placed = 0
+        self._tumor_seen: Dict[int, float] = {}  # burrowed tumor tag -> game time first seen
+        self._tumors_spread: Set[int] = set()
+        self._pending_tumors = {}  # queen tag -> Point2 of the tumor she was sent to place
+        self._frontier = None
+        self._last_frontier = None
+
+    def step(self) -> None:
+        """Run queen production, injects and creep spread for this step."""
+        hatcheries = self.ai.structures.of_type(HATCHERY_TYPES).ready
+        queens = self.ai.units(UnitTypeId.QUEEN)
+        self._assign_injectors(hatcheries, queens)
+        self._train_queens(hatcheries, queens)
+        self._inject(hatcheries, queens)
+        self._spread_creep(queens)
+
+    def _assign_injectors(self, hatcheries, queens) -> None:
+        """Give every hatchery without a living injector the nearest free queen."""
+        hatchery_tags = set(hatcheries.tags)
+        queen_tags = set(queens.tags)
+        self.injectors = {
+            hatchery: queen for hatchery, queen in self.injectors.items()
+            if hatchery in hatchery_tags and queen in queen_tags
+        }
+        self.inject_ready_at = {tag: t for tag, t in self.inject_ready_at.items() if tag in hatchery_tags}
+        taken = set(self.injectors.values())
+        for hatchery in hatcheries:
+            if hatchery.tag in self.injectors:
+                continue
+            free = queens.filter(lambda q: q.tag not in taken)
+            if not free:
+                break
+            queen = free.closest_to(hatchery)
+            self.injectors[hatchery.tag] = queen.tag
+            self._pending_tumors.pop(queen.tag, None)
+            taken.add(queen.tag)
+
+    def _train_queens(self, hatcheries, queens) -> None:
+        """Train one queen per step until every hatchery has an injector plus the creep queens."""
+        if not self.ai.structures(UnitTypeId.SPAWNINGPOOL).ready:
+            return
+        wanted = min(hatcheries.amount + self.creep_queens, self.max_queens)
+        if queens.amount + self.ai.already_pending(UnitTypeId.QUEEN) >= wanted:
+            return
+        if not self.ai.can_afford(UnitTypeId.QUEEN):
+            return
+        idle = hatcheries.idle
+        if idle:
+            # Hatcheries still without an injector first
+            hatchery = min(idle, key=lambda h: h.tag in self.injectors)
+            hatchery.train(UnitTypeId.QUEEN)
+            if self.debug:
+                print(f"[Queen Scheduler] Training Queen at {hatchery.position}")
+
+    def _inject(self, hatcheries, queens) -> None:
+        """Inject every hatchery whose timer ran out, or walk its injector back."""
+        now = self.ai.time
+        by_tag = {queen.tag: queen for queen in queens}
+        for hatchery in hatcheries:
+            queen = by_tag.get(self.injectors.get(hatchery.tag))
+            if queen is None:
+                continue
+            if any(order.ability.id == AbilityId.EFFECT_INJECTLARVA for order in queen.orders):
+                continue
+            busy = hatchery.has_buff(BuffId.QUEENSPAWNLARVATIMER) or now < self.inject_ready_at.get(hatchery.tag, 0.0)
+            if not busy and queen.energy >= ABILITY_ENERGY:
+                queen(AbilityId.EFFECT_INJECTLARVA, hatchery)
+                self.inject_ready_at[hatchery.tag] = now + INJECT_DURATION
+                self.injects += 1
+            elif queen.is_idle and queen.distance_to(hatchery) > INJECTOR_LEASH:
+                queen.move(hatchery.position.towards(self.ai.game_info.map_center, 3))
+
+    def _spread_creep(self, queens) -> None:
+        """Place tumors with creep queens and spread every burrowed tumor once."""
+        now = self.ai.time
+        self._refresh_frontier()
+        if self._frontier is None or not len(self._frontier):
+            return
+        goal = self.ai.enemy_start_locations[0] if self.ai.enemy_start_locations else self.ai.game_info.map_center
+        tumors = self.ai.structures.of_type(TUMOR_TYPES)
+        occupied = [tumor.position for tumor in tumors]
+
+        # Forget tumors that were placed or abandoned
+        queen_tags = set(queens.tags)
+        for tag in list(self._pending_tumors):
+            queen = queens.find_by_tag(tag) if tag in queen_tags else None
+            if queen is None or not any(o.ability.id == AbilityId.BUILD_CREEPTUMOR for o in queen.orders):
+                del self._pending_tumors[tag]
+        occupied.extend(self._pending_tumors.values())
+
+        injectors = set(self.injectors.values())
+        for queen in queens:
+            if queen.tag in injectors or queen.tag in self._pending_tumors:
+                continue
+            if queen.energy < ABILITY_ENERGY or not (queen.is_idle or queen.is_moving):
+                continue
+            target = self._pick_target(queen.position, QUEEN_CREEP_RANGE, goal, occupied)
+            if target is not None:
+                queen(AbilityId.BUILD_CREEPTUMOR_QUEEN, target)
+                self._pending_tumors[queen.tag] = target
+                occupied.append(target)
+                self.tumors_placed += 1
+
+        for tumor in tumors.of_type(UnitTypeId.CREEPTUMORBURROWED):
+            if tumor.tag in self._tumors_spread:
+                continue
+            seen = self._tumor_seen.setdefault(tumor.tag, now)
+            if now - seen < TUMOR_SPREAD_DELAY:
+                continue
+            target = self._pick_target(tumor.position, TUMOR_RANGE, goal, occupied)
+            if target is not None:
+                tumor(AbilityId.BUILD_CREEPTUMOR_TUMOR, target)
+                occupied.append(target)
+                self.tumors_placed += 1
+            # A tumor spreads once; one without a target has nowhere useful to go
+            self._tumors_spread.add(tumor.tag)
+
+    def _refresh_frontier(self) -> None:
+        """Recompute the creep frontier every FRONTIER_INTERVAL seconds."""
+        now = self.ai.time
+        if self._last_frontier is not None and now - self._last_frontier < FRONTIER_INTERVAL:
+            return
+        self._last_frontier = now
+        creep = self.ai.state.creep.data_numpy.astype(bool)
+        pathable = self.ai.game_info.pathing_grid.data_numpy.astype(bool)
+        placeable = self.ai.game_info.placement_grid.data_numpy.astype(bool)
+        frontier = creep_frontier(creep, pathable, placeable)
+
+        # Keep expansions free for hatcheries
+        expansions = np.array([[p.x, p.y] for p in self.ai.expansion_locations_list]).reshape(-1, 2)
+        if len(frontier) and len(expansions):
+            d2 = ((frontier[:, None, :] - expansions[None, :, :]) ** 2).sum(axis=2)
+            frontier = frontier[d2.min(axis=1) >= EXPANSION_CLEARANCE ** 2]
+        self._frontier = frontier
+
+    def _pick_target(self, origin: Point2, reach: float, goal: Point2, occupied) -> Optional[Point2]:
+        """Frontier point within reach of origin, away from other tumors, closest to the goal."""
+        frontier = self._frontier
+        mask = ((frontier - (origin.x, origin.y)) ** 2).sum(axis=1) <= reach ** 2
+        if occupied:
+            points = np.array([[p.x, p.y] for p in occupied])
+            candidates = frontier[mask]
+            if not len(candidates):
+                return None
+            d2 = ((candidates[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+            candidates = candidates[d2.min(axis=1) >= TUMOR_SPACING ** 2]
+        else:
+            candidates = frontier[mask]
+        if not len(candidates):
+            return None
+        x, y = candidates[((candidates - (goal.x, goal.y)) ** 2).sum(axis=1).argmin()]
+        return Point2((float(x), float(y)))
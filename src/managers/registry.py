@@ -0,0 +1,52 @@
+"""Race-keyed registry of economy and military managers, imported on demand.
+
+bot.py used to import all six race managers at module load. The registry
+names them by module instead, and load_managers() imports only the pair
+for the race picked in on_start, so startup pays for one race.
+
+Races can be re-pointed at other implementations (a plugin) without
+touching bot.py, as long as the classes take the bot as their only
+required argument.
+
+USAGE:
+```python
+from managers.registry import load_managers, register_managers
+
+economy_class, military_class = load_managers(Race.Zerg)
+
+# A plugin replacing the Terran military manager
+register_managers(Race.Terran, military='my_plugin.military:MyMilitaryManager')
+```
+"""
+
+import importlib
+from typing import Dict, Optional, Tuple
+
+from sc2.data import Race
+
+# Race -> (economy manager, military manager) as 'module:Class'; relative modules are in this package
+MANAGERS: Dict[Race, Tuple[str, str]] = {
+    Race.Terran: ('.terran_economy_manager:TerranEconomyManager', '.military_manager:MilitaryManager'),
+    Race.Protoss: ('.protoss_economy_manager:ProtossEconomyManager', '.protoss_military_manager:ProtossMilitaryManager'),
+    Race.Zerg: ('.zerg_economy_manager:ZergEconomyManager', '.zerg_military_manager:ZergMilitaryManager'),
+}
+DEFAULT_RACE = Race.Terran  # Used for races without an entry (Random resolves to a real race by on_start)
+
+
+def register_managers(race: Race, economy: Optional[str] = None, military: Optional[str] = None) -> None:
+    """Point a race at other manager classes, given as 'module:Class'."""
+    current_economy, current_military = MANAGERS.get(race, MANAGERS[DEFAULT_RACE])
+    MANAGERS[race] = (economy or current_economy, military or current_military)
+
+
+def load_class(path: str) -> type:
+    """Import a 'module:Class' path; modules starting with '.' are relative to this package."""
+    module_name, _, class_name = path.partition(':')
+    module = importlib.import_module(module_name, __package__)
+    return getattr(module, class_name)
+
+
+def load_managers(race: Race) -> Tuple[type, type]:
+    """Import and return the (economy, military) manager classes for a race."""
+    economy, military = MANAGERS.get(race, MANAGERS[DEFAULT_RACE])
+    return load_class(economy), load_class(military)
@@ -0,0 +1,303 @@
+"""Per-step unit and grid snapshot in shared memory, for analysis jobs in other processes.
+
+A process pool job (see managers/analysis_executor.py) gets its arguments
+pickled, and pickling the units and map grids of a step costs more than
+most analyses save by running on another core. SharedSnapshotWriter
+instead copies them once per step into a multiprocessing.shared_memory
+block; a job only receives a SnapshotHandle (block name, buffer, sequence)
+and maps the block as NumPy views without copying.
+
+Block layout, described by a versioned header at its start:
+
+- header: magic, SNAPSHOT_LAYOUT, buffers, unit capacity, grid size
+- one record per buffer: sequence (0 while being written), game loop and
+  the unit counts
+- placement grid and terrain height, written once per game
+- per buffer: the pathing grid and the own, enemy and resource unit arrays
+  (UNIT_DTYPE rows)
+
+Steps are written round robin to BUFFERS buffers, so a job can read its
+buffer while the next steps are published. A job that runs longer than
+that sees its buffer's sequence change; SharedSnapshot.check() then raises
+SnapshotOverwritten and the executor drops the result like a superseded
+one. When a step has more units than the capacity, a bigger block
+replaces the old one.
+
+USAGE:
+```python
+writer = SharedSnapshotWriter(ai)
+handle = writer.publish()                  # on the step, at most one copy per step
+executor.submit('threat', run_on_snapshot, threat_map_from_view, handle)
+
+def threat_map_from_view(snapshot):        # in the worker
+    enemy = snapshot.enemy[~snapshot.enemy['is_structure']]
+    ...
+```
+"""
+
+import logging
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger('B0B.SharedSnapshot')
+
+SNAPSHOT_MAGIC = 0xB0B5_4A50
+SNAPSHOT_LAYOUT = 1  # Bump when the block layout or UNIT_DTYPE changes
+BUFFERS = 3  # Steps published before a buffer is overwritten
+INITIAL_CAPACITY = 256  # Units per group before the block grows
+ALIGNMENT = 64
+GROUPS = ('own', 'enemy', 'resources')
+
+UNIT_DTYPE = np.dtype([
+    ('tag', np.uint64),
+    ('type_id', np.int32),
+    ('x', np.float32),
+    ('y', np.float32),
+    ('health', np.float32),
+    ('shield', np.float32),
+    ('energy', np.float32),
+    ('supply', np.float32),
+    ('contents', np.int32),  # Minerals or gas left in a resource
+    ('is_structure', np.bool_),
+    ('is_flying', np.bool_),
+    ('is_ready', np.bool_),
+])
+HEADER_DTYPE = np.dtype([
+    ('magic', np.uint32), ('layout', np.uint32), ('buffers', np.uint32),
+    ('capacity', np.uint32), ('height', np.uint32), ('width', np.uint32),
+])
+BUFFER_DTYPE = np.dtype([
+    ('sequence', np.uint64), ('game_loop', np.uint32),
+    ('own', np.uint32), ('enemy', np.uint32), ('resources', np.uint32),
+])
+
+
+class SnapshotOverwritten(Exception):
+    """A job's snapshot buffer was reused for a newer step while the job read it."""
+
+
+@dataclass(frozen=True)
+class SnapshotHandle:
+    """What a job needs to find its snapshot; pickles to a few dozen bytes."""
+
+    name: str  # Shared memory block
+    buffer: int
+    sequence: int
+    game_loop: int
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _layout(buffers: int, capacity: int, height: int, width: int) -> Dict:
+    """Byte offsets of every part of a block, shared by the writer and the readers."""
+    grid = height * width
+    offsets = {'buffers': _align(HEADER_DTYPE.itemsize)}
+    offsets['placement'] = _align(offsets['buffers'] + buffers * BUFFER_DTYPE.itemsize)
+    offsets['terrain_height'] = _align(offsets['placement'] + grid)
+    offset = _align(offsets['terrain_height'] + grid)
+    offsets['data'] = []
+    for _ in range(buffers):
+        parts = {'pathing': offset}
+        offset = _align(offset + grid)
+        for group in GROUPS:
+            parts[group] = offset
+            offset = _align(offset + capacity * UNIT_DTYPE.itemsize)
+        offsets['data'].append(parts)
+    offsets['size'] = offset
+    return offsets
+
+
+class _Block:
+    """NumPy views over a snapshot block."""
+
+    def __init__(self, memory: shared_memory.SharedMemory):
+        self.memory = memory
+        self.header = np.ndarray((), HEADER_DTYPE, memory.buf, 0)
+        if int(self.header['magic']) != SNAPSHOT_MAGIC or int(self.header['layout']) != SNAPSHOT_LAYOUT:
+            raise ValueError(f"{memory.name} is not a layout {SNAPSHOT_LAYOUT} unit snapshot")
+        buffers, capacity = int(self.header['buffers']), int(self.header['capacity'])
+        shape = (int(self.header['height']), int(self.header['width']))
+        offsets = _layout(buffers, capacity, *shape)
+        self.records = np.ndarray((buffers,), BUFFER_DTYPE, memory.buf, offsets['buffers'])
+        self.placement = np.ndarray(shape, np.uint8, memory.buf, offsets['placement'])
+        self.terrain_height = np.ndarray(shape, np.uint8, memory.buf, offsets['terrain_height'])
+        self.pathing = [np.ndarray(shape, np.uint8, memory.buf, parts['pathing']) for parts in offsets['data']]
+        self.units = [
+            {group: np.ndarray((capacity,), UNIT_DTYPE, memory.buf, parts[group]) for group in GROUPS}
+            for parts in offsets['data']
+        ]
+
+    def release(self) -> None:
+        """Drop the views and close the mapping (kept open while a caller still holds a view)."""
+        self.header = self.records = self.placement = self.terrain_height = None
+        self.pathing, self.units = [], []
+        try:
+            self.memory.close()
+        except BufferError:
+            pass
+
+
+class SharedSnapshotWriter:
+    """Publishes the units and grids of the current step into shared memory (step thread only)."""
+
+    def __init__(self, ai, capacity: int = INITIAL_CAPACITY, buffers: int = BUFFERS):
+        """Initialize the writer; the block is created by the first publish.
+
+        Args:
+            ai: The main bot AI instance
+            capacity: Units per group the first block holds
+            buffers: Steps published before a buffer is overwritten
+        """
+        self.ai = ai
+        self.capacity = capacity
+        self.buffers = buffers
+        self.debug = False
+        self._block: Optional[_Block] = None
+        self._sequence = 0
+        self._state = None  # Game state of the last publish
+        self._handle: Optional[SnapshotHandle] = None
+        self._types: Dict[int, tuple] = {}  # unit type -> (supply cost, is structure)
+        self.published = 0
+        self.resized = 0
+
+    def publish(self) -> SnapshotHandle:
+        """Copy this step's units and pathing grid into the next buffer (once per step).
+
+        Returns:
+            The handle jobs attach to
+        """
+        ai = self.ai
+        if self._state is ai.state and self._handle is not None:
+            return self._handle
+        rows = {
+            'own': self._rows(ai.all_own_units),
+            'enemy': self._rows(ai.all_enemy_units),
+            'resources': self._rows(ai.resources),
+        }
+        needed = max(len(group) for group in rows.values())
+        if self._block is None or needed > self.capacity:
+            self._create(max(self.capacity, needed))
+
+        self._sequence += 1
+        buffer = self._sequence % self.buffers
+        record = self._block.records[buffer]
+        record['sequence'] = 0  # Readers of the old step see it is gone
+        np.copyto(self._block.pathing[buffer], ai.game_info.pathing_grid.data_numpy, casting='unsafe')
+        for group, group_rows in rows.items():
+            if group_rows:
+                self._block.units[buffer][group][:len(group_rows)] = np.array(group_rows, dtype=UNIT_DTYPE)
+            record[group] = len(group_rows)
+        record['game_loop'] = ai.state.game_loop
+        record['sequence'] = self._sequence
+
+        self._state = ai.state
+        self._handle = SnapshotHandle(self._block.memory.name, buffer, self._sequence, ai.state.game_loop)
+        self.published += 1
+        return self._handle
+
+    def close(self) -> None:
+        """Release and unlink the block; attached workers keep their mapping until they let go."""
+        if self._block is None:
+            return
+        memory = self._block.memory
+        self._block.release()
+        try:
+            memory.unlink()
+        except FileNotFoundError:
+            pass
+        self._block = None
+        self._state = self._handle = None
+
+    def _rows(self, units) -> list:
+        """UNIT_DTYPE rows of units, read straight from their protobuf."""
+        types = self._types
+        rows = []
+        for unit in units:
+            proto = unit._proto
+            type_id = proto.unit_type
+            if type_id not in types:
+                types[type_id] = (self.ai.calculate_supply_cost(unit.type_id), unit.is_structure)
+            supply, is_structure = types[type_id]
+            rows.append((
+                proto.tag, type_id, proto.pos.x, proto.pos.y, proto.health, proto.shield, proto.energy,
+                supply, proto.mineral_contents or proto.vespene_contents,
+                is_structure, proto.is_flying, proto.build_progress == 1,
+            ))
+        return rows
+
+    def _create(self, needed: int) -> None:
+        """Create a block for needed units per group, replacing a smaller one."""
+        capacity = max(self.capacity, 1)
+        while capacity < needed:
+            capacity *= 2
+        if self._block is not None:
+            self.resized += 1
+            logger.info(f"Unit snapshot grows from {self.capacity} to {capacity} units per group")
+            self.close()
+        placement = self.ai.game_info.placement_grid.data_numpy
+        height, width = placement.shape
+        memory = shared_memory.SharedMemory(create=True, size=_layout(self.buffers, capacity, height, width)['size'])
+        header = np.ndarray((), HEADER_DTYPE, memory.buf, 0)
+        header[()] = (SNAPSHOT_MAGIC, SNAPSHOT_LAYOUT, self.buffers, capacity, height, width)
+        del header
+        self._block = _Block(memory)
+        self._block.records['sequence'] = 0
+        np.copyto(self._block.placement, placement, casting='unsafe')
+        np.copyto(self._block.terrain_height, self.ai.game_info.terrain_height.data_numpy, casting='unsafe')
+        self.capacity = capacity
+        if self.debug:
+            print(f"[Snapshot] {memory.name}: {memory.size // 1024} KiB for {capacity} units per group")
+
+
+class SharedSnapshot:
+    """One published step, as NumPy views over the shared block (no copies)."""
+
+    def __init__(self, handle: SnapshotHandle, block: _Block):
+        record = block.records[handle.buffer]
+        units = block.units[handle.buffer]
+        self.handle = handle
+        self.game_loop = handle.game_loop
+        self.own = units['own'][:int(record['own'])]
+        self.enemy = units['enemy'][:int(record['enemy'])]
+        self.resources = units['resources'][:int(record['resources'])]
+        self.pathing = block.pathing[handle.buffer]
+        self.placement = block.placement
+        self.terrain_height = block.terrain_height
+        self._record = record
+
+    def consistent(self) -> bool:
+        """True while the buffer still holds the handle's step."""
+        return int(self._record['sequence']) == self.handle.sequence
+
+    def check(self) -> None:
+        """Raise SnapshotOverwritten if the buffer no longer holds the handle's step."""
+        if not self.consistent():
+            raise SnapshotOverwritten(f"Snapshot of loop {self.game_loop} was overwritten")
+
+
+_attached: Dict[str, _Block] = {}  # Blocks mapped by this process, by name
+
+
+def attach(handle: SnapshotHandle) -> SharedSnapshot:
+    """Map the handle's block (once per process) and return its step as views."""
+    block = _attached.get(handle.name)
+    if block is None:
+        for name in list(_attached):
+            _attached.pop(name).release()  # A new block replaced the old ones
+        block = _attached[handle.name] = _Block(shared_memory.SharedMemory(name=handle.name))
+    snapshot = SharedSnapshot(handle, block)
+    snapshot.check()
+    return snapshot
+
+
+def run_on_snapshot(fn: Callable, handle: SnapshotHandle):
+    """Analysis job: fn(snapshot) over the handle's step, failing if the step was overwritten meanwhile."""
+    snapshot = attach(handle)
+    result = fn(snapshot)
+    snapshot.check()
+    return result
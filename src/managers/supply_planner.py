@@ -0,0 +1,185 @@
+"""Predictive supply planning shared by the Terran, Protoss and Zerg economy managers.
+
+A fixed supply buffer starts depots too late while production is ramping up
+and too early when the bot is floating supply. SupplyPlanner instead
+projects supply usage over the time a new supply provider needs to finish
+(its build time plus the time a worker needs to reach the build site):
+
+1. Every production structure keeps producing: a busy one repeats its
+   current unit when it finishes, an idle one starts its default unit now.
+   Zerg production is bounded by current larva plus natural and injected
+   larva spawns.
+2. Production is capped by what income allows over the same horizon.
+3. Supply already coming (pending providers and townhalls) is added to the
+   current cap.
+
+Providers are started just in time to cover the difference. Time spent
+supply blocked is tracked as a metric (see metrics()).
+"""
+
+import math
+from typing import Dict, Optional
+
+from sc2.dicts.unit_train_build_abilities import TRAIN_INFO
+from sc2.ids.unit_typeid import UnitTypeId
+
+from config.config import config as bot_config
+
+# Supply given by each provider once finished
+SUPPLY_PROVIDED = {
+    UnitTypeId.SUPPLYDEPOT: 8,
+    UnitTypeId.PYLON: 8,
+    UnitTypeId.OVERLORD: 8,
+    UnitTypeId.COMMANDCENTER: 15,
+    UnitTypeId.NEXUS: 15,
+    UnitTypeId.HATCHERY: 6,
+}
+
+# Unit an idle production structure is assumed to start next
+DEFAULT_PRODUCTION = {
+    UnitTypeId.COMMANDCENTER: UnitTypeId.SCV,
+    UnitTypeId.ORBITALCOMMAND: UnitTypeId.SCV,
+    UnitTypeId.PLANETARYFORTRESS: UnitTypeId.SCV,
+    UnitTypeId.BARRACKS: UnitTypeId.MARINE,
+    UnitTypeId.FACTORY: UnitTypeId.HELLION,
+    UnitTypeId.STARPORT: UnitTypeId.MEDIVAC,
+    UnitTypeId.NEXUS: UnitTypeId.PROBE,
+    UnitTypeId.GATEWAY: UnitTypeId.ZEALOT,
+    UnitTypeId.ROBOTICSFACILITY: UnitTypeId.IMMORTAL,
+    UnitTypeId.STARGATE: UnitTypeId.ORACLE,
+}
+
+# Train ability -> trained unit, to tell what a busy structure is making
+TRAINED_UNIT = {
+    info['ability']: unit
+    for producer, units in TRAIN_INFO.items() if producer in DEFAULT_PRODUCTION
+    for unit, info in units.items() if 'ability' in info
+}
+
+LARVA_INTERVAL = 11.0  # Seconds between natural larva spawns per hatchery
+MAX_NATURAL_LARVA = 3
+INJECT_LARVA = 3  # Larvae per queen inject
+INJECT_INTERVAL = 29.0  # Seconds between injects of one hatchery
+MINERALS_PER_SUPPLY = 50  # Typical mineral cost of one supply of units
+GAME_LOOPS_PER_SECOND = 22.4
+
+
+class SupplyPlanner:
+    """Projects supply usage and decides when to start supply providers."""
+
+    def __init__(self, ai, provider: UnitTypeId, lead_time: Optional[float] = None,
+                 margin: Optional[int] = None):
+        """Initialize the planner.
+
+        Args:
+            ai: The main bot AI instance
+            provider: SUPPLYDEPOT, PYLON or OVERLORD
+            lead_time: Seconds before the provider starts building
+                (default: EconomyConfig.supply_lead_time, 0 for overlords)
+            margin: Free supply kept beyond the projection
+                (default: EconomyConfig.supply_margin)
+        """
+        self.ai = ai
+        self.provider = provider
+        if lead_time is None:
+            lead_time = 0.0 if provider == UnitTypeId.OVERLORD else bot_config.economy.supply_lead_time
+        self.lead_time = lead_time
+        self.margin = margin if margin is not None else bot_config.economy.supply_margin
+        self.debug = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear per-game state so the planner can play another game."""
+        self.projected_used = 0.0
+        self.projected_cap = 0.0
+        self.blocked_time = 0.0
+        self.blocked_episodes = 0
+        self._blocked = False
+        self._last_update = None
+        self._horizon = None
+
+    @property
+    def horizon(self) -> float:
+        """Seconds until a provider started now would finish."""
+        if self._horizon is None:
+            build_time = self.ai.game_data.units[self.provider.value].cost.time / GAME_LOOPS_PER_SECOND
+            self._horizon = build_time + self.lead_time
+        return self._horizon
+
+    def update(self) -> None:
+        """Accumulate supply blocked time. Call once per step."""
+        now = self.ai.time
+        blocked = self.ai.supply_left < 1 and self.ai.supply_cap < 200
+        if self._last_update is not None and self._blocked:
+            self.blocked_time += now - self._last_update
+        if blocked and not self._blocked:
+            self.blocked_episodes += 1
+            if self.debug:
+                print(f"[Supply Planner] Supply blocked at {self.ai.supply_used}/{self.ai.supply_cap}")
+        self._blocked = blocked
+        self._last_update = now
+
+    def needed(self) -> int:
+        """Number of supply providers to start now to stay unblocked over the horizon."""
+        if self.ai.supply_cap >= 200:
+            return 0
+        horizon = self.horizon
+        self.projected_used = self.ai.supply_used + self.projected_demand(horizon) + self.margin
+        self.projected_cap = min(self.ai.supply_cap + self.pending_supply(), 200)
+        shortfall = min(self.projected_used, 200) - self.projected_cap
+        if shortfall <= 0:
+            return 0
+        return math.ceil(shortfall / SUPPLY_PROVIDED[self.provider])
+
+    def pending_supply(self) -> int:
+        """Supply from providers and townhalls that are ordered or building."""
+        pending = self.ai.already_pending(self.provider) * SUPPLY_PROVIDED[self.provider]
+        for townhall in self.ai.townhalls.not_ready:
+            pending += SUPPLY_PROVIDED.get(townhall.type_id, 0)
+        return pending
+
+    def projected_demand(self, horizon: float) -> float:
+        """Supply production will consume over the next horizon seconds."""
+        demand = 0.0
+        for structure in self.ai.structures.ready.of_type(DEFAULT_PRODUCTION.keys()):
+            slots = 2 if structure.has_reactor else 1
+            orders = list(structure.orders)
+            for slot in range(slots):
+                order = orders[slot] if slot < len(orders) else None
+                if order is not None:
+                    unit = TRAINED_UNIT.get(order.ability.exact_id)
+                    if unit is None:
+                        continue  # Researching or morphing
+                    build_time = self._build_time(unit)
+                    start = (1.0 - order.progress) * build_time
+                else:
+                    unit = DEFAULT_PRODUCTION[structure.type_id]
+                    build_time = self._build_time(unit)
+                    start = 0.0
+                if horizon >= start:
+                    demand += (int((horizon - start) / build_time) + 1) * self.ai.calculate_supply_cost(unit)
+
+        if self.provider == UnitTypeId.OVERLORD:
+            # One supply per larva (a drone or a pair of zerglings)
+            hatcheries = self.ai.townhalls.ready.amount
+            spawned = hatcheries * min(horizon / LARVA_INTERVAL, MAX_NATURAL_LARVA)
+            # Injected larva from up to one queen per hatchery
+            injectors = min(self.ai.units(UnitTypeId.QUEEN).amount, hatcheries)
+            spawned += injectors * INJECT_LARVA * horizon / INJECT_INTERVAL
+            demand += self.ai.larva.amount + spawned
+
+        # Production cannot outrun income
+        minerals = self.ai.minerals + self.ai.state.score.collection_rate_minerals / 60.0 * horizon
+        return min(demand, minerals / MINERALS_PER_SUPPLY)
+
+    def _build_time(self, unit: UnitTypeId) -> float:
+        return max(self.ai.game_data.units[unit.value].cost.time / GAME_LOOPS_PER_SECOND, 1.0)
+
+    def metrics(self) -> Dict[str, float]:
+        """Supply blocked time and the last projection."""
+        return {
+            'blocked_time': self.blocked_time,
+            'blocked_episodes': self.blocked_episodes,
+            'projected_used': self.projected_used,
+            'projected_cap': self.projected_cap,
+        }
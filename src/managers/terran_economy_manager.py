@@ -3,6 +3,13 @@
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.position import Point2
 
+from .addon_planner import addon_slots, overlaps_addon_slot
+from .mineral_miner import MineralMiner
+from .orbital_scheduler import OrbitalScheduler
+from .supply_planner import SupplyPlanner
+from .worker_distributor import WorkerDistributor
+from .worker_planner import WorkerPlanner
+
 class TerranEconomyManager:
     """Manages the Terran bot's economy including SCVs, resources, and gas mining."""
     
@@ -10,31 +17,40 @@ class TerranEconomyManager:
         """Initialize the TerranEconomyManager with a reference to the main AI object."""
         self.ai = ai
         self.head = None  # Will be set by HeadManager
-        self.worker_ratio = 24  # Increased from 16 to get more workers
         self.gas_workers_per_refinery = 6  # Increased from 3 to get more gas workers
-        self.supply_buffer = 8  # Increased from 4 to be more proactive about supply
         self.expand_when_minerals = 500  # Increased from 400 to slow down expansion
         self.min_time_before_expand = 0  # Removed wait time - can expand immediately
+        self.debug = True  # Enable debug output
+        
+        # Mineral line and refinery saturation, updated incrementally
+        self.worker_distributor = WorkerDistributor(ai, gas_workers_per_building=self.gas_workers_per_refinery)
+        self.mineral_miner = MineralMiner(ai, self.worker_distributor)
+        self.worker_planner = WorkerPlanner(ai, self.worker_distributor)
+        self.supply_planner = SupplyPlanner(ai, UnitTypeId.SUPPLYDEPOT)
+        
+        # Orbital Commands, MULEs and scans
+        self.orbital_scheduler = OrbitalScheduler(ai, self.worker_distributor)
+        self.reset()
+
+    def reset(self):
+        """Clear per-game state so the manager can play another game."""
         self.started_refineries = set()  # Track completed refineries
         self.refinery_started = set()  # Track started refineries to avoid duplicate builds
         self.last_supply_depot_time = 0
         self.last_worker_train_time = 0
-        self.last_worker_distribution = 0
         self.last_supply_attempt = 0  # Track last supply depot attempt time
+        self.last_refinery_attempt = -5.0  # Track last refinery attempt time
         self.supply_attempt_count = 0  # Count consecutive supply depot attempts
-        self.debug = True  # Enable debug output
         self.building_placement_attempts = {}  # Track building placement attempts
         self.first_supply_depot_built = False  # Track if first supply depot is built
-        self.orbital_command_started = False  # Track if orbital command upgrade has been started
-        
-        # Track worker assignments to refineries
-        self.refinery_assignments = {}  # refinery_tag -> set of worker_tags
-        self.worker_refinery_map = {}   # worker_tag -> refinery_tag
+        for component in (self.worker_distributor, self.mineral_miner, self.worker_planner,
+                          self.supply_planner, self.orbital_scheduler):
+            component.reset()
 
     async def on_start(self):
         """Called once at the start of the game."""
         print("Terran Economy Manager initialized")
-        await self.ai.distribute_workers()
+        self.worker_distributor.update()
 
     async def on_step(self):
         current_time = self.ai.time
@@ -46,11 +62,15 @@ class TerranEconomyManager:
         print(f"[DEBUG] === TERRAN ECONOMY COUNTS === Time: {current_time:.1f}s | Refineries: {refineries_count} | Bunkers (ready): {bunkers_count} | Bunkers (building): {bunkers_pending}")
         
         try:
+            # Orbital Commands, MULEs and scans; an idle command center morphs before it trains
+            self.orbital_scheduler.step()
+            
             # Train workers
             for cc in self.ai.townhalls.ready:
                 await self.train_workers(cc)
 
             # Build supply depot
+            self.supply_planner.update()
             await self.build_supply_depot()
 
             # Build refineries
@@ -59,11 +79,12 @@ class TerranEconomyManager:
             # Manage gas workers
             await self.manage_gas_workers()
             
-            # Distribute workers periodically
-            if current_time - self.last_worker_distribution > 10.0:
-                await self.ai.distribute_workers()
-                self.last_worker_distribution = current_time
-
+            # Send surplus workers to a base about to finish
+            self.worker_planner.step()
+            
+            # Precise gather/return commands for mineral workers
+            self.mineral_miner.step()
+            
             # Check if we should expand
             if (self.head and self.head.should_expand() and current_time > self.min_time_before_expand and self.ai.minerals > self.expand_when_minerals):
                 await self.expand_now()
@@ -77,9 +98,10 @@ class TerranEconomyManager:
     async def train_workers(self, structure):
         """Train SCVs from the specified structure if below target worker count."""
         if (structure.is_idle and 
-            self.ai.supply_workers < self.ai.townhalls.amount * self.worker_ratio and 
             self.ai.can_afford(UnitTypeId.SCV) and
-            self.ai.supply_left > 0):  # Don't train if we're supply blocked
+            self.ai.supply_left > 0 and  # Don't train if we're supply blocked
+            structure.tag not in self.ai.unit_tags_received_action and  # Morphing to an Orbital this step
+            self.worker_planner.claim()):  # Below the saturation target of our bases
             structure.train(UnitTypeId.SCV)
             return True
         return False
@@ -96,10 +118,8 @@ class TerranEconomyManager:
         if current_time - self.last_supply_attempt > 10.0:
             self.supply_attempt_count = 0
             
-        # Check if we need supply - be more aggressive
-        if (self.ai.supply_left >= self.supply_buffer or 
-            self.ai.supply_cap >= 200 or 
-            self.ai.already_pending(UnitTypeId.SUPPLYDEPOT) > 0):
+        # Start one only if projected usage over its build time exceeds the projected cap
+        if self.supply_planner.needed() <= 0:
             return False
             
         # Check if we can afford it
@@ -117,21 +137,23 @@ class TerranEconomyManager:
             self.last_supply_attempt = current_time
             return False
             
-        command_center = self.ai.townhalls.first
-        
         # Get all mineral patches and gas geysers to avoid them
         mineral_patches = self.ai.mineral_field
         gas_geysers = self.ai.vespene_geyser
         existing_structures = self.ai.structures
         
-        # Try to find a good location for the supply depot
-        location = await self._find_safe_building_location(
-            UnitTypeId.SUPPLYDEPOT,
-            command_center.position,
-            mineral_patches,
-            gas_geysers,
-            existing_structures
-        )
+        # Try to find a good location for the supply depot, in the main first, then the other bases
+        location = None
+        for base in self.ai.bases.ready():
+            location = await self._find_safe_building_location(
+                UnitTypeId.SUPPLYDEPOT,
+                base.position,
+                mineral_patches,
+                gas_geysers,
+                existing_structures
+            )
+            if location:
+                break
         
         if location:
             # Get the best worker for the job
@@ -189,6 +211,9 @@ class TerranEconomyManager:
         BASE_DISTANCE_MIN = 8.0       # Minimum distance from base
         BASE_DISTANCE_MAX = 20.0      # Maximum distance from base
         
+        # Production add-on slots stay free so add-ons never need a structure to lift
+        reserved = addon_slots(self.ai)
+        
         # Try different positions around the base
         for distance in range(int(BASE_DISTANCE_MIN), int(BASE_DISTANCE_MAX), 2):
             for angle in range(0, 360, 15):  # Try every 15 degrees
@@ -214,7 +239,8 @@ class TerranEconomyManager:
                     if location and await self.ai.can_place(unit_type, location):
                         # Double-check that the final location is also safe
                         if self._is_position_safe(location, mineral_patches, gas_geysers, existing_structures,
-                                                MINERAL_SAFE_DISTANCE, GAS_SAFE_DISTANCE, STRUCTURE_SAFE_DISTANCE):
+                                                MINERAL_SAFE_DISTANCE, GAS_SAFE_DISTANCE, STRUCTURE_SAFE_DISTANCE) \
+                                and not overlaps_addon_slot(self.ai, unit_type, location, reserved):
                             return location
         
         return None
@@ -249,11 +275,11 @@ class TerranEconomyManager:
         current_time = self.ai.time
         
         # Don't try too often
-        if hasattr(self, 'last_refinery_attempt') and current_time - self.last_refinery_attempt < 5.0:
+        if current_time - self.last_refinery_attempt < 5.0:
             return False
             
-        # Get all vespene geysers near our base
-        geysers = self.ai.vespene_geyser.closer_than(15, self.ai.townhalls.first)
+        # Free geysers at every finished base with a working mineral line
+        geysers = self.ai.bases.open_geysers()
         
         for geyser in geysers:
             # Check if we already have a refinery here or are building one
@@ -272,77 +298,14 @@ class TerranEconomyManager:
         return False
 
     async def manage_gas_workers(self):
-        """Manage worker distribution between minerals and gas."""
+        """Keep refineries and mineral lines saturated without redistributing every worker."""
         try:
-            # Update worker assignments
-            self._update_refinery_assignments()
-            
-            # Get all refineries
-            for refinery in self.ai.structures(UnitTypeId.REFINERY).ready:
-                refinery_tag = refinery.tag
-                worker_count = len(self.refinery_assignments.get(refinery_tag, set()))
-                
-                # If we have too few workers on this refinery
-                if worker_count < self.gas_workers_per_refinery:
-                    # Find mineral workers to send to gas
-                    mineral_workers = self.ai.workers.filter(
-                        lambda w: w.is_gathering and w.is_carrying_minerals
-                    )
-                    if mineral_workers and mineral_workers.amount > 8:  # Keep at least 8 on minerals
-                        worker = mineral_workers.random
-                        worker.gather(refinery)
-                        if self.debug and self.ai.time % 10 < 0.1:
-                            print(f"[Terran Economy] Sent mineral worker to gas")
-                
-                # If we have too many workers on this refinery
-                elif worker_count > self.gas_workers_per_refinery:
-                    # Send extra workers to gather minerals
-                    excess_workers = worker_count - self.gas_workers_per_refinery
-                    for worker in self.ai.workers.random_group_of(min(excess_workers, worker_count)):
-                        if worker.is_carrying_vespene:
-                            # If worker is carrying gas, return it first
-                            worker.return_resource()
-                        else:
-                            # Otherwise, send to gather minerals
-                            await self.ai.distribute_workers()
-                            if self.debug and self.ai.time % 10 < 0.1:
-                                print(f"[Terran Economy] Sent excess gas worker to minerals")
-                            
+            self.worker_distributor.gas_workers_per_building = self.gas_workers_per_refinery
+            self.worker_distributor.update()
         except Exception as e:
             if self.debug:
                 print(f"[Terran Economy] Error in manage_gas_workers: {e}")
 
-    def _update_refinery_assignments(self):
-        """Update the tracking of which workers are assigned to which refineries."""
-        try:
-            # Clear old assignments
-            self.refinery_assignments.clear()
-            self.worker_refinery_map.clear()
-            
-            # Get all refineries
-            refineries = self.ai.structures(UnitTypeId.REFINERY).ready
-            
-            # For each refinery, find workers that are gathering from it
-            for refinery in refineries:
-                refinery_tag = refinery.tag
-                self.refinery_assignments[refinery_tag] = set()
-                
-                # Find workers gathering from this refinery
-                workers_at_refinery = self.ai.workers.filter(
-                    lambda w: w.is_gathering and 
-                    w.order_target and 
-                    hasattr(w.order_target, 'tag') and
-                    w.order_target.tag == refinery_tag
-                )
-                
-                for worker in workers_at_refinery:
-                    self.refinery_assignments[refinery_tag].add(worker.tag)
-                    self.worker_refinery_map[worker.tag] = refinery_tag
-                    
-        except Exception as e:
-            if self.debug:
-                print(f"[Terran Economy] Error in _update_refinery_assignments: {e}")
-
     async def expand_now(self):
         """Build a new command center at the closest available expansion location."""
         try:
@@ -364,24 +327,14 @@ class TerranEconomyManager:
             if not expansion_locations:
                 return False
                 
-            # Get the main base (first command center)
-            if not hasattr(self.ai, 'townhalls') or not self.ai.townhalls or not self.ai.townhalls.first:
-                return False
-                
-            main_base = self.ai.townhalls.first
-            
-            # Sort expansion locations by distance to main base
-            sorted_locations = sorted(
-                expansion_locations,
-                key=lambda loc: main_base.position.distance_to(loc) if hasattr(main_base, 'position') else 0
-            )
+            # Free expansions, closest (by ground) to any of our bases first
+            sorted_locations = self.ai.bases.free_expansions()
             
             # Find the first available expansion location
             for location in sorted_locations:
-                # Skip if there's already a command center nearby
-                nearby_cc = self.ai.structures.filter(
-                    lambda unit: unit.type_id == UnitTypeId.COMMANDCENTER and 
-                               unit.position.distance_to(location) < 15
+                # Skip if there's already a command center (or Orbital) nearby
+                nearby_cc = self.ai.townhalls.filter(
+                    lambda unit: unit.position.distance_to(location) < 15
                 )
                 if nearby_cc:
                     continue
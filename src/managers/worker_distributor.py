@@ -0,0 +1,326 @@
+"""Incremental worker distribution shared by the Terran, Protoss and Zerg economy managers.
+
+Replaces python-sc2's distribute_workers(), which rescans every worker and
+resource and reshuffles workers at random. The distributor keeps a record of
+which mineral line or gas building every worker mines, updates it only for
+workers that appeared, died, went idle or were pulled off mining, and issues
+the smallest set of moves that fixes under-saturated sites:
+
+1. Free workers (new or idle) go to the site with the largest deficit;
+   workers commanded earlier in the step or ordered to build are left alone
+2. Remaining deficits are filled from over-saturated sites
+3. A moved worker is not moved again for move_cooldown seconds
+
+Candidates are ranked by ground distance to the site, read from the cached
+map analysis (see map_analysis/), or straight-line distance without it.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from sc2.ids.ability_id import AbilityId
+
+# Orders of a worker that is mining
+GATHER_ABILITIES = {AbilityId.HARVEST_GATHER, AbilityId.HARVEST_RETURN}
+BUILD_PREFIXES = ('TERRANBUILD_', 'PROTOSSBUILD_', 'ZERGBUILD_')  # Orders of a worker that is building
+
+MINERAL_RANGE = 10  # Mineral fields closer than this to a townhall belong to it
+UNREACHABLE_COST = 1e6
+
+
+@dataclass
+class MiningSite:
+    """A mineral line or gas building workers are assigned to."""
+
+    key: Tuple[str, int]  # ('minerals', townhall_tag) or ('gas', building_tag)
+    position: object  # Point2 of the townhall or gas building
+    capacity: int
+    targets: List = field(default_factory=list)  # Units workers gather from
+    workers: Set[int] = field(default_factory=set)
+    expansion: Optional[int] = None  # Index into the map analysis expansions
+
+    @property
+    def is_gas(self) -> bool:
+        return self.key[0] == 'gas'
+
+    @property
+    def deficit(self) -> int:
+        return self.capacity - len(self.workers)
+
+
+class WorkerDistributor:
+    """Tracks per-site saturation and issues only the worker moves that are needed."""
+
+    def __init__(self, ai, gas_workers_per_building: int = 3, min_mineral_workers: int = 8,
+                 move_cooldown: float = 10.0, full_check_interval: float = 2.0):
+        """Initialize the distributor.
+
+        Args:
+            ai: The main bot AI instance
+            gas_workers_per_building: Workers wanted per refinery/assimilator/extractor
+            min_mineral_workers: Workers kept on minerals before any go to gas
+            move_cooldown: Seconds before a moved worker may be moved again
+            full_check_interval: Seconds between checks of every worker's orders
+        """
+        self.ai = ai
+        self.gas_workers_per_building = gas_workers_per_building
+        self.min_mineral_workers = min_mineral_workers
+        self.move_cooldown = move_cooldown
+        self.full_check_interval = full_check_interval
+        self.debug = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear per-game state so the distributor can play another game."""
+        self.sites: Dict[Tuple[str, int], MiningSite] = {}
+        self.worker_site: Dict[int, Tuple[str, int]] = {}  # worker tag -> site key
+        self.worker_target: Dict[int, int] = {}  # worker tag -> mineral field / gas building tag
+        self.target_site: Dict[int, Tuple[str, int]] = {}  # mineral field / gas building tag -> site key
+        self.moved_at: Dict[int, float] = {}  # worker tag -> game time of its last move
+        self._known_workers: Set[int] = set()
+        self._site_signature = None
+        self._last_full_check = -1e9
+        self.moves_issued = 0
+
+    def update(self) -> int:
+        """Bring assignments up to date and issue the needed moves.
+
+        Returns:
+            Number of workers moved this call
+        """
+        self._refresh_sites()
+        if not self.sites:
+            return 0
+
+        workers = self.ai.workers
+        current = set(workers.tags)
+        free: Set[int] = set()
+
+        # Workers that died (or morphed into buildings) since the last update
+        for tag in self._known_workers - current:
+            self._unassign(tag)
+            self.moved_at.pop(tag, None)
+        # New workers, plus idle ones that lost their site
+        free |= current - self._known_workers
+        self._known_workers = current
+        for worker in workers.idle:
+            self._unassign(worker.tag)
+            free.add(worker.tag)
+
+        # Periodically pick up workers pulled off mining (building, scouting, fighting)
+        if self.ai.time - self._last_full_check >= self.full_check_interval:
+            self._last_full_check = self.ai.time
+            for worker in workers:
+                if worker.tag in free:
+                    continue
+                site_key, target = self._site_from_orders(worker)
+                if site_key is None:
+                    self._unassign(worker.tag)
+                elif self.worker_site.get(worker.tag) != site_key:
+                    self._assign(worker.tag, site_key, target)
+
+        # New workers that are already mining keep their site; the rest are free to move
+        free_workers = []
+        for worker in workers.tags_in(free):
+            if self._busy(worker):
+                continue
+            if worker.is_idle:
+                free_workers.append(worker)
+                continue
+            site_key, target = self._site_from_orders(worker)
+            if site_key is not None:
+                self._assign(worker.tag, site_key, target)
+
+        return self._fill_deficits(free_workers)
+
+    def saturation(self) -> Dict[str, int]:
+        """Assigned and wanted workers over all mineral lines and gas buildings."""
+        minerals = [site for site in self.sites.values() if not site.is_gas]
+        gas = [site for site in self.sites.values() if site.is_gas]
+        return {
+            'mineral_workers': sum(len(site.workers) for site in minerals),
+            'mineral_capacity': sum(site.capacity for site in minerals),
+            'gas_workers': sum(len(site.workers) for site in gas),
+            'gas_capacity': sum(site.capacity for site in gas),
+        }
+
+    def _refresh_sites(self) -> None:
+        """Rebuild mining sites when townhalls, gas buildings or mineral fields changed."""
+        townhalls = self.ai.townhalls.ready
+        gas_buildings = self.ai.gas_buildings.ready.filter(lambda g: g.vespene_contents > 0)
+        signature = (frozenset(townhalls.tags), frozenset(gas_buildings.tags), self.ai.mineral_field.amount)
+        if signature == self._site_signature:
+            return
+        self._site_signature = signature
+
+        sites = {}
+        for townhall in townhalls:
+            fields = self.ai.mineral_field.closer_than(MINERAL_RANGE, townhall)
+            if not fields:
+                continue
+            key = ('minerals', townhall.tag)
+            sites[key] = MiningSite(key, townhall.position, 2 * fields.amount,
+                                    targets=list(fields.sorted_by_distance_to(townhall)))
+        for building in gas_buildings:
+            if not townhalls.closer_than(MINERAL_RANGE, building):
+                continue
+            key = ('gas', building.tag)
+            capacity = min(self.gas_workers_per_building, building.ideal_harvesters or 3)
+            sites[key] = MiningSite(key, building.position, capacity, targets=[building])
+
+        analysis = getattr(self.ai, 'map_analysis', None)
+        for site in sites.values():
+            old = self.sites.get(site.key)
+            if old:
+                site.workers = old.workers
+            if analysis is not None:
+                site.expansion = analysis.nearest_expansion(site.position)
+        self.sites = sites
+        self.target_site = {target.tag: key for key, site in sites.items() for target in site.targets}
+
+        # Workers of sites that no longer exist become free on the next full check
+        for tag, key in list(self.worker_site.items()):
+            if key not in sites:
+                self._unassign(tag)
+        self._last_full_check = -1e9
+
+    def _site_from_orders(self, worker) -> Tuple[Optional[Tuple[str, int]], Optional[int]]:
+        """The site and target a worker is mining at according to its orders, if any."""
+        # Mining orders may be preceded by moves (see MineralMiner)
+        order = next((o for o in worker.orders if o.ability.id is not AbilityId.MOVE), None)
+        if order is None or order.ability.id not in GATHER_ABILITIES:
+            return None, None
+        target = order.target
+        if isinstance(target, int):
+            key = self.target_site.get(target)
+            if key is not None:
+                return key, target
+        # Returning cargo: keep the known site and patch
+        return self.worker_site.get(worker.tag), self.worker_target.get(worker.tag)
+
+    def pick_patch(self, site: MiningSite):
+        """Mineral field for one more worker: the nearest patch with fewer than 2 workers."""
+        counts = {target.tag: 0 for target in site.targets}
+        for tag in site.workers:
+            target_tag = self.worker_target.get(tag)
+            if target_tag in counts:
+                counts[target_tag] += 1
+        # site.targets is sorted by distance to the townhall
+        for target in site.targets:
+            if counts[target.tag] < 2:
+                return target
+        return min(site.targets, key=lambda t: counts[t.tag])
+
+    def transfer(self, worker, target) -> None:
+        """Send a worker to a resource outside the known sites (e.g. a base still building).
+
+        The worker is released from its site and picked up again by the
+        periodic order check once the target belongs to a site.
+        """
+        self._unassign(worker.tag)
+        self.moved_at[worker.tag] = self.ai.time
+        self._send(worker, target)
+
+    def _assign(self, tag: int, key: Tuple[str, int], target=None) -> None:
+        self._unassign(tag)
+        self.sites[key].workers.add(tag)
+        self.worker_site[tag] = key
+        if isinstance(target, int):
+            self.worker_target[tag] = target
+
+    def _unassign(self, tag: int) -> None:
+        self.worker_target.pop(tag, None)
+        key = self.worker_site.pop(tag, None)
+        if key is not None and key in self.sites:
+            self.sites[key].workers.discard(tag)
+
+    def _cost(self, worker, site: MiningSite) -> float:
+        """Travel cost of a worker to a site over the pathing grid when available."""
+        analysis = getattr(self.ai, 'map_analysis', None)
+        if analysis is not None and site.expansion is not None:
+            distance = analysis.ground_distance(site.expansion, worker.position)
+            return UNREACHABLE_COST if distance is None else distance
+        return worker.distance_to(site.position)
+
+    def _fill_deficits(self, free_workers: List) -> int:
+        """Move free workers, then surplus workers, into under-saturated sites."""
+        mineral_workers = sum(len(site.workers) for site in self.sites.values() if not site.is_gas)
+        moved = 0
+
+        def deficit_sites():
+            sites = [site for site in self.sites.values() if site.deficit > 0]
+            # Gas only once enough workers mine minerals
+            if mineral_workers + len(free_workers) <= self.min_mineral_workers:
+                sites = [site for site in sites if not site.is_gas]
+            return sorted(sites, key=lambda site: (not site.is_gas, -site.deficit))
+
+        # 1. Free workers fill the largest deficits, nearest worker first
+        for site in deficit_sites():
+            while site.deficit > 0 and free_workers:
+                worker = min(free_workers, key=lambda w: self._cost(w, site))
+                free_workers.remove(worker)
+                self._move(worker, site)
+                moved += 1
+                if not site.is_gas:
+                    mineral_workers += 1
+
+        # Free workers left over: oversaturate the cheapest mineral line rather than idle
+        minerals = [site for site in self.sites.values() if not site.is_gas]
+        for worker in free_workers:
+            if minerals:
+                site = min(minerals, key=lambda s: (len(s.workers) >= s.capacity * 3 // 2, self._cost(worker, s)))
+                self._move(worker, site)
+                moved += 1
+
+        # 2. Remaining deficits are filled from over-saturated sites
+        now = self.ai.time
+        surplus_sites = [site for site in self.sites.values() if site.deficit < 0]
+        by_tag = None
+        for site in deficit_sites():
+            for source in sorted(surplus_sites, key=lambda s: s.deficit):
+                if site.deficit <= 0:
+                    break
+                if source.key == site.key or source.deficit >= 0:
+                    continue
+                if site.is_gas and not source.is_gas and mineral_workers <= self.min_mineral_workers:
+                    continue
+                if by_tag is None:
+                    by_tag = {worker.tag: worker for worker in self.ai.workers}
+                candidates = [
+                    by_tag[tag] for tag in source.workers
+                    if tag in by_tag and now - self.moved_at.get(tag, -1e9) >= self.move_cooldown
+                    and not self._busy(by_tag[tag])
+                ]
+                while site.deficit > 0 and source.deficit < 0 and candidates:
+                    worker = min(candidates, key=lambda w: (w.is_carrying_resource, self._cost(w, site)))
+                    candidates.remove(worker)
+                    self._move(worker, site)
+                    moved += 1
+                    if not source.is_gas and site.is_gas:
+                        mineral_workers -= 1
+
+        if moved and self.debug:
+            print(f"[Worker Distributor] Moved {moved} workers: {self.saturation()}")
+        self.moves_issued += moved
+        return moved
+
+    def _busy(self, worker) -> bool:
+        """True if another manager commanded the worker this step or it is on its way to build."""
+        if worker.tag in self.ai.unit_tags_received_action:
+            return True
+        return any(order.ability.id.name.startswith(BUILD_PREFIXES) for order in worker.orders)
+
+    def _move(self, worker, site: MiningSite) -> None:
+        """Send a worker to a site, returning its cargo first."""
+        target = site.targets[0] if site.is_gas else self.pick_patch(site)
+        self._assign(worker.tag, site.key, target.tag)
+        self.moved_at[worker.tag] = self.ai.time
+        self._send(worker, target)
+
+    def _send(self, worker, target) -> None:
+        """Order a worker to gather from a target, returning its cargo first."""
+        if worker.is_carrying_resource and worker.orders:
+            worker.return_resource()
+            worker.gather(target, queue=True)
+        else:
+            worker.gather(target)
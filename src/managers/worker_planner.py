@@ -0,0 +1,140 @@
+"""Saturation-aware worker production targets shared by the economy managers.
+
+The ideal worker count of every base is derived from the resources it has
+left: 2 workers per mineral patch (1 when the patch is almost mined out) and
+up to 3 per gas building that still has vespene. Townhalls under construction
+count too, so workers for a new base are trained while it builds. The total
+is capped at EconomyConfig.max_workers.
+
+Shortly before a new townhall finishes, surplus mineral workers are sent to
+its patches so they arrive as it completes.
+"""
+
+from typing import Dict
+
+from sc2.data import race_worker
+
+from config.config import config as bot_config
+
+MINERAL_RANGE = 10  # Resources closer than this to a townhall belong to it
+LOW_PATCH_CONTENTS = 150  # A patch this close to mined out only needs 1 worker
+WORKER_SPEED = 3.94  # Distance per game second
+TRANSFER_MARGIN = 2.0  # Seconds of slack when timing a transfer
+REFRESH_INTERVAL = 1.0  # Game seconds between target recalculations
+
+
+class WorkerPlanner:
+    """Decides how many workers to build and when to transfer them."""
+
+    def __init__(self, ai, distributor, max_workers: int = None):
+        """Initialize the planner.
+
+        Args:
+            ai: The main bot AI instance
+            distributor: WorkerDistributor owning worker assignments
+            max_workers: Worker cap (default: EconomyConfig.max_workers)
+        """
+        self.ai = ai
+        self.distributor = distributor
+        self.max_workers = max_workers if max_workers is not None else bot_config.economy.max_workers
+        self.debug = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear per-game state so the planner can play another game."""
+        self.base_targets: Dict[int, int] = {}  # townhall tag -> ideal workers
+        self._last_refresh = None
+        self._claimed_loop = None
+        self._claimed = 0
+        self._transferred = set()  # Townhall tags workers were already sent to
+
+    @property
+    def target(self) -> int:
+        """Total workers wanted over all bases, capped at max_workers."""
+        self._refresh()
+        return min(sum(self.base_targets.values()), self.max_workers)
+
+    def claim(self) -> bool:
+        """Reserve one worker to train this step if below target.
+
+        Call it last, right before training, so several townhalls (or larva)
+        in one step cannot overshoot the target. Workers in production (queued
+        at a townhall or in an egg) count towards the target too.
+        """
+        loop = self.ai.state.game_loop
+        if loop != self._claimed_loop:
+            self._claimed_loop = loop
+            self._claimed = 0
+        workers = self.ai.supply_workers + self.ai.already_pending(race_worker[self.ai.race])
+        if workers + self._claimed >= self.target:
+            return False
+        self._claimed += 1
+        return True
+
+    def _refresh(self) -> None:
+        """Recalculate per-base targets from live mineral and vespene contents."""
+        now = self.ai.time
+        if self._last_refresh is not None and now - self._last_refresh < REFRESH_INTERVAL:
+            return
+        self._last_refresh = now
+        gas_per_building = min(self.distributor.gas_workers_per_building, 3)
+
+        targets = {}
+        for townhall in self.ai.townhalls:
+            wanted = 0
+            for patch in self.ai.mineral_field.closer_than(MINERAL_RANGE, townhall):
+                if patch.mineral_contents >= LOW_PATCH_CONTENTS:
+                    wanted += 2
+                elif patch.mineral_contents > 0:
+                    wanted += 1
+            for building in self.ai.gas_buildings.closer_than(MINERAL_RANGE, townhall):
+                if not building.is_ready or building.vespene_contents > 0:
+                    wanted += gas_per_building
+            targets[townhall.tag] = wanted
+        self.base_targets = targets
+
+    def step(self) -> int:
+        """Send surplus workers to a townhall that is about to finish.
+
+        Returns:
+            Number of workers transferred
+        """
+        pending = [townhall for townhall in self.ai.townhalls.not_ready if townhall.tag not in self._transferred]
+        if not pending:
+            return 0
+        sources = [site for site in self.distributor.sites.values() if not site.is_gas and site.deficit < 0]
+        if not sources:
+            return 0
+
+        moved = 0
+        for townhall in pending:
+            patches = self.ai.mineral_field.closer_than(MINERAL_RANGE, townhall)
+            if not patches:
+                self._transferred.add(townhall.tag)
+                continue
+            source = min(sources, key=lambda site: site.position.distance_to(townhall.position))
+            build_time = self.ai.game_data.units[townhall.type_id.value].cost.time / 22.4
+            remaining = (1.0 - townhall.build_progress) * build_time
+            travel = source.position.distance_to(townhall.position) / WORKER_SPEED
+            if remaining > travel + TRANSFER_MARGIN:
+                continue
+
+            # Nearest patches first, 2 each, up to the surplus of all mineral lines
+            surplus = sum(-site.deficit for site in sources)
+            patches = patches.sorted_by_distance_to(townhall)
+            wanted = min(surplus, 2 * patches.amount)
+            workers = {worker.tag: worker for worker in self.ai.workers}
+            for i in range(wanted):
+                site = min(sources, key=lambda s: s.deficit)
+                if site.deficit >= 0:
+                    break
+                candidates = [workers[tag] for tag in site.workers if tag in workers]
+                if not candidates:
+                    break
+                worker = min(candidates, key=lambda w: (w.is_carrying_resource, w.distance_to(townhall)))
+                self.distributor.transfer(worker, patches[i // 2])
+                moved += 1
+            self._transferred.add(townhall.tag)
+            if self.debug:
+                print(f"[Worker Planner] Sent {moved} workers to the new base at {townhall.position}")
+        return moved
@@ -3,6 +3,13 @@
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.position import Point2
 
+from .larva_allocator import PRIORITY_SUPPLY, PRIORITY_WORKERS
+from .mineral_miner import MineralMiner
+from .queen_scheduler import QueenScheduler
+from .supply_planner import SupplyPlanner
+from .worker_distributor import WorkerDistributor
+from .worker_planner import WorkerPlanner
+
 class ZergEconomyManager:
     """Manages the Zerg bot's economy including drones, resources, and gas mining."""
     
@@ -10,29 +17,36 @@ class ZergEconomyManager:
         """Initialize the ZergEconomyManager with a reference to the main AI object."""
         self.ai = ai
         self.head = None  # Will be set by HeadManager
-        self.worker_ratio = 24  # Target drone count per hatchery
         self.gas_workers_per_extractor = 3  # Zerg uses 3 drones per extractor
-        self.supply_buffer = 8  # Overlord buffer to avoid supply block
         self.expand_when_minerals = 500  # When to expand
         self.min_time_before_expand = 0  # Can expand immediately
+        self.debug = True  # Enable debug output
+        
+        # Mineral line and extractor saturation, updated incrementally
+        self.worker_distributor = WorkerDistributor(ai, gas_workers_per_building=self.gas_workers_per_extractor)
+        self.mineral_miner = MineralMiner(ai, self.worker_distributor)
+        self.worker_planner = WorkerPlanner(ai, self.worker_distributor)
+        self.supply_planner = SupplyPlanner(ai, UnitTypeId.OVERLORD)
+        
+        # Queens: one injector per hatchery plus creep spreaders
+        self.queen_scheduler = QueenScheduler(ai)
+        self.reset()
+
+    def reset(self):
+        """Clear per-game state so the manager can play another game."""
         self.extractor_started = set()  # Track started extractors
         self.last_overlord_time = 0
         self.last_drone_train_time = 0
-        self.last_worker_distribution = 0
-        self.last_overlord_attempt = 0  # Track last overlord attempt time
-        self.overlord_attempt_count = 0  # Count consecutive overlord attempts
-        self.debug = True  # Enable debug output
         self.building_placement_attempts = {}  # Track building placement attempts
         self.first_overlord_built = False  # Track if first overlord is built
-        
-        # Track drone assignments to extractors
-        self.extractor_assignments = {}  # extractor_tag -> set of drone_tags
-        self.drone_extractor_map = {}   # drone_tag -> extractor_tag
+        for component in (self.worker_distributor, self.mineral_miner, self.worker_planner,
+                          self.supply_planner, self.queen_scheduler):
+            component.reset()
 
     async def on_start(self):
         """Called once at the start of the game."""
         print("Zerg Economy Manager initialized")
-        await self.ai.distribute_workers()
+        self.worker_distributor.update()
 
     async def on_step(self):
         current_time = self.ai.time
@@ -44,24 +58,28 @@ class ZergEconomyManager:
         print(f"[DEBUG] === ZERG ECONOMY COUNTS === Time: {current_time:.1f}s | Extractors: {extractors_count} | Overlords (ready): {overlords_count} | Overlords (building): {overlords_pending}")
         
         try:
-            # Train drones
-            for hatchery in self.ai.townhalls.ready:
-                await self.train_drones(hatchery)
+            # Request drones from the larva budget
+            await self.train_drones()
 
             # Build overlords
+            self.supply_planner.update()
             await self.build_overlords()
 
+            # Queen production, injects and creep spread
+            self.queen_scheduler.step()
+
             # Build extractors
             await self.build_extractors()
             
             # Manage gas drones
             await self.manage_gas_drones()
             
-            # Distribute workers periodically
-            if current_time - self.last_worker_distribution > 10.0:
-                await self.ai.distribute_workers()
-                self.last_worker_distribution = current_time
-
+            # Send surplus drones to a base about to finish
+            self.worker_planner.step()
+            
+            # Precise gather/return commands for mineral drones
+            self.mineral_miner.step()
+            
             # Check if we should expand
             if (self.head and self.head.should_expand() and current_time > self.min_time_before_expand and self.ai.minerals > self.expand_when_minerals):
                 await self.expand_now()
@@ -72,62 +90,44 @@ class ZergEconomyManager:
                 import traceback
                 traceback.print_exc()
 
-    async def train_drones(self, structure):
-        """Train drones from the specified structure if below target drone count."""
-        if (self.ai.supply_workers < self.ai.townhalls.amount * self.worker_ratio and 
-            self.ai.can_afford(UnitTypeId.DRONE) and
-            self.ai.supply_left > 0):  # Don't train if we're supply blocked
-            
-            # For Zerg, we need to use larva to train drones
-            larva = self.ai.larva
-            if larva:
-                larva.random.train(UnitTypeId.DRONE)
-                if self.debug and self.ai.time % 10 < 0.1:
-                    print(f"[Zerg Economy] Training Drone from larva")
-                return True
-        return False
-
-    async def build_overlords(self):
-        """Morph overlords from larva if we're close to being supply blocked."""
-        current_time = self.ai.time
-
-        # Don't try too often
-        if current_time - self.last_overlord_attempt < 1.0:
+    async def train_drones(self):
+        """Request drones from the larva allocator while below the target drone count."""
+        allocator = self.ai.larva_allocator
+        if allocator is None or not self.ai.larva:
             return False
+        
+        # One claim per larva we could use, so the request never exceeds the target
+        count = 0
+        while count < self.ai.larva.amount and self.worker_planner.claim():
+            count += 1
+        if not count:
+            return False
+        
+        # Larvae nearest the least saturated mineral line
+        sites = [site for site in self.worker_distributor.sites.values() if not site.is_gas]
+        near = max(sites, key=lambda site: site.deficit).position if sites else None
+        allocator.request(UnitTypeId.DRONE, count, priority=PRIORITY_WORKERS, near=near, source='drones')
+        return True
 
-        # Reset attempt counter if it's been a while
-        if current_time - self.last_overlord_attempt > 10.0:
-            self.overlord_attempt_count = 0
+    async def build_overlords(self):
+        """Request overlords from the larva allocator when the supply planner needs them.
 
-        # Check if we need supply - be more aggressive
-        if (self.ai.supply_left >= self.supply_buffer or 
-            self.ai.supply_cap >= 200 or 
-            self.ai.already_pending(UnitTypeId.OVERLORD) > 0):
+        Requested every step it is needed: the allocator holds minerals back
+        from drones and army until the overlords can be paid for.
+        """
+        allocator = self.ai.larva_allocator
+        if allocator is None:
             return False
 
-        # Check if we can afford it
-        if not self.ai.can_afford(UnitTypeId.OVERLORD):
-            if self.debug and self.overlord_attempt_count == 0:
-                print(f"[Zerg Economy] Can't afford Overlord (need 100 minerals, have {self.ai.minerals})")
-            self.last_overlord_attempt = current_time
-            self.overlord_attempt_count += 1
+        # Start one only if projected usage over its build time exceeds the projected cap
+        needed = self.supply_planner.needed()
+        if needed <= 0:
             return False
 
-        # Morph Overlord from larva
-        larva = self.ai.larva
-        if larva:
-            larva.random.train(UnitTypeId.OVERLORD)
-            if self.debug:
-                print(f"[Zerg Economy] Morphing Overlord from larva")
-            self.last_overlord_attempt = current_time
-            self.overlord_attempt_count = 0
-            return True
-        else:
-            if self.debug and self.overlord_attempt_count == 0:
-                print("[Zerg Economy] No larva available to morph Overlord")
-            self.last_overlord_attempt = current_time
-            self.overlord_attempt_count += 1
-            return False
+        allocator.request(UnitTypeId.OVERLORD, needed, priority=PRIORITY_SUPPLY, source='overlords')
+        if self.debug and self.ai.time % 10 < 0.1:
+            print(f"[Zerg Economy] Requesting {needed} Overlord(s)")
+        return True
 
     async def build_extractors(self):
         """Build extractors when we have enough drones."""
@@ -135,8 +135,8 @@ class ZergEconomyManager:
         if not self.ai.townhalls or not self.ai.can_afford(UnitTypeId.EXTRACTOR):
             return False
             
-        # Get all vespene geysers
-        geysers = self.ai.vespene_geyser.closer_than(15, self.ai.townhalls.first)
+        # Free geysers at every finished base with a working mineral line
+        geysers = self.ai.bases.open_geysers()
         
         for geyser in geysers:
             # Check if we already have an extractor here or are building one
@@ -154,76 +154,14 @@ class ZergEconomyManager:
         return False
 
     async def manage_gas_drones(self):
-        """Manage drone distribution between minerals and gas."""
+        """Keep extractors and mineral lines saturated without redistributing every drone."""
         try:
-            # Update drone assignments
-            self._update_extractor_assignments()
-            
-            # Get all extractors
-            for extractor in self.ai.structures(UnitTypeId.EXTRACTOR).ready:
-                extractor_tag = extractor.tag
-                worker_count = len(self.extractor_assignments.get(extractor_tag, set()))
-                
-                # If we have too few workers on this extractor
-                if worker_count < self.gas_workers_per_extractor:
-                    # Find mineral drones to send to gas
-                    mineral_drones = self.ai.workers.filter(
-                        lambda w: w.is_gathering and w.is_carrying_minerals
-                    )
-                    if mineral_drones and mineral_drones.amount > 8:  # Keep at least 8 on minerals
-                        drone = mineral_drones.random
-                        drone.gather(extractor)
-                        if self.debug and self.ai.time % 10 < 0.1:
-                            print(f"[Zerg Economy] Sent mineral drone to gas")
-                
-                # If we have too many workers on this extractor
-                elif worker_count > self.gas_workers_per_extractor:
-                    # Send extra workers to gather minerals
-                    excess_workers = worker_count - self.gas_workers_per_extractor
-                    for drone in self.ai.workers.random_group_of(min(excess_workers, worker_count)):
-                        if drone.is_carrying_vespene:
-                            # If drone is carrying gas, return it first
-                            drone.return_resource()
-                        else:
-                            # Otherwise, send to gather minerals
-                            await self.ai.distribute_workers()
-                            if self.debug and self.ai.time % 10 < 0.1:
-                                print(f"[Zerg Economy] Sent excess gas drone to minerals")
-                            
+            self.worker_distributor.gas_workers_per_building = self.gas_workers_per_extractor
+            self.worker_distributor.update()
         except Exception as e:
             if self.debug:
                 print(f"[Zerg Economy] Error in manage_gas_drones: {e}")
 
-    def _update_extractor_assignments(self):
-        """Update the tracking of which drones are assigned to which extractors."""
-        try:
-            # Clear old assignments
-            self.extractor_assignments.clear()
-            self.drone_extractor_map.clear()
-            
-            # Get all extractors
-            extractors = self.ai.structures(UnitTypeId.EXTRACTOR).ready
-            
-            # For each extractor, find drones that are gathering from it
-            for extractor in extractors:
-                extractor_tag = extractor.tag
-                self.extractor_assignments[extractor_tag] = set()
-                
-                # Find drones gathering from this extractor
-                drones_at_extractor = self.ai.workers.filter(
-                    lambda w: w.is_gathering and 
-                    w.order_target and 
-                    w.order_target.tag == extractor_tag
-                )
-                
-                for drone in drones_at_extractor:
-                    self.extractor_assignments[extractor_tag].add(drone.tag)
-                    self.drone_extractor_map[drone.tag] = extractor_tag
-                    
-        except Exception as e:
-            if self.debug:
-                print(f"[Zerg Economy] Error in _update_extractor_assignments: {e}")
-
     async def expand_now(self):
         """Build a new hatchery at the closest available expansion location."""
         try:
@@ -245,17 +183,8 @@ class ZergEconomyManager:
             if not expansion_locations:
                 return False
                 
-            # Get the main base (first hatchery)
-            if not hasattr(self.ai, 'townhalls') or not self.ai.townhalls or not self.ai.townhalls.first:
-                return False
-                
-            main_base = self.ai.townhalls.first
-            
-            # Sort expansion locations by distance to main base
-            sorted_locations = sorted(
-                expansion_locations,
-                key=lambda loc: main_base.position.distance_to(loc) if hasattr(main_base, 'position') else 0
-            )
+            # Free expansions, closest (by ground) to any of our bases first
+            sorted_locations = self.ai.bases.free_expansions()
             
             # Find the first available expansion location
             for location in sorted_locations:
@@ -3,6 +3,8 @@
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.position import Point2
 
+from .larva_allocator import PRIORITY_ARMY
+
 class ZergMilitaryManager:
     """Manages the Zerg bot's military including unit production and army control."""
     
@@ -11,7 +13,10 @@ class ZergMilitaryManager:
         self.ai = ai
         self.head = None  # Will be set by HeadManager
         self.debug = True  # Enable debug output
-        
+        self.reset()
+
+    def reset(self):
+        """Clear per-game state so the manager can play another game."""
         # Build order tracking
         self.build_order_completed = False
         self.build_order_step = 0
@@ -39,8 +44,7 @@ class ZergMilitaryManager:
         print("Zerg Military Manager initialized")
         # Set rally point near the hatchery
         if self.ai.townhalls:
-            hatchery = self.ai.townhalls.first
-            self.rally_point = hatchery.position.towards(self.ai.game_info.map_center, 8)  # Closer to hatchery
+            self.rally_point = self.ai.bases.rally_point(8)  # In front of the most forward base
 
     async def on_step(self):
         """Called every game step."""
@@ -115,7 +119,8 @@ class ZergMilitaryManager:
         if not self.ai.townhalls:
             return False
             
-        hatchery = self.ai.townhalls.first
+        # Tech and production stay in the main
+        hatchery = self.ai.bases.main
         
         # Get mineral patches and gas geysers to avoid worker paths
         mineral_patches = self.ai.mineral_field
@@ -229,28 +234,22 @@ class ZergMilitaryManager:
         return True
 
     async def _train_units(self):
-        """Train military units."""
-        # Train Zerglings from Hatcheries (if Spawning Pool is ready)
-        if self.spawning_pool_built:
-            for hatchery in self.ai.townhalls.ready:
-                if self.ai.can_afford(UnitTypeId.ZERGLING):
-                    # Use larva to train zerglings
-                    larva = self.ai.larva
-                    if larva:
-                        larva.random.train(UnitTypeId.ZERGLING)
-                        if self.debug and self.ai.time % 10 < 0.1:
-                            print("[Zerg Military] Training Zergling")
-                        
-        # Train Roaches from Hatcheries (if Roach Warren is ready)
-        if self.roach_warren_built:
-            for hatchery in self.ai.townhalls.ready:
-                if self.ai.can_afford(UnitTypeId.ROACH):
-                    # Use larva to train roaches
-                    larva = self.ai.larva
-                    if larva:
-                        larva.random.train(UnitTypeId.ROACH)
-                        if self.debug and self.ai.time % 10 < 0.1:
-                            print("[Zerg Military] Training Roach")
+        """Request military units from the larva allocator with whatever larva is left."""
+        allocator = self.ai.larva_allocator
+        if allocator is None:
+            return
+        
+        # Roaches first; zerglings take the remaining larva. Filed every step,
+        # they are served after overlords and drones.
+        if self.roach_warren_built and self.ai.structures(UnitTypeId.ROACHWARREN).ready:
+            allocator.request(UnitTypeId.ROACH, None, priority=PRIORITY_ARMY + 1,
+                              near=self.rally_point, source='roaches')
+        if self.spawning_pool_built and self.ai.structures(UnitTypeId.SPAWNINGPOOL).ready:
+            allocator.request(UnitTypeId.ZERGLING, None, priority=PRIORITY_ARMY,
+                              near=self.rally_point, source='zerglings')
+        
+        if self.debug and self.ai.time % 10 < 0.1:
+            print(f"[Zerg Military] Larva used last step: {allocator.allocated}, unused: {allocator.unused}")
 
     async def _control_army(self):
         """Control the army - gather units and attack."""
@@ -268,21 +267,19 @@ class ZergMilitaryManager:
         
         # Update rally point to be closer to the nearest hatchery
         if self.ai.townhalls:
-            hatchery = self.ai.townhalls.first
-            self.rally_point = hatchery.position.towards(self.ai.game_info.map_center, 8)
+            self.rally_point = self.ai.bases.rally_point(8)
         
-        # Check for enemy units near our base (defensive trigger)
-        enemy_units_near_base = self.ai.enemy_units.filter(
-            lambda unit: unit.position.distance_to(self.ai.townhalls.first.position) < 30
-        )
+        # Check for enemy units near any of our bases (defensive trigger)
+        threatened = self.ai.bases.threatened()
         
-        # If enemy units are near our base, go full defensive mode
-        if enemy_units_near_base and army_size > 0:
+        # If enemy units are near a base, go full defensive mode at the most threatened one
+        if threatened and army_size > 0:
+            base = threatened[0]
             if self.debug:
-                print(f"[Zerg Military] DEFENSIVE MODE: {enemy_units_near_base.amount} enemy units near base!")
+                print(f"[Zerg Military] DEFENSIVE MODE: {base.enemies.amount} enemy units near base at {base.position}!")
             
-            # Attack the closest enemy unit to our base
-            closest_enemy = enemy_units_near_base.closest_to(self.ai.townhalls.first)
+            # Attack the closest enemy unit to that base
+            closest_enemy = base.enemies.closest_to(base.position)
             
             for unit in army:
                 unit.attack(closest_enemy)
@@ -291,18 +288,17 @@ class ZergMilitaryManager:
                 print(f"[Zerg Military] Army attacking enemy at {closest_enemy.position}")
             return
         
-        # Check for enemy units in a wider radius (counter-attack range)
-        enemy_units_in_range = self.ai.enemy_units.filter(
-            lambda unit: unit.position.distance_to(self.ai.townhalls.first.position) < 50
-        )
+        # Check for enemy units in a wider radius of any base (counter-attack range)
+        enemy_units_in_range = self.ai.bases.enemies_near()
         
         # If enemy units are in counter-attack range and we have a decent army, pursue them
         if enemy_units_in_range and army_size >= 3:
             if self.debug and self.ai.time % 10 < 0.1:
                 print(f"[Zerg Military] COUNTER-ATTACK: Pursuing {enemy_units_in_range.amount} enemy units!")
             
-            # Attack the closest enemy unit
-            closest_enemy = enemy_units_in_range.closest_to(self.ai.townhalls.first)
+            # Attack the closest enemy unit to our bases
+            closest_enemy = min(enemy_units_in_range,
+                                key=lambda u: min(u.distance_to(b.position) for b in self.ai.bases.bases))
             
             for unit in army:
                 unit.attack(closest_enemy)
@@ -343,7 +339,7 @@ class ZergMilitaryManager:
                 attack_type = "OFFENSIVE"
             elif self.ai.enemy_units and army_size >= 12:  # Only attack nearby enemies if we have a large army
                 # Attack nearby enemy units (defensive)
-                target = self.ai.enemy_units.closest_to(self.ai.townhalls.first)
+                target = self.ai.enemy_units.closest_to(self.ai.bases.forward().position)
                 attack_type = "DEFENSIVE"
             else:
                 # No good target, stay at rally point
@@ -0,0 +1,18 @@
+"""Per-map analysis, cached on disk per map hash."""
+
+from .map_analyzer import ANALYSIS_VERSION, MapAnalysis, analyze_map, map_hash
+from .map_cache import MapCache
+from .threat_map import ThreatMap, ThreatSnapshot, compute_threat_map, threat_map_from_view, threat_snapshot
+
+__all__ = [
+    'ANALYSIS_VERSION',
+    'MapAnalysis',
+    'MapCache',
+    'ThreatMap',
+    'ThreatSnapshot',
+    'analyze_map',
+    'compute_threat_map',
+    'map_hash',
+    'threat_map_from_view',
+    'threat_snapshot',
+]
@@ -0,0 +1,296 @@
+"""
+Map Analyzer for B0B - The Builder Bot
+
+Runs the expensive per-map analysis once and packs the results into NumPy
+arrays so they can be cached on disk (see map_analysis/map_cache.py):
+
+- expansions and the resources that belong to them (python-sc2's result)
+- ramps and vision blockers (python-sc2's result)
+- regions: connected placeable areas, with the regions each ramp connects
+- expansion paths: a ground distance field from every expansion, and the
+  expansion-to-expansion path lengths
+- placement slots: free 3x3 building spots around every expansion
+
+Distances are in grid steps with diagonal moves allowed.
+"""
+
+import hashlib
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from sc2.game_info import Ramp
+from sc2.position import Point2
+
+ANALYSIS_VERSION = 1
+UNREACHABLE = np.iinfo(np.uint16).max
+
+# Placement slot search around every expansion
+SLOTS_PER_EXPANSION = 24
+SLOT_MAX_DISTANCE = 18  # Ground distance from the expansion
+SLOT_TOWNHALL_CLEARANCE = 5.5
+SLOT_RESOURCE_CLEARANCE = 4.5
+
+
+@dataclass
+class MapAnalysis:
+    """Cacheable results of analyzing one map.
+
+    Point arrays hold (x, y) rows. Grids are indexed [y, x] like python-sc2's
+    data_numpy.
+    """
+
+    map_name: str
+    map_hash: str
+    expansions: np.ndarray  # (E, 2) expansion centers
+    resource_positions: np.ndarray  # (R, 2) resource positions
+    resource_expansions: np.ndarray  # (R,) expansion index of every resource row
+    ramp_points: np.ndarray  # (P, 2) points of all ramps
+    ramp_ids: np.ndarray  # (P,) ramp index of every point
+    ramp_regions: np.ndarray  # (ramps, 2) regions a ramp connects, 0 if none
+    vision_blockers: np.ndarray  # (V, 2)
+    regions: np.ndarray  # (H, W) region label, 0 for unplaceable
+    expansion_distances: np.ndarray  # (E, H, W) ground distance from each expansion
+    expansion_paths: np.ndarray  # (E, E) ground distance between expansions
+    placement_slots: np.ndarray  # (S, 2) 3x3 building centers
+    slot_expansions: np.ndarray  # (S,) expansion index of every slot
+    analysis_time: float = 0.0  # Seconds the analysis took when it was computed
+
+    # Array fields, in the order they are written to the cache
+    ARRAYS = (
+        'expansions', 'resource_positions', 'resource_expansions', 'ramp_points', 'ramp_ids',
+        'ramp_regions', 'vision_blockers', 'regions', 'expansion_distances', 'expansion_paths',
+        'placement_slots', 'slot_expansions',
+    )
+
+    def nearest_expansion(self, position) -> int:
+        """Index of the expansion closest (straight line) to a position."""
+        deltas = self.expansions - np.array([position[0], position[1]])
+        return int(np.argmin(np.einsum('ij,ij->i', deltas, deltas)))
+
+    def ground_distance(self, expansion: int, position) -> Optional[int]:
+        """Ground distance from an expansion to a position, or None if unreachable."""
+        distance = int(self.expansion_distances[expansion, int(position[1]), int(position[0])])
+        return None if distance == UNREACHABLE else distance
+
+    def region_at(self, position) -> int:
+        """Region label at a position (0 if not placeable)."""
+        return int(self.regions[int(position[1]), int(position[0])])
+
+    def slots_for(self, expansion: int) -> List[Point2]:
+        """Placement slots around an expansion, closest first."""
+        return [Point2((float(x), float(y))) for x, y in self.placement_slots[self.slot_expansions == expansion]]
+
+    def apply(self, bot) -> None:
+        """Restore python-sc2's first step analysis on a bot from these results."""
+        game_info = bot.game_info
+        expansions = [Point2((float(x), float(y))) for x, y in self.expansions]
+        mapping: Dict[Point2, set] = {}
+        for (x, y), index in zip(self.resource_positions.tolist(), self.resource_expansions.tolist()):
+            mapping.setdefault(Point2((x, y)), set()).add(expansions[index])
+        groups: Dict[int, list] = {}
+        for (x, y), ramp in zip(self.ramp_points.tolist(), self.ramp_ids.tolist()):
+            groups.setdefault(ramp, []).append(Point2((x, y)))
+        ramps = [Ramp(frozenset(points), game_info) for _, points in sorted(groups.items())]
+        vision_blockers = frozenset(Point2((x, y)) for x, y in self.vision_blockers.tolist())
+
+        # Assign only once everything converted, so a failure leaves the bot untouched
+        if bot.townhalls:
+            game_info.player_start_location = bot.townhalls.first.position
+        bot._expansion_positions_list = expansions
+        bot._resource_location_to_expansion_position_dict = mapping
+        game_info.map_ramps = ramps
+        game_info.vision_blockers = vision_blockers
+        bot._time_before_step = time.perf_counter()
+
+
+def map_hash(bot) -> str:
+    """Hash of everything the analysis depends on: map grids and start resources."""
+    game_info = bot.game_info
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(game_info.map_name.encode())
+    for grid in (game_info.pathing_grid, game_info.placement_grid, game_info.terrain_height):
+        digest.update(np.ascontiguousarray(grid.data_numpy).tobytes())
+    area = game_info.playable_area
+    digest.update(np.array([area.x, area.y, area.width, area.height], dtype=np.float64).tobytes())
+    resources = sorted((r.position.x, r.position.y, r.type_id.value) for r in bot.resources)
+    digest.update(np.array(resources, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def analyze_map(bot, key: Optional[str] = None) -> MapAnalysis:
+    """Analyze the map of a bot whose python-sc2 first step preparation already ran."""
+    start = time.perf_counter()
+    game_info = bot.game_info
+    pathable = game_info.pathing_grid.data_numpy.astype(bool)
+    placeable = game_info.placement_grid.data_numpy.astype(bool)
+    playable = np.zeros_like(pathable)
+    area = game_info.playable_area
+    playable[int(area.y):int(area.y + area.height), int(area.x):int(area.x + area.width)] = True
+    pathable &= playable
+    placeable &= playable
+
+    # Expansions and their resources
+    expansions = list(bot._expansion_positions_list)
+    index_of = {position: i for i, position in enumerate(expansions)}
+    resource_rows, resource_expansions = [], []
+    for position, centers in bot._resource_location_to_expansion_position_dict.items():
+        for center in centers:
+            resource_rows.append((position.x, position.y))
+            resource_expansions.append(index_of[center])
+    expansion_array = np.array([(p.x, p.y) for p in expansions], dtype=np.float64).reshape(-1, 2)
+    resource_positions = np.array(resource_rows, dtype=np.float64).reshape(-1, 2)
+
+    # Ramps and vision blockers
+    ramp_rows, ramp_ids = [], []
+    for ramp_id, ramp in enumerate(game_info.map_ramps):
+        for point in sorted(ramp.points):
+            ramp_rows.append((int(point.x), int(point.y)))
+            ramp_ids.append(ramp_id)
+    ramp_points = np.array(ramp_rows, dtype=np.int16).reshape(-1, 2)
+    vision_blockers = np.array(sorted((int(p.x), int(p.y)) for p in game_info.vision_blockers),
+                               dtype=np.int16).reshape(-1, 2)
+
+    # Regions and the regions every ramp connects
+    regions = _label_regions(placeable)
+    ramp_regions = np.zeros((len(game_info.map_ramps), 2), dtype=np.int16)
+    for ramp_id in range(len(game_info.map_ramps)):
+        points = ramp_points[np.asarray(ramp_ids) == ramp_id]
+        ramp_regions[ramp_id] = _adjacent_regions(regions, points)
+
+    # Ground distance fields from every expansion (the townhall footprint is the source)
+    distances = np.full((len(expansions),) + pathable.shape, UNREACHABLE, dtype=np.uint16)
+    for i, (x, y) in enumerate(expansion_array):
+        seeds = np.zeros_like(pathable)
+        seeds[int(y) - 2:int(y) + 3, int(x) - 2:int(x) + 3] = True
+        distances[i] = _distance_field(pathable | seeds, seeds)
+    paths = np.full((len(expansions), len(expansions)), np.inf, dtype=np.float32)
+    for i in range(len(expansions)):
+        for j, (x, y) in enumerate(expansion_array):
+            distance = distances[i, int(y), int(x)]
+            if distance != UNREACHABLE:
+                paths[i, j] = distance
+
+    slots, slot_expansions = _placement_slots(placeable, regions, expansion_array, resource_positions, distances)
+
+    return MapAnalysis(
+        map_name=game_info.map_name,
+        map_hash=key or map_hash(bot),
+        expansions=expansion_array,
+        resource_positions=resource_positions,
+        resource_expansions=np.array(resource_expansions, dtype=np.int16),
+        ramp_points=ramp_points,
+        ramp_ids=np.array(ramp_ids, dtype=np.int16),
+        ramp_regions=ramp_regions,
+        vision_blockers=vision_blockers,
+        regions=regions,
+        expansion_distances=distances,
+        expansion_paths=paths,
+        placement_slots=slots,
+        slot_expansions=slot_expansions,
+        analysis_time=time.perf_counter() - start,
+    )
+
+
+def _dilate(mask: np.ndarray) -> np.ndarray:
+    """Grow a boolean mask by one cell in all 8 directions."""
+    grown = mask.copy()
+    grown[1:, :] |= mask[:-1, :]
+    grown[:-1, :] |= mask[1:, :]
+    grown[:, 1:] |= grown[:, :-1].copy()
+    grown[:, :-1] |= grown[:, 1:].copy()
+    return grown
+
+
+def _distance_field(walkable: np.ndarray, sources: np.ndarray) -> np.ndarray:
+    """Breadth-first ground distance from the source cells, one wavefront per step."""
+    distances = np.full(walkable.shape, UNREACHABLE, dtype=np.uint16)
+    frontier = sources & walkable
+    reached = frontier.copy()
+    step = 0
+    while frontier.any():
+        distances[frontier] = step
+        frontier = _dilate(frontier) & walkable & ~reached
+        reached |= frontier
+        step += 1
+    return distances
+
+
+def _label_regions(placeable: np.ndarray) -> np.ndarray:
+    """Label 4-connected placeable areas 1..n (0 = unplaceable)."""
+    height, width = placeable.shape
+    labels = np.zeros(placeable.shape, dtype=np.int16)
+    flat = labels.reshape(-1)
+    free = placeable.reshape(-1).copy()
+    label = 0
+    for start in np.flatnonzero(free):
+        if not free[start]:
+            continue
+        label += 1
+        free[start] = False
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            flat[cell] = label
+            x = cell % width
+            for neighbor, valid in ((cell - width, cell >= width), (cell + width, cell < (height - 1) * width),
+                                    (cell - 1, x > 0), (cell + 1, x < width - 1)):
+                if valid and free[neighbor]:
+                    free[neighbor] = False
+                    queue.append(neighbor)
+    return labels
+
+
+def _adjacent_regions(regions: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """The two regions touching a ramp the most (0 where there is none)."""
+    touching = np.zeros(2, dtype=np.int16)
+    if not len(points):
+        return touching
+    mask = np.zeros(regions.shape, dtype=bool)
+    mask[points[:, 1], points[:, 0]] = True
+    labels = regions[_dilate(_dilate(mask)) & ~mask]
+    labels = labels[labels > 0]
+    if labels.size:
+        values, counts = np.unique(labels, return_counts=True)
+        best = values[np.argsort(counts)[::-1][:2]]
+        touching[:len(best)] = best
+    return touching
+
+
+def _placement_slots(placeable, regions, expansions, resources, distances):
+    """Non-overlapping 3x3 building spots in each expansion's region, closest first."""
+    # A 3x3 building centered at (x + 0.5, y + 0.5) covers cells x-1..x+1, y-1..y+1
+    fits = placeable.copy()
+    fits[0, :] = fits[-1, :] = False
+    fits[:, 0] = fits[:, -1] = False
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            fits[1:-1, 1:-1] &= placeable[1 + dy:placeable.shape[0] - 1 + dy, 1 + dx:placeable.shape[1] - 1 + dx]
+
+    ys, xs = np.nonzero(fits)
+    centers = np.column_stack([xs + 0.5, ys + 0.5])
+    slot_rows, slot_expansions = [], []
+    for i, (ex, ey) in enumerate(expansions):
+        region = regions[int(ey), int(ex)] or regions[int(ey) - 3, int(ex)]
+        ground = distances[i, ys, xs]
+        candidate = ground <= SLOT_MAX_DISTANCE
+        if region:
+            candidate &= regions[ys, xs] == region
+        candidate &= np.hypot(centers[:, 0] - ex, centers[:, 1] - ey) > SLOT_TOWNHALL_CLEARANCE
+        own = resources[np.hypot(resources[:, 0] - ex, resources[:, 1] - ey) < 12] if len(resources) else resources
+        for rx, ry in own:
+            candidate &= np.hypot(centers[:, 0] - rx, centers[:, 1] - ry) > SLOT_RESOURCE_CLEARANCE
+
+        picked = []
+        for j in np.flatnonzero(candidate)[np.argsort(ground[candidate], kind='stable')]:
+            x, y = centers[j]
+            if all(abs(x - px) >= 3 or abs(y - py) >= 3 for px, py in picked):
+                picked.append((x, y))
+                if len(picked) == SLOTS_PER_EXPANSION:
+                    break
+        slot_rows.extend(picked)
+        slot_expansions.extend([i] * len(picked))
+    return (np.array(slot_rows, dtype=np.float64).reshape(-1, 2),
+            np.array(slot_expansions, dtype=np.int16))
@@ -0,0 +1,135 @@
+"""
+Map Cache for B0B - The Builder Bot
+
+Persists MapAnalysis results per map hash so the analysis runs once per map.
+Every array is stored as its own .npy file and memory-mapped on load, so
+later games pay only for opening the files. A MapCache kept across games
+in one process (the warm runner) also keeps loaded analyses in memory and
+skips even that.
+
+CACHE LAYOUT:
+    <cache dir>/<map name>_<hash>_v<version>/meta.json
+    <cache dir>/<map name>_<hash>_v<version>/<array>.npy
+
+USAGE:
+```python
+from map_analysis import MapCache
+
+# In place of BotAI._prepare_first_step
+analysis = MapCache("map_cache").prepare_first_step(bot)
+print(analysis.expansion_paths)
+```
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+from sc2.bot_ai import BotAI
+
+from .map_analyzer import ANALYSIS_VERSION, MapAnalysis, analyze_map, map_hash
+
+logger = logging.getLogger('B0B.MapCache')
+
+
+class MapCache:
+    """Versioned on-disk cache of map analyses."""
+
+    def __init__(self, directory: Union[str, Path]):
+        """Initialize the cache.
+
+        Args:
+            directory: Cache directory (created on first save)
+        """
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+        self._memory: Dict[str, MapAnalysis] = {}  # map hash -> analysis loaded in this process
+
+    def entry_path(self, map_name: str, key: str) -> Path:
+        """Directory of the cache entry for a map."""
+        safe_name = re.sub(r'[^A-Za-z0-9_-]+', '', map_name) or "map"
+        return self.directory / f"{safe_name}_{key[:16]}_v{ANALYSIS_VERSION}"
+
+    def load(self, map_name: str, key: str) -> Optional[MapAnalysis]:
+        """Memory-map a cached analysis, or None if there is no valid entry."""
+        if key in self._memory:
+            return self._memory[key]
+        path = self.entry_path(map_name, key)
+        try:
+            meta = json.loads((path / "meta.json").read_text())
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != ANALYSIS_VERSION or meta.get('map_hash') != key:
+            return None
+        try:
+            arrays = {name: np.load(path / f"{name}.npy", mmap_mode='r') for name in MapAnalysis.ARRAYS}
+        except (OSError, ValueError):
+            return None
+        analysis = MapAnalysis(map_name=meta['map_name'], map_hash=key,
+                               analysis_time=meta.get('analysis_time', 0.0), **arrays)
+        self._memory[key] = analysis
+        return analysis
+
+    def save(self, analysis: MapAnalysis) -> Path:
+        """Write an analysis to the cache atomically and return its entry path."""
+        path = self.entry_path(analysis.map_name, analysis.map_hash)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=".tmp_", dir=self.directory))
+        try:
+            for name in MapAnalysis.ARRAYS:
+                np.save(tmp / f"{name}.npy", np.ascontiguousarray(getattr(analysis, name)))
+            meta = {
+                'version': ANALYSIS_VERSION,
+                'map_name': analysis.map_name,
+                'map_hash': analysis.map_hash,
+                'analysis_time': analysis.analysis_time,
+                'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+            if path.exists():
+                shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp, path)
+        except OSError:
+            # Another game may have written the same entry concurrently
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not path.exists():
+                raise
+        return path
+
+    def prepare_first_step(self, bot) -> Optional[MapAnalysis]:
+        """Run python-sc2's first step preparation, from the cache when possible.
+
+        On a miss the full python-sc2 analysis and analyze_map() run and the
+        result is cached. On a hit python-sc2's ramps, vision blockers and
+        expansions are restored from the memory-mapped arrays instead.
+
+        Returns:
+            The map analysis, or None if it failed after python-sc2's own
+            preparation completed
+        """
+        key = map_hash(bot)
+        analysis = self.load(bot.game_info.map_name, key)
+        if analysis is not None:
+            self.hits += 1
+            analysis.apply(bot)
+            return analysis
+
+        self.misses += 1
+        BotAI._prepare_first_step(bot)
+        try:
+            analysis = analyze_map(bot, key)
+            path = self.save(analysis)
+            self._memory[key] = analysis
+            logger.info(f"Analyzed {analysis.map_name} in {analysis.analysis_time:.2f}s, cached at {path}")
+            return analysis
+        except Exception as e:
+            logger.error(f"Map analysis failed: {str(e)}", exc_info=True)
+            return None
@@ -0,0 +1,111 @@
+"""Enemy threat map, computed in the background from a snapshot of the step.
+
+A ground distance field from every visible enemy unit over the whole map
+costs one wavefront per grid step, far more than a step can spend. The
+BaseTracker takes a ThreatSnapshot (the pathing grid and the enemy units
+as NumPy arrays) on the step and submits compute_threat_map() to the
+HeadManager's analysis executor; the resulting ThreatMap is read on later
+steps:
+
+- enemy_distance: ground distance from the nearest enemy unit (flyers
+  count from wherever they hover)
+- threat: supply of the enemy units within THREAT_RADIUS of every cell
+
+Grids are indexed [y, x] like python-sc2's data_numpy.
+
+With a process pool the snapshot is taken in the worker instead, from the
+step's units in shared memory: submit_shared() with threat_map_from_view
+(see managers/shared_snapshot.py).
+
+USAGE:
+```python
+snapshot = threat_snapshot(self.ai)                       # on the step
+self.head.analysis.submit('threat', compute_threat_map, snapshot)
+threat_map = self.head.analysis.value('threat', max_staleness=90)
+if threat_map and threat_map.threat_at(location) > 0:
+    ...
+```
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from .map_analyzer import UNREACHABLE, _distance_field
+
+THREAT_RADIUS = 12  # Cells around an enemy unit it threatens
+
+
+@dataclass
+class ThreatSnapshot:
+    """What compute_threat_map needs from one step, safe to hand to another thread or process."""
+
+    game_loop: int
+    pathing: np.ndarray  # (H, W) bool, pathable cells
+    positions: np.ndarray  # (N, 2) int cells of the enemy units
+    supply: np.ndarray  # (N,) float32 supply of every enemy unit
+
+
+@dataclass
+class ThreatMap:
+    """Where the visible enemy units are and how much they threaten, per cell."""
+
+    game_loop: int  # Game loop of the snapshot
+    enemy_distance: np.ndarray  # (H, W) uint16 ground distance from the nearest enemy unit
+    threat: np.ndarray  # (H, W) float32 supply of enemy units within THREAT_RADIUS
+
+    def threat_at(self, position) -> float:
+        """Enemy supply threatening a position."""
+        y, x = self._cell(position)
+        return float(self.threat[y, x])
+
+    def distance_at(self, position) -> Optional[int]:
+        """Ground distance from a position to the nearest enemy unit, or None if unreachable."""
+        y, x = self._cell(position)
+        distance = int(self.enemy_distance[y, x])
+        return None if distance == UNREACHABLE else distance
+
+    def _cell(self, position):
+        height, width = self.threat.shape
+        return min(max(int(position[1]), 0), height - 1), min(max(int(position[0]), 0), width - 1)
+
+
+def threat_snapshot(ai) -> ThreatSnapshot:
+    """Copy the pathing grid and the visible enemy units (structures excluded) of the current step."""
+    pathing = np.array(ai.game_info.pathing_grid.data_numpy, dtype=bool)
+    enemies = [unit for unit in ai.enemy_units if not unit.is_structure]
+    height, width = pathing.shape
+    positions = np.array([(unit.position.x, unit.position.y) for unit in enemies], dtype=np.float32).reshape(-1, 2)
+    positions = np.clip(positions.astype(np.int32), 0, [width - 1, height - 1])
+    supply = np.array([ai.calculate_supply_cost(unit.type_id) for unit in enemies], dtype=np.float32)
+    return ThreatSnapshot(ai.state.game_loop, pathing, positions, supply)
+
+
+def threat_map_from_view(snapshot) -> ThreatMap:
+    """Build the threat map from a shared memory SharedSnapshot (runs on an analysis worker)."""
+    enemy = snapshot.enemy[~snapshot.enemy['is_structure']]
+    height, width = snapshot.pathing.shape
+    positions = np.stack([enemy['x'], enemy['y']], axis=1).astype(np.int32).reshape(-1, 2)
+    positions = np.clip(positions, 0, [width - 1, height - 1])
+    return compute_threat_map(ThreatSnapshot(snapshot.game_loop, snapshot.pathing.astype(bool), positions,
+                                             enemy['supply'].copy()))
+
+
+def compute_threat_map(snapshot: ThreatSnapshot) -> ThreatMap:
+    """Build the threat map of a snapshot (runs on an analysis worker)."""
+    pathing = snapshot.pathing
+    sources = np.zeros(pathing.shape, dtype=bool)
+    sources[snapshot.positions[:, 1], snapshot.positions[:, 0]] = True
+    enemy_distance = _distance_field(pathing | sources, sources)
+
+    threat = np.zeros(pathing.shape, dtype=np.float32)
+    height, width = pathing.shape
+    offsets = np.arange(-THREAT_RADIUS, THREAT_RADIUS + 1)
+    disk = (offsets[:, None] ** 2 + offsets[None, :] ** 2) <= THREAT_RADIUS ** 2
+    for (x, y), supply in zip(snapshot.positions.tolist(), snapshot.supply.tolist()):
+        top, bottom = max(y - THREAT_RADIUS, 0), min(y + THREAT_RADIUS + 1, height)
+        left, right = max(x - THREAT_RADIUS, 0), min(x + THREAT_RADIUS + 1, width)
+        window = disk[top - y + THREAT_RADIUS:bottom - y + THREAT_RADIUS, left - x + THREAT_RADIUS:right - x + THREAT_RADIUS]
+        threat[top:bottom, left:right] += window * supply
+    return ThreatMap(snapshot.game_loop, enemy_distance, threat)
@@ -0,0 +1,23 @@
+"""Offline simulation tools for the bot."""
+
+from .economy_simulator import (
+    SimulationParams,
+    SimulationResult,
+    BatchResult,
+    TuningResult,
+    simulate_build_order,
+    simulate_batch,
+    generate_variants,
+    tune_build_orders,
+)
+
+__all__ = [
+    'SimulationParams',
+    'SimulationResult',
+    'BatchResult',
+    'TuningResult',
+    'simulate_build_order',
+    'simulate_batch',
+    'generate_variants',
+    'tune_build_orders',
+]
@@ -0,0 +1,438 @@
+"""
+Batch Runner for B0B - The Builder Bot
+
+Runs many games in parallel across CPU cores and aggregates the results into
+a single report. Two modes are supported:
+
+- sim: each game is a run of the economy simulator (no StarCraft II needed).
+  The seed jitters the build order's supply triggers; seed 0 plays the build
+  order as configured. The seeds of one race and strategy are simulated as
+  one batch.
+- sc2: each game is a real headless StarCraft II game against the built-in AI.
+  Every worker process launches its own game client.
+
+With --warm, sc2 games are split into one chunk per worker. A worker plays
+its chunk with one game client and one bot, reset between games, so the
+client launch, imports, managers and map analyses are paid once per worker
+instead of once per game. Results then arrive a chunk at a time.
+
+Scenarios sweep races, strategies and seeds. A strategy names a build order
+the race's military manager plays: Terran plays BotConfig.military.build_orders
+(keyed by the HeadManager strategies), Protoss and Zerg their one fixed build.
+Per-game results are printed as soon as they finish.
+
+USAGE:
+```bash
+python run_batch.py --mode sim --races Terran Protoss Zerg --seeds 100
+python run_batch.py --mode sim --races Terran --strategies mech air --seeds 100
+python run_batch.py --mode sc2 --races Terran --strategies bio_rush --seeds 4 --workers 4
+python run_batch.py --mode sc2 --races Terran --seeds 20 --workers 2 --warm
+```
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from sc2.data import Difficulty, Race
+from sc2.ids.unit_typeid import UnitTypeId
+
+# Build orders the Protoss and Zerg military managers execute, by strategy name, for sim
+# mode; they do not take a strategy, so each has its one fixed build
+RACE_BUILD_ORDERS = {
+    Race.Protoss: {
+        'stargate': [
+            (UnitTypeId.PYLON, 14, "First Pylon"),
+            (UnitTypeId.GATEWAY, 15, "Gateway 1"),
+            (UnitTypeId.GATEWAY, 16, "Gateway 2"),
+            (UnitTypeId.GATEWAY, 17, "Gateway 3"),
+            (UnitTypeId.GATEWAY, 18, "Gateway 4"),
+            (UnitTypeId.CYBERNETICSCORE, 19, "Cyber Core"),
+            (UnitTypeId.STARGATE, 22, "Stargate"),
+        ],
+    },
+    Race.Zerg: {
+        'roach': [
+            (UnitTypeId.SPAWNINGPOOL, 17, "Spawning Pool"),
+            (UnitTypeId.ROACHWARREN, 19, "Roach Warren"),
+        ],
+    },
+}
+
+
+@dataclass
+class Scenario:
+    """A single game to run."""
+
+    race: str
+    strategy: str
+    seed: int
+    mode: str = "sim"
+    map_name: str = "LostandFoundLE"
+    opponent_race: str = "Protoss"
+    difficulty: str = "Easy"
+    game_time_limit: Optional[int] = None
+
+
+def race_build_orders(race: Race) -> Dict[str, List]:
+    """Get the build orders a race's military manager plays, by strategy name."""
+    if race in RACE_BUILD_ORDERS:
+        return RACE_BUILD_ORDERS[race]
+    from config.config import config
+    return config.military.build_orders
+
+
+def _build_order_for(race: Race, strategy: str) -> List:
+    """Get the build order a race plays for a strategy.
+
+    Raises:
+        ValueError: If the race has no build order for the strategy
+    """
+    build_orders = race_build_orders(race)
+    if strategy not in build_orders:
+        raise ValueError(f"No {race.name} build order for strategy {strategy!r} "
+                         f"(known: {', '.join(build_orders)})")
+    return build_orders[strategy]
+
+
+def run_sim_group(scenarios: List[Scenario]) -> List[Dict[str, Any]]:
+    """Simulate scenarios sharing a race, strategy and time limit as one batch."""
+    from simulation.economy_simulator import SimulationParams, generate_variants, simulate_batch
+
+    records = []
+    for scenario in scenarios:
+        record = asdict(scenario)
+        record['pid'] = os.getpid()
+        records.append(record)
+    try:
+        race = Race[scenarios[0].race]
+        build_order = _build_order_for(race, scenarios[0].strategy)
+        build_orders = [generate_variants(build_order, 2, seed=scenario.seed)[1] if scenario.seed else build_order
+                        for scenario in scenarios]
+        params = SimulationParams()
+        if scenarios[0].game_time_limit:
+            params.horizon = float(scenarios[0].game_time_limit)
+
+        start = time.perf_counter()
+        batch = simulate_batch(build_orders, race=race, params=params)
+        wall = time.perf_counter() - start
+        scores = batch.scores()
+        for index, record in enumerate(records):
+            result = batch.result(index, score=float(scores[index]))
+            record.update({
+                'result': 'Simulated',
+                'game_time': params.horizon,
+                'wall_time': wall / len(records),  # Share of the batch
+                'score': result.score,
+                'workers': result.workers,
+                'minerals_collected': result.minerals_collected,
+                'vespene_collected': result.vespene_collected,
+                'supply_blocked_time': result.supply_blocked_time,
+            })
+    except Exception as e:
+        for record in records:
+            record['result'] = 'Error'
+            record['error'] = f"{type(e).__name__}: {e}"
+    return records
+
+
+def _set_strategy(bot, scenario: Scenario) -> None:
+    """Make the bot play the scenario's strategy.
+
+    The HeadManager hands its strategy to the military manager when the
+    manager registers at game start (and on later strategy changes).
+    Protoss and Zerg military managers play their fixed build, so their
+    strategy names are not HeadManager strategies and leave it unchanged.
+    """
+    _build_order_for(Race[scenario.race], scenario.strategy)
+    if Race[scenario.race] == Race.Terran and not bot.head.set_strategy(scenario.strategy):
+        raise ValueError(f"Strategy {scenario.strategy!r} is not a HeadManager strategy "
+                         f"(known: {', '.join(bot.head.strategies)})")
+
+
+def _run_sc2(scenario: Scenario) -> Dict[str, Any]:
+    """Run one headless StarCraft II game against the built-in AI."""
+    from sc2 import maps
+    from sc2.main import run_game
+    from sc2.player import Bot, Computer
+    from bot.bootstrap import bootstrap
+    from bot.main import MyBot
+
+    bootstrap()
+    random.seed(scenario.seed)
+    bot = MyBot()
+    _set_strategy(bot, scenario)
+
+    start = time.perf_counter()
+    result = run_game(
+        maps.get(scenario.map_name),
+        [
+            Bot(Race[scenario.race], bot, name="B0B"),
+            Computer(Race[scenario.opponent_race], Difficulty[scenario.difficulty]),
+        ],
+        realtime=False,
+        game_time_limit=scenario.game_time_limit,
+        random_seed=scenario.seed,
+    )
+    wall = time.perf_counter() - start
+    return _sc2_record(bot, result, wall)
+
+
+def _sc2_record(bot, result, wall: float) -> Dict[str, Any]:
+    """Result fields of a finished sc2 game."""
+    return {
+        'result': getattr(result, 'name', str(result)),
+        'game_time': bot.time,
+        'wall_time': wall,
+        'workers': bot.workers.amount if bot.game_started else 0,
+        'military_strategy': getattr(bot.military_manager, 'strategy', None),
+        'step_metrics': bot.head.get_step_metrics(),
+    }
+
+
+async def _run_sc2_warm(scenarios: List[Scenario], bot, records: List[Dict[str, Any]]) -> None:
+    """Play scenarios one after another on reused game clients with one bot."""
+    from s2clientprotocol import sc2api_pb2 as sc_pb
+    from sc2 import maps
+    from sc2.data import Status
+    from sc2.main import GameMatch, maintain_SCII_count, run_match
+    from sc2.player import Bot, Computer
+    from sc2.sc2process import KillSwitch
+
+    controllers = []
+    try:
+        for index, scenario in enumerate(scenarios):
+            record = asdict(scenario)
+            record['pid'] = os.getpid()
+            record['warm_game'] = index
+            if index:
+                bot.reset()
+            random.seed(scenario.seed)
+            player = Bot(Race[scenario.race], bot, name="B0B")
+            match = GameMatch(
+                maps.get(scenario.map_name),
+                [player, Computer(Race[scenario.opponent_race], Difficulty[scenario.difficulty])],
+                realtime=False,
+                random_seed=scenario.seed,
+                game_time_limit=scenario.game_time_limit,
+            )
+            start = time.perf_counter()
+            try:
+                _set_strategy(bot, scenario)
+                await maintain_SCII_count(match.needed_sc2_count, controllers)
+                results = await run_match(controllers, match, close_ws=False)
+                record.update(_sc2_record(bot, (results or {}).get(player), time.perf_counter() - start))
+            except Exception as e:
+                record['result'] = 'Error'
+                record['error'] = f"{type(e).__name__}: {e}"
+            finally:
+                # Leave the finished game so the client can host the next one
+                for controller in controllers:
+                    try:
+                        await controller.ping()
+                        if controller._status != Status.launched:
+                            await controller._execute(leave_game=sc_pb.RequestLeaveGame())
+                    except Exception:
+                        pass  # maintain_SCII_count replaces clients that no longer answer
+            records.append(record)
+    finally:
+        await asyncio.gather(*(c._process._close_connection() for c in controllers), return_exceptions=True)
+        KillSwitch.kill_all()
+
+
+def run_warm_chunk(scenarios: List[Scenario]) -> List[Dict[str, Any]]:
+    """Run sc2 scenarios in this worker process with one game client and one bot."""
+    from bot.bootstrap import bootstrap
+    from bot.main import MyBot
+
+    bootstrap()
+    bot = MyBot()
+    records = []
+    try:
+        asyncio.run(_run_sc2_warm(scenarios, bot, records))
+    except Exception as e:
+        # Scenarios not reached are reported as errors, not dropped
+        for scenario in scenarios[len(records):]:
+            record = asdict(scenario)
+            record.update(pid=os.getpid(), result='Error', error=f"{type(e).__name__}: {e}")
+            records.append(record)
+    return records
+
+
+def run_scenario(scenario: Scenario) -> Dict[str, Any]:
+    """Run a scenario in a worker process and return its result record."""
+    if scenario.mode != "sc2":
+        return run_sim_group([scenario])[0]
+    record = asdict(scenario)
+    record['pid'] = os.getpid()
+    try:
+        record.update(_run_sc2(scenario))
+    except Exception as e:
+        record['result'] = 'Error'
+        record['error'] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def build_scenarios(races: List[str], strategies: Optional[List[str]], seeds: int, mode: str = "sim",
+                    **kwargs) -> List[Scenario]:
+    """Build the cross product of races, strategies and seeds.
+
+    Args:
+        races: Race names
+        strategies: Strategy names, each played by every race (default: every
+            strategy of each race, see race_build_orders)
+        seeds: Seeds per race and strategy
+
+    Raises:
+        ValueError: If a race has no build order for one of the strategies
+    """
+    scenarios = []
+    for race in races:
+        race_strategies = list(race_build_orders(Race[race])) if strategies is None else strategies
+        for strategy in race_strategies:
+            _build_order_for(Race[race], strategy)
+            scenarios.extend(Scenario(race=race, strategy=strategy, seed=seed, mode=mode, **kwargs)
+                             for seed in range(seeds))
+    return scenarios
+
+
+def aggregate(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate per-game records into a report grouped by race and strategy."""
+    groups = {}
+    for record in records:
+        key = f"{record['race']}/{record['strategy']}"
+        group = groups.setdefault(key, {'games': 0, 'results': {}, 'step_means': [], 'step_max': 0.0,
+                                        'scores': [], 'wall_time': 0.0})
+        group['games'] += 1
+        group['results'][record['result']] = group['results'].get(record['result'], 0) + 1
+        group['wall_time'] += record.get('wall_time', 0.0)
+        if 'score' in record:
+            group['scores'].append(record['score'])
+        head = record.get('step_metrics', {}).get('head')
+        if head:
+            group['step_means'].append(head['mean'])
+            group['step_max'] = max(group['step_max'], head['max'])
+
+    report = {}
+    for key, group in sorted(groups.items()):
+        step_means = sorted(group['step_means'])
+        scores = group['scores']
+        report[key] = {
+            'games': group['games'],
+            'results': group['results'],
+            'wall_time': group['wall_time'],
+            'mean_score': sum(scores) / len(scores) if scores else None,
+            'step_mean_ms': 1000 * sum(step_means) / len(step_means) if step_means else None,
+            'step_p95_ms': 1000 * step_means[int(0.95 * (len(step_means) - 1))] if step_means else None,
+            'step_max_ms': 1000 * group['step_max'] if step_means else None,
+        }
+    return report
+
+
+def run_batch(scenarios: List[Scenario], workers: Optional[int] = None,
+              on_result=None, warm: bool = False) -> Dict[str, Any]:
+    """Run scenarios in a process pool, streaming each finished game to on_result.
+
+    Args:
+        scenarios: Games to run
+        workers: Worker processes (default: CPU count)
+        on_result: Called with each finished game's record
+        warm: Play sc2 games in one chunk per worker on a reused client and bot
+
+    Returns:
+        Dict with the per-game records and the aggregated report
+    """
+    records = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if warm:
+            chunks = min(workers or os.cpu_count() or 1, len(scenarios)) or 1
+            futures = [pool.submit(run_warm_chunk, scenarios[i::chunks]) for i in range(chunks)]
+        else:
+            # Simulated games of one race, strategy and time limit run as one batch
+            groups = {}
+            for scenario in scenarios:
+                if scenario.mode != "sc2":
+                    key = (scenario.race, scenario.strategy, scenario.game_time_limit)
+                    groups.setdefault(key, []).append(scenario)
+            futures = [pool.submit(run_sim_group, group) for group in groups.values()]
+            futures += [pool.submit(run_scenario, scenario) for scenario in scenarios if scenario.mode == "sc2"]
+        for future in as_completed(futures):
+            result = future.result()
+            for record in (result if isinstance(result, list) else [result]):
+                records.append(record)
+                if on_result:
+                    on_result(record)
+    return {
+        'wall_time': time.perf_counter() - start,
+        'games': records,
+        'report': aggregate(records),
+    }
+
+
+def _print_record(record: Dict[str, Any]) -> None:
+    head = record.get('step_metrics', {}).get('head')
+    detail = ""
+    if head:
+        detail = f" step={1000 * head['mean']:.3f}ms"
+    elif 'score' in record:
+        detail = f" score={record['score']:.0f}"
+    print(f"[Batch] {record['race']:<8} {record['strategy']:<10} seed={record['seed']:<4} "
+          f"{record['result']:<10} wall={record.get('wall_time', 0.0):.2f}s{detail}"
+          + (f" error={record['error']}" if 'error' in record else ""), flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Run many B0B games in parallel")
+    parser.add_argument("--mode", choices=["sim", "sc2"], default="sim")
+    parser.add_argument("--races", nargs="+", default=["Terran", "Protoss", "Zerg"],
+                        choices=["Terran", "Protoss", "Zerg"])
+    parser.add_argument("--strategies", nargs="+", default=None,
+                        help="Strategies to play (default: every strategy of each race)")
+    parser.add_argument("--seeds", type=int, default=10, help="Number of seeds per race/strategy")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--map", default="LostandFoundLE")
+    parser.add_argument("--opponent", default="Protoss", choices=["Terran", "Protoss", "Zerg", "Random"])
+    parser.add_argument("--difficulty", default="Easy")
+    parser.add_argument("--time-limit", type=int, default=None, help="Game time limit in seconds")
+    parser.add_argument("--report", default=None, help="Write the JSON report to this file")
+    parser.add_argument("--warm", action="store_true",
+                        help="sc2 mode: reuse one game client and bot per worker across its games")
+    args = parser.parse_args(argv)
+    if args.warm and args.mode != "sc2":
+        parser.error("--warm only applies to --mode sc2")
+
+    try:
+        scenarios = build_scenarios(
+            args.races, args.strategies, args.seeds, mode=args.mode,
+            map_name=args.map, opponent_race=args.opponent, difficulty=args.difficulty,
+            game_time_limit=args.time_limit,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"[Batch] Running {len(scenarios)} {args.mode} games on {args.workers or os.cpu_count()} workers")
+    batch = run_batch(scenarios, workers=args.workers, on_result=_print_record, warm=args.warm)
+
+    print(f"\n=== Batch Report ({len(scenarios)} games in {batch['wall_time']:.1f}s) ===")
+    for key, row in batch['report'].items():
+        score = f"{row['mean_score']:.0f}" if row['mean_score'] is not None else "-"
+        steps = ""
+        if row['step_mean_ms'] is not None:
+            steps = (f" step mean/p95/max={row['step_mean_ms']:.3f}/{row['step_p95_ms']:.3f}/"
+                     f"{row['step_max_ms']:.3f}ms")
+        print(f"{key:<20} games={row['games']:<4} results={row['results']} score={score}{steps}")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(batch, f, indent=2, default=str)
+        print(f"[Batch] Report written to {args.report}")
+
+    errors = sum(1 for record in batch['games'] if record['result'] == 'Error')
+    return 1 if errors else 0
@@ -0,0 +1,13 @@
+"""Telemetry and recording tools for the bot."""
+
+from .observation_recorder import ObservationRecorder
+from .replay_driver import ReplayDriver
+from .telemetry_recorder import TelemetryRecorder, load_telemetry, telemetry_dtype
+
+__all__ = [
+    'ObservationRecorder',
+    'ReplayDriver',
+    'TelemetryRecorder',
+    'load_telemetry',
+    'telemetry_dtype',
+]
@@ -0,0 +1,228 @@
+"""
+Allocation Profiler for B0B - The Builder Bot
+
+Attributes memory churn to the managers with tracemalloc. The HeadManager
+brackets each manager's on_step (and its own game state update, as
+'state') with begin()/end(), which records per step:
+
+- allocated: high-water mark of traced memory above the start of the step,
+  i.e. the most the step held at once, including objects freed before it
+  returned
+- retained: traced memory the step left behind
+- blocks: memory blocks the step left behind (sys.getallocatedblocks)
+
+Every sample_every steps the step is also bracketed with snapshots, and
+the call sites still holding the most memory when on_step returns are
+accumulated per manager.
+
+Opt-in (HeadConfig.profile_allocations): tracing slows every allocation.
+
+assert_allocation_budget() runs the bot on the standard synthetic state
+(telemetry/synthetic_state.py) and fails when a manager allocates more
+than its budget per step, so regressions are caught before they turn
+into collector stalls in games.
+
+USAGE:
+```python
+from telemetry.allocation_profiler import AllocationProfiler, assert_allocation_budget
+
+profiler = AllocationProfiler(frames=5, sample_every=50)
+profiler.start()
+profiler.begin('economy'); ...; profiler.end('economy')
+print(profiler.report()['economy']['peak_allocated'])
+profiler.stop()
+
+# In a test
+assert_allocation_budget({'economy': 256 * 1024, 'military': 512 * 1024}, race=Race.Zerg)
+```
+"""
+
+import asyncio
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sc2.data import Race, Result
+
+TOP_SITES = 10  # Call sites kept per manager in the report
+
+
+class AllocationProfiler:
+    """Per-manager allocation statistics from tracemalloc."""
+
+    def __init__(self, frames: int = 5, sample_every: int = 50, top: int = TOP_SITES):
+        """Initialize the profiler.
+
+        Args:
+            frames: Stack frames stored per allocation (more frames, more overhead)
+            sample_every: Steps between call site snapshots of a manager (0 disables them)
+            top: Call sites listed per manager
+        """
+        self.frames = frames
+        self.sample_every = sample_every
+        self.top = top
+        self.stats: Dict[str, Dict[str, float]] = {}  # manager name -> accumulated statistics
+        self.sites: Dict[str, Dict[str, List[int]]] = {}  # manager name -> call site -> [bytes, blocks]
+        self.traced_peak = 0  # Most memory traced at the end of any step
+        self._started_tracing = False
+        self._open: Optional[Tuple[str, int, int, Any]] = None  # (name, traced, blocks, snapshot)
+
+    def start(self) -> None:
+        """Start tracing allocations (unless something else already is)."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        """Stop tracing if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._open = None
+
+    def begin(self, name: str) -> None:
+        """Start measuring one manager step."""
+        if not tracemalloc.is_tracing():
+            return
+        stats = self.stats.get(name)
+        count = stats['steps'] if stats else 0
+        snapshot = None
+        if self.sample_every and count % self.sample_every == 0:
+            snapshot = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        self._open = (name, current, sys.getallocatedblocks(), snapshot)
+
+    def end(self, name: str) -> None:
+        """Finish measuring the step started by begin(name)."""
+        if self._open is None or self._open[0] != name or not tracemalloc.is_tracing():
+            return
+        _, start, start_blocks, snapshot = self._open
+        self._open = None
+        current, peak = tracemalloc.get_traced_memory()
+        allocated = max(peak - start, 0)
+        retained = current - start
+        blocks = sys.getallocatedblocks() - start_blocks
+
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = {
+                'steps': 0, 'allocated': 0, 'retained': 0, 'blocks': 0,
+                'peak_allocated': 0, 'peak_blocks': 0,
+            }
+        stats['steps'] += 1
+        stats['allocated'] += allocated
+        stats['retained'] += retained
+        stats['blocks'] += blocks
+        stats['peak_allocated'] = max(stats['peak_allocated'], allocated)
+        stats['peak_blocks'] = max(stats['peak_blocks'], blocks)
+        self.traced_peak = max(self.traced_peak, current)
+
+        if snapshot is not None:
+            self._add_sites(name, snapshot)
+
+    def _add_sites(self, name: str, before) -> None:
+        """Accumulate the call sites that grew during a sampled step."""
+        sites = self.sites.setdefault(name, {})
+        # The snapshots themselves are allocated by tracemalloc; skip its frames
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+        for stat in after.compare_to(before.filter_traces(ignore), 'lineno'):
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            site = sites.setdefault(f"{frame.filename}:{frame.lineno}", [0, 0])
+            site[0] += stat.size_diff
+            site[1] += stat.count_diff
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-manager means, per-game peaks and top call sites, most allocating manager first."""
+        report = {}
+        for name, stats in sorted(self.stats.items(), key=lambda item: -item[1]['allocated']):
+            steps = max(stats['steps'], 1)
+            sites = sorted(self.sites.get(name, {}).items(), key=lambda site: -site[1][0])[:self.top]
+            report[name] = {
+                'steps': stats['steps'],
+                'mean_allocated': stats['allocated'] / steps,
+                'mean_retained': stats['retained'] / steps,
+                'mean_blocks': stats['blocks'] / steps,
+                'peak_allocated': stats['peak_allocated'],
+                'peak_blocks': stats['peak_blocks'],
+                'sites': [{'site': site, 'bytes': size, 'blocks': count} for site, (size, count) in sites],
+            }
+        return report
+
+    def summary(self) -> List[str]:
+        """Report lines for the game log."""
+        lines = [f"Traced peak {self.traced_peak / 2 ** 20:.1f} MiB"]
+        for name, row in self.report().items():
+            lines.append(f"{name:<10} mean {row['mean_allocated'] / 1024:8.1f} KiB/step "
+                         f"peak {row['peak_allocated'] / 1024:8.1f} KiB "
+                         f"retained {row['mean_retained']:+8.0f} B/step blocks {row['mean_blocks']:+6.1f}/step")
+            for site in row['sites'][:3]:
+                lines.append(f"    {site['bytes'] / 1024:8.1f} KiB {site['blocks']:6d} blocks  {site['site']}")
+        return lines
+
+
+async def measure_allocations(race: Race = Race.Terran, steps: int = 20, warmup: int = 3,
+                              bot_factory: Optional[Callable] = None) -> Dict[str, Dict[str, Any]]:
+    """Profile allocations per manager step on the standard synthetic state.
+
+    Args:
+        race: Race the bot plays
+        steps: Profiled steps
+        warmup: Steps run first so one-time caches do not count
+        bot_factory: Creates the bot (default: CompetitiveBot)
+
+    Returns:
+        AllocationProfiler.report() of the profiled steps
+    """
+    from telemetry.synthetic_state import SyntheticGame
+
+    game = SyntheticGame(race, bot_factory)
+    bot = await game.start()
+    profiler = AllocationProfiler(frames=1, sample_every=0)
+    try:
+        for _ in range(warmup):
+            await game.step()
+        bot.head.allocation_profiler = profiler
+        profiler.start()
+        for _ in range(steps):
+            await game.step()
+    finally:
+        profiler.stop()
+        bot.head.allocation_profiler = None
+        await bot.on_end(Result.Tie)
+    return profiler.report()
+
+
+def assert_allocation_budget(budgets: Dict[str, int], race: Race = Race.Terran, steps: int = 20,
+                             statistic: str = 'peak_allocated') -> Dict[str, Dict[str, Any]]:
+    """Fail when a manager allocates more than its budget per step on the synthetic state.
+
+    For tests, e.g. assert_allocation_budget({'economy': 256 * 1024, 'military': 512 * 1024}).
+
+    Args:
+        budgets: Manager name (or 'state') -> bytes allowed per step
+        race: Race the bot plays
+        steps: Profiled steps
+        statistic: Report value compared with the budget ('peak_allocated' or 'mean_allocated')
+
+    Returns:
+        The allocation report, when every manager is within budget
+
+    Raises:
+        AssertionError: Listing every manager over budget or not profiled
+    """
+    report = asyncio.run(measure_allocations(race, steps))
+    failures = []
+    for name, budget in budgets.items():
+        if name not in report:
+            failures.append(f"{name}: not profiled (managers: {', '.join(report)})")
+        elif report[name][statistic] > budget:
+            sites = ', '.join(site['site'] for site in report[name]['sites'][:3])
+            failures.append(f"{name}: {statistic} {report[name][statistic]:.0f} B > budget {budget} B"
+                            + (f" ({sites})" if sites else ""))
+    if failures:
+        raise AssertionError(f"Allocation budget exceeded on {race.name}:\n  " + "\n  ".join(failures))
+    return report
@@ -0,0 +1,145 @@
+"""Leak check for the warm runner: memory must stay flat over many games.
+
+A warm runner plays game after game with one bot, reset between games (see
+CompetitiveBot.reset). Per-game state that reset() misses piles up. This
+check replays one recording many times into the same bot, each replay
+ending with on_end() and reset() as a real game would, and samples memory
+after every game:
+
+- Python heap: bytes traced by tracemalloc after a full collection
+- RSS: resident set size (Linux only)
+
+The first games fill the warm caches (imports, managers, map analysis) and
+are skipped; a least squares line through the rest gives the growth per
+game, which must stay under HeadConfig.leak_budget. When it does not, the
+allocation sites that grew the most are listed.
+
+USAGE:
+    python run_leak_check.py recordings/20250101_120000_Terran [--games 100] [--stop 2000]
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Union
+
+import numpy as np
+from sc2.data import Result
+
+from telemetry.replay_driver import ReplayDriver
+
+WARMUP_GAMES = 5  # Games that fill the warm caches, excluded from the fit
+TOP_GROWTH = 10  # Allocation sites listed when over budget
+
+
+@dataclass
+class LeakReport:
+    """Memory after every game and the fitted growth."""
+
+    heap: List[int] = field(default_factory=list)  # Traced bytes after each game
+    rss: List[int] = field(default_factory=list)  # Resident bytes after each game (empty off Linux)
+    heap_slope: float = 0.0  # Traced bytes per game after warmup
+    rss_slope: float = 0.0  # Resident bytes per game after warmup
+    budget: int = 0
+    growth: List[str] = field(default_factory=list)  # Top growing allocation sites, when over budget
+
+    @property
+    def ok(self) -> bool:
+        """True if the heap grows less than the budget per game."""
+        return self.heap_slope <= self.budget
+
+
+def resident_bytes() -> Optional[int]:
+    """Resident set size of this process, or None where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def slope(samples: List[int], warmup: int = WARMUP_GAMES) -> float:
+    """Least squares growth per game of samples after warmup."""
+    values = samples[warmup:]
+    if len(values) < 2:
+        return 0.0
+    return float(np.polyfit(np.arange(len(values)), np.asarray(values, dtype=float), 1)[0])
+
+
+async def _play(driver: ReplayDriver, bot, stop: Optional[int]) -> None:
+    """One warm game: replay, end the game, reset for the next one."""
+    await driver.replay(stop=stop)
+    await bot.on_end(Result.Tie)
+    bot.reset()
+
+
+async def check(path: Union[str, Path], games: int = 100, stop: Optional[int] = None,
+                budget: Optional[int] = None, bot_factory: Optional[Callable] = None,
+                verbose: bool = True) -> LeakReport:
+    """Replay a recording games times into one bot and fit memory growth.
+
+    Args:
+        path: Recording directory written by ObservationRecorder
+        games: Games to play
+        stop: Last iteration replayed per game (default: the whole recording)
+        budget: Bytes per game allowed (default: HeadConfig.leak_budget)
+        bot_factory: Creates the single bot every game is played with (default: CompetitiveBot)
+    """
+    if budget is None:
+        from config.config import config as bot_config
+        budget = bot_config.head.leak_budget
+    if bot_factory is None:
+        from bot.bot import CompetitiveBot
+        bot_factory = CompetitiveBot
+    bot = bot_factory()
+    driver = ReplayDriver(path, bot_factory=lambda: bot)
+    report = LeakReport(budget=budget)
+
+    tracemalloc.start()
+    baseline = None
+    try:
+        for game in range(games):
+            await _play(driver, bot, stop)
+            gc.collect()
+            if game == WARMUP_GAMES - 1:
+                baseline = tracemalloc.take_snapshot()
+            report.heap.append(tracemalloc.get_traced_memory()[0])
+            rss = resident_bytes()
+            if rss is not None:
+                report.rss.append(rss)
+            if verbose and (game + 1) % 10 == 0:
+                print(f"[Leak Check] game {game + 1}/{games}: heap {report.heap[-1] / 1024:.0f} KiB"
+                      + (f", rss {report.rss[-1] / 2 ** 20:.1f} MiB" if report.rss else ""))
+
+        report.heap_slope = slope(report.heap)
+        report.rss_slope = slope(report.rss)
+        if not report.ok and baseline is not None:
+            stats = tracemalloc.take_snapshot().compare_to(baseline, 'lineno')
+            report.growth = [str(stat) for stat in stats[:TOP_GROWTH] if stat.size_diff > 0]
+    finally:
+        tracemalloc.stop()
+    return report
+
+
+def main(argv=None) -> int:
+    """Command line entry point; exits non-zero when memory grows over budget."""
+    parser = argparse.ArgumentParser(description="Check that a warm bot's memory stays flat over many games")
+    parser.add_argument("recording", help="Recording directory")
+    parser.add_argument("--games", type=int, default=100, help="Games to play with one bot")
+    parser.add_argument("--stop", type=int, default=None, help="Last iteration replayed per game")
+    parser.add_argument("--budget", type=int, default=None, help="Bytes per game (default: HeadConfig.leak_budget)")
+    args = parser.parse_args(argv)
+    if args.games <= WARMUP_GAMES + 1:
+        parser.error(f"--games must be more than {WARMUP_GAMES + 1}")
+
+    report = asyncio.run(check(args.recording, args.games, args.stop, args.budget))
+    print(f"[Leak Check] heap {report.heap_slope:+.0f} B/game, rss {report.rss_slope:+.0f} B/game "
+          f"over {len(report.heap) - WARMUP_GAMES} games, budget {report.budget} B/game "
+          f"{'OK' if report.ok else 'LEAK'}")
+    for line in report.growth:
+        print(f"    {line}")
+    return 0 if report.ok else 1
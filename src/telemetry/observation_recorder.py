@@ -0,0 +1,165 @@
+"""
+Observation Recorder for B0B - The Builder Bot
+
+Captures everything the bot receives from the game so a game can be replayed
+into the managers offline (see telemetry/replay_driver.py):
+
+- once per game: the raw ResponseGameInfo and ResponseData protos
+- every step: the raw ResponseObservation, the pathing grid when it changed,
+  the Python random state, and every query request/response pair in order
+
+Steps are grouped into chunks, pickled and zlib-compressed on a background
+thread, one file per chunk.
+
+RECORDING LAYOUT:
+    <recording>/header.zlib
+    <recording>/chunk_00000.zlib
+    <recording>/chunk_00001.zlib
+    ...
+"""
+
+import pickle
+import random
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, Union
+
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+FORMAT_VERSION = 1
+START_ITERATION = -1  # Iteration of the record holding on_start queries
+
+
+class ObservationRecorder:
+    """Records raw observations and query responses of a live game."""
+
+    def __init__(self, ai, path: Union[str, Path], chunk_size: int = 64, compression_level: int = 1):
+        """Initialize the recorder.
+
+        Args:
+            ai: The main bot AI instance (must be in a game)
+            path: Recording directory
+            chunk_size: Steps per compressed chunk file
+            compression_level: zlib level (1 is fastest)
+        """
+        self.ai = ai
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.compression_level = compression_level
+        self._steps = []
+        self._current = None
+        self._chunk_index = 0
+        self._latest_grid = None  # Pathing grid of the last game info response
+        self._last_grid = None  # Pathing grid last written to the recording
+        self._original_execute = None
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="B0B-recorder")
+        self._pending_writes = []
+        self.steps_recorded = 0
+
+    async def start(self) -> None:
+        """Write the header and start capturing queries (call at the start of on_start)."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        client = self.ai.client
+        game_info = await client._execute(game_info=sc_pb.RequestGameInfo())
+        game_data = await client._execute(
+            data=sc_pb.RequestData(ability_id=True, unit_type_id=True, upgrade_id=True, buff_id=True, effect_id=True)
+        )
+        header = {
+            'version': FORMAT_VERSION,
+            'player_id': self.ai.player_id,
+            'base_build': getattr(self.ai, 'base_build', -1),
+            'race': int(self.ai.race.value),
+            'game_step': client.game_step,
+            'recorded_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'game_info': game_info.SerializeToString(),
+            'game_data': game_data.SerializeToString(),
+        }
+        self._write(self.path / "header.zlib", header)
+        self._latest_grid = self._last_grid = game_info.game_info.start_raw.pathing_grid.data
+
+        # Capture every query the managers make, and the game info requested before each step
+        self._original_execute = client._execute
+
+        async def _recording_execute(**kwargs):
+            response = await self._original_execute(**kwargs)
+            if 'query' in kwargs:
+                if self._current is not None:
+                    self._current['queries'].append(
+                        (kwargs['query'].SerializeToString(), response.SerializeToString())
+                    )
+            elif 'game_info' in kwargs:
+                self._latest_grid = response.game_info.start_raw.pathing_grid.data
+            return response
+
+        client._execute = _recording_execute
+        self.begin_step(START_ITERATION)
+
+    def begin_step(self, iteration: int) -> None:
+        """Capture the observation for this step (call before the managers run)."""
+        if self._current is not None:
+            self.end_step()
+        grid = None
+        if self._latest_grid != self._last_grid:
+            grid = self._last_grid = self._latest_grid
+        self._current = {
+            'iteration': iteration,
+            'observation': self.ai.state.response_observation.SerializeToString(),
+            'pathing_grid': grid,
+            'random_state': random.getstate(),
+            'queries': [],
+        }
+
+    def end_step(self) -> None:
+        """Finish the current step record (call after the managers ran)."""
+        if self._current is None:
+            return
+        self._steps.append(self._current)
+        self._current = None
+        self.steps_recorded += 1
+        if len(self._steps) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Hand the buffered steps to the background writer."""
+        if not self._steps:
+            return
+        steps, self._steps = self._steps, []
+        target = self.path / f"chunk_{self._chunk_index:05d}.zlib"
+        self._chunk_index += 1
+        self._pending_writes = [future for future in self._pending_writes if not future.done()]
+        self._pending_writes.append(self._writer.submit(self._write, target, steps))
+
+    def close(self) -> None:
+        """Flush, wait for pending writes and stop capturing queries."""
+        if self._original_execute is None:
+            return
+        self.end_step()
+        self.flush()
+        for future in self._pending_writes:
+            future.result()
+        self._pending_writes.clear()
+        self._writer.shutdown(wait=True)
+        self.ai.client._execute = self._original_execute
+        self._original_execute = None
+
+    def _write(self, target: Path, payload: Any) -> None:
+        data = zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL), self.compression_level)
+        tmp = target.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(target)
+
+
+def load_header(path: Union[str, Path]) -> Dict[str, Any]:
+    """Load the header of a recording."""
+    header = pickle.loads(zlib.decompress((Path(path) / "header.zlib").read_bytes()))
+    if header.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported recording version {header.get('version')}")
+    return header
+
+
+def iter_steps(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """Iterate over the step records of a recording in order."""
+    for chunk in sorted(Path(path).glob("chunk_*.zlib")):
+        yield from pickle.loads(zlib.decompress(chunk.read_bytes()))
@@ -0,0 +1,220 @@
+"""
+Replay Driver for B0B - The Builder Bot
+
+Feeds a recording made by ObservationRecorder back into the bot and its
+managers without a running game. A stand-in client answers queries with the
+recorded responses in order and swallows actions and debug draws, so slow or
+crashing steps can be reproduced, timed and profiled offline.
+
+The managers see exactly what they saw in the game, but the commands they
+issue during replay have no effect on later observations. Runs are
+deterministic: the Python random state is restored before every step.
+
+USAGE:
+```bash
+python run_replay.py recordings/20250101_120000_Terran --slowest 10 --profile 812
+```
+```python
+from telemetry.replay_driver import ReplayDriver
+
+steps = ReplayDriver("recordings/20250101_120000_Terran").run(stop=1000)
+print(max(steps, key=lambda step: step.duration))
+```
+"""
+
+import argparse
+import asyncio
+import cProfile
+import io
+import pstats
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from s2clientprotocol import sc2api_pb2 as sc_pb
+from sc2.client import Client
+from sc2.data import Status
+from sc2.game_data import GameData
+from sc2.game_info import GameInfo
+from sc2.game_state import GameState
+
+from telemetry.observation_recorder import START_ITERATION, iter_steps, load_header
+
+
+@dataclass
+class ReplayStep:
+    """Timing of one replayed step."""
+
+    iteration: int
+    game_loop: int
+    duration: float  # Seconds spent in on_step
+    actions: int  # Commands the bot issued
+    query_mismatches: int  # Queries that differed from the recorded ones
+
+
+class ReplayDivergenceError(RuntimeError):
+    """Raised when the bot makes more queries than were recorded for a step."""
+
+
+class ReplayClient(Client):
+    """Stand-in for sc2.client.Client that answers from a recording."""
+
+    replaying = True
+
+    def __init__(self, game_step: int = 4):
+        # No websocket: only set what BotAI uses of Client and Protocol
+        self._ws = None
+        self._status = Status.in_game
+        self.game_step = game_step
+        self.save_replay_path = None
+        self._player_id = None
+        self._game_result = None
+        self._debug_hash_tuple_last_iteration = (0, 0, 0, 0)
+        self._debug_draw_last_frame = False
+        self._debug_texts = []
+        self._debug_lines = []
+        self._debug_boxes = []
+        self._debug_spheres = []
+        self._renderer = None
+        self.raw_affects_selection = False
+
+        self._queries = deque()
+        self.query_mismatches = 0
+        self.actions_sent = 0
+
+    def load_queries(self, queries: Iterable) -> None:
+        """Queue the recorded (request, response) pairs of the next step."""
+        self._queries.clear()
+        self._queries.extend(queries)
+        self.query_mismatches = 0
+        self.actions_sent = 0
+
+    async def _execute(self, **kwargs) -> sc_pb.Response:
+        if 'query' in kwargs:
+            if not self._queries:
+                raise ReplayDivergenceError("Bot made more queries than were recorded for this step")
+            # Concurrent managers record their queries in completion order: match by request first
+            sent = kwargs['query'].SerializeToString()
+            for index, (request, response) in enumerate(self._queries):
+                if request == sent:
+                    del self._queries[index]
+                    return sc_pb.Response.FromString(response)
+            self.query_mismatches += 1
+            _, response = self._queries.popleft()
+            return sc_pb.Response.FromString(response)
+        if 'action' in kwargs:
+            self.actions_sent += len(kwargs['action'].actions)
+        return sc_pb.Response()
+
+
+class ReplayDriver:
+    """Replays a recording into a fresh bot instance."""
+
+    def __init__(self, path: Union[str, Path], bot_factory: Optional[Callable] = None):
+        """Initialize the driver.
+
+        Args:
+            path: Recording directory written by ObservationRecorder
+            bot_factory: Creates the bot to replay into (default: CompetitiveBot)
+        """
+        self.path = Path(path)
+        self.header = load_header(self.path)
+        if bot_factory is None:
+            from bot.bot import CompetitiveBot
+            bot_factory = CompetitiveBot
+        self.bot_factory = bot_factory
+        self.bot = None
+        self.profiles: Dict[int, pstats.Stats] = {}
+
+    async def replay(self, stop: Optional[int] = None, profile: Iterable[int] = ()) -> List[ReplayStep]:
+        """Replay the recording from the start.
+
+        Args:
+            stop: Last iteration to replay (default: the whole recording)
+            profile: Iterations to run under cProfile (results in self.profiles)
+
+        Returns:
+            Timing of every replayed step
+        """
+        profile = set(profile)
+        header = self.header
+        client = ReplayClient(header['game_step'])
+        proto_game_info = sc_pb.Response.FromString(header['game_info'])
+        game_data = sc_pb.Response.FromString(header['game_data'])
+
+        bot = self.bot = self.bot_factory()
+        bot._initialize_variables()
+        bot._prepare_start(client, header['player_id'], GameInfo(proto_game_info.game_info),
+                           GameData(game_data.data), realtime=False, base_build=header['base_build'])
+
+        steps = []
+        for record in iter_steps(self.path):
+            iteration = record['iteration']
+            if stop is not None and iteration > stop:
+                break
+            if record['pathing_grid'] is not None:
+                proto_game_info.game_info.start_raw.pathing_grid.data = record['pathing_grid']
+            observation = sc_pb.ResponseObservation.FromString(record['observation'])
+            random.setstate(record['random_state'])
+            client.load_queries(record['queries'])
+            bot._prepare_step(GameState(observation), proto_game_info)
+
+            if iteration == START_ITERATION:
+                bot._prepare_first_step()
+                await bot.on_start()
+                continue
+
+            await bot.issue_events()
+            profiler = cProfile.Profile() if iteration in profile else None
+            start = time.perf_counter()
+            if profiler:
+                profiler.enable()
+            await bot.on_step(iteration)
+            if profiler:
+                profiler.disable()
+                self.profiles[iteration] = pstats.Stats(profiler)
+            duration = time.perf_counter() - start
+            await bot._after_step()
+
+            steps.append(ReplayStep(iteration, bot.state.game_loop, duration,
+                                    client.actions_sent, client.query_mismatches))
+        return steps
+
+    def run(self, stop: Optional[int] = None, profile: Iterable[int] = ()) -> List[ReplayStep]:
+        """Synchronous wrapper around replay()."""
+        return asyncio.run(self.replay(stop=stop, profile=profile))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Replay a B0B observation recording into the managers")
+    parser.add_argument("recording", help="Recording directory")
+    parser.add_argument("--stop", type=int, default=None, help="Last iteration to replay")
+    parser.add_argument("--slowest", type=int, default=10, help="Print the N slowest steps")
+    parser.add_argument("--profile", type=int, nargs="*", default=[], help="Iterations to profile")
+    parser.add_argument("--top", type=int, default=25, help="Functions to print per profile")
+    args = parser.parse_args(argv)
+
+    driver = ReplayDriver(args.recording)
+    steps = driver.run(stop=args.stop, profile=args.profile)
+    if not steps:
+        print("[Replay] Recording has no steps")
+        return 1
+
+    total = sum(step.duration for step in steps)
+    mismatches = sum(step.query_mismatches for step in steps)
+    print(f"[Replay] {len(steps)} steps, mean {1000 * total / len(steps):.3f}ms, "
+          f"{mismatches} query mismatches")
+    for step in sorted(steps, key=lambda step: step.duration, reverse=True)[:args.slowest]:
+        print(f"[Replay] iteration={step.iteration:<6} loop={step.game_loop:<6} "
+              f"{1000 * step.duration:.3f}ms actions={step.actions}")
+
+    for iteration, stats in sorted(driver.profiles.items()):
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats("cumulative").print_stats(args.top)
+        print(f"\n=== Profile of iteration {iteration} ===\n{stream.getvalue()}")
+    return 0
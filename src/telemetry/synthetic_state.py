@@ -0,0 +1,314 @@
+"""
+Synthetic game state for running the bot without StarCraft II.
+
+Builds the protos a game would send (game info, game data, one
+observation) for a small, fixed, mid-early game position per race: a
+main with a mining worker line and a few structures, a free natural, an
+enemy main and a handful of enemy units near the natural. A stand-in
+client answers queries generically (every placement succeeds, pathing is
+straight-line) and swallows actions.
+
+The state is the same every run, so measurements taken on it (allocation
+budgets, step times) can be compared across commits.
+
+USAGE:
+```python
+from sc2.data import Race
+from telemetry.synthetic_state import SyntheticGame
+
+game = SyntheticGame(Race.Terran)
+bot = await game.start()        # on_start has run
+for _ in range(20):
+    await game.step()           # one on_step on the same observation
+```
+"""
+
+import asyncio
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+
+from s2clientprotocol import common_pb2 as common_pb
+from s2clientprotocol import raw_pb2 as raw_pb
+from s2clientprotocol import sc2api_pb2 as sc_pb
+from sc2.bot_ai import BotAI
+from sc2.data import Attribute, Race
+from sc2.dicts.unit_research_abilities import RESEARCH_INFO
+from sc2.dicts.unit_train_build_abilities import TRAIN_INFO
+from sc2.game_data import GameData
+from sc2.game_info import GameInfo
+from sc2.game_state import GameState
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId as U
+from sc2.ids.upgrade_id import UpgradeId
+
+from telemetry.replay_driver import ReplayClient
+
+MAP_SIZE = 96
+PLAYER_ID = 1
+GAME_LOOP = 22 * 60 * 4  # Four minutes in
+MAIN = (20.5, 20.5)  # Townhall centers
+NATURAL = (20.5, 52.5)
+ENEMY_MAIN = (75.5, 75.5)
+
+# unit type -> (minerals, vespene, food required, food provided, build time, footprint radius or 0 for units)
+UNIT_DATA: Dict[U, Tuple[int, int, float, float, float, float]] = {
+    U.COMMANDCENTER: (400, 0, 0, 15, 1590, 2.5), U.ORBITALCOMMAND: (550, 0, 0, 15, 560, 2.5),
+    U.SUPPLYDEPOT: (100, 0, 0, 8, 470, 1), U.SUPPLYDEPOTLOWERED: (100, 0, 0, 8, 470, 1),
+    U.BARRACKS: (150, 0, 0, 0, 1030, 1.5), U.FACTORY: (150, 100, 0, 0, 1000, 1.5),
+    U.STARPORT: (150, 100, 0, 0, 800, 1.5), U.REFINERY: (75, 0, 0, 0, 480, 1.5),
+    U.ENGINEERINGBAY: (125, 0, 0, 0, 560, 1.5), U.BUNKER: (100, 0, 0, 0, 650, 1.5),
+    U.BARRACKSTECHLAB: (50, 25, 0, 0, 400, 1), U.BARRACKSREACTOR: (50, 50, 0, 0, 800, 1),
+    U.SCV: (50, 0, 1, 0, 272, 0), U.MARINE: (50, 0, 1, 0, 400, 0), U.MARAUDER: (100, 25, 2, 0, 480, 0),
+    U.MEDIVAC: (100, 100, 2, 0, 672, 0), U.MULE: (0, 0, 0, 0, 0, 0),
+    U.NEXUS: (400, 0, 0, 15, 1590, 2.5), U.PYLON: (100, 0, 0, 8, 400, 1),
+    U.GATEWAY: (150, 0, 0, 0, 1040, 1.5), U.WARPGATE: (150, 0, 0, 0, 160, 1.5),
+    U.ASSIMILATOR: (75, 0, 0, 0, 480, 1.5), U.CYBERNETICSCORE: (150, 0, 0, 0, 800, 1.5),
+    U.FORGE: (150, 0, 0, 0, 720, 1.5), U.STARGATE: (150, 150, 0, 0, 960, 1.5),
+    U.PROBE: (50, 0, 1, 0, 272, 0), U.ZEALOT: (100, 0, 2, 0, 608, 0), U.STALKER: (125, 50, 2, 0, 672, 0),
+    U.ADEPT: (100, 25, 2, 0, 608, 0), U.VOIDRAY: (250, 150, 4, 0, 832, 0),
+    U.HATCHERY: (300, 0, 0, 6, 1590, 2.5), U.LAIR: (450, 100, 0, 6, 1270, 2.5),
+    U.EXTRACTOR: (25, 0, 0, 0, 480, 1.5), U.SPAWNINGPOOL: (200, 0, 0, 0, 730, 1.5),
+    U.ROACHWARREN: (150, 0, 0, 0, 880, 1.5), U.EVOLUTIONCHAMBER: (75, 0, 0, 0, 560, 1.5),
+    U.DRONE: (50, 0, 1, 0, 272, 0), U.OVERLORD: (100, 0, 0, 8, 400, 0), U.LARVA: (0, 0, 0, 0, 0, 0),
+    U.QUEEN: (150, 0, 2, 0, 800, 0), U.ZERGLING: (25, 0, 0.5, 0, 384, 0), U.ROACH: (75, 25, 2, 0, 432, 0),
+    U.EGG: (0, 0, 0, 0, 0, 0), U.CREEPTUMORBURROWED: (0, 0, 0, 0, 0, 0.5),
+}
+STRUCTURE_RADII = {2.5: 2.75, 1.5: 1.8125, 1: 1.125, 0.5: 0.5}  # footprint radius -> unit radius
+RACE_OF = {
+    Race.Terran: (U.COMMANDCENTER, U.SCV, U.SUPPLYDEPOT, U.BARRACKS, U.REFINERY, U.MARINE),
+    Race.Protoss: (U.NEXUS, U.PROBE, U.PYLON, U.GATEWAY, U.ASSIMILATOR, U.ZEALOT),
+    Race.Zerg: (U.HATCHERY, U.DRONE, U.OVERLORD, U.SPAWNINGPOOL, U.EXTRACTOR, U.ZERGLING),
+}
+
+
+def _creation_abilities() -> Dict[U, AbilityId]:
+    """unit type -> ability that makes it, from python-sc2's train/build tables."""
+    abilities = {}
+    for trained in TRAIN_INFO.values():
+        for unit_type, info in trained.items():
+            abilities.setdefault(unit_type, info['ability'])
+    return abilities
+
+
+def build_game_data() -> sc_pb.ResponseData:
+    """Unit, ability and upgrade data for every id python-sc2 knows, with rough costs."""
+    data = sc_pb.ResponseData()
+    creation = _creation_abilities()
+    footprints = {}
+    for unit_type in U:
+        if unit_type.value == 0:
+            continue
+        minerals, vespene, food, provided, build_time, footprint = UNIT_DATA.get(unit_type, (50, 0, 0, 0, 400, 0))
+        unit = data.units.add(
+            unit_id=unit_type.value, name=unit_type.name, available=True, mineral_cost=minerals,
+            vespene_cost=vespene, food_required=food, food_provided=provided, build_time=build_time,
+            has_minerals='MINERALFIELD' in unit_type.name, has_vespene='GEYSER' in unit_type.name,
+            sight_range=9, movement_speed=0 if footprint else 2.8,
+        )
+        if unit_type in creation:
+            unit.ability_id = creation[unit_type].value
+            footprints[creation[unit_type].value] = footprint
+        if footprint:
+            unit.attributes.append(Attribute.Structure.value)
+    for ability in AbilityId:
+        if ability.value == 0:
+            continue
+        data.abilities.add(ability_id=ability.value, link_name=ability.name, button_name=ability.name,
+                           available=True, footprint_radius=footprints.get(ability.value, 0))
+    research = {upgrade: info['ability'] for upgrades in RESEARCH_INFO.values() for upgrade, info in upgrades.items()}
+    for upgrade in UpgradeId:
+        if upgrade.value == 0:
+            continue
+        entry = data.upgrades.add(upgrade_id=upgrade.value, name=upgrade.name, mineral_cost=100,
+                                  vespene_cost=100, research_time=2000)
+        if upgrade in research:
+            entry.ability_id = research[upgrade].value
+    return data
+
+
+def _image(size: int, value: int, bits: bool) -> common_pb.ImageData:
+    if bits:
+        payload = bytes([0xFF if value else 0]) * (size * size // 8)
+    else:
+        payload = bytes([value]) * (size * size)
+    return common_pb.ImageData(bits_per_pixel=1 if bits else 8, size=common_pb.Size2DI(x=size, y=size), data=payload)
+
+
+def build_game_info(race: Race, enemy_race: Race = Race.Zerg) -> sc_pb.Response:
+    """A flat, fully pathable and placeable MAP_SIZE square map."""
+    response = sc_pb.Response()
+    info = response.game_info
+    info.map_name = "Synthetic"
+    info.player_info.add(player_id=PLAYER_ID, type=sc_pb.Participant, race_requested=race.value, race_actual=race.value)
+    info.player_info.add(player_id=2, type=sc_pb.Computer, race_requested=enemy_race.value,
+                         race_actual=enemy_race.value, difficulty=sc_pb.Easy)
+    start = info.start_raw
+    start.map_size.x = start.map_size.y = MAP_SIZE
+    start.pathing_grid.CopyFrom(_image(MAP_SIZE, 1, bits=True))
+    start.placement_grid.CopyFrom(_image(MAP_SIZE, 1, bits=True))
+    start.terrain_height.CopyFrom(_image(MAP_SIZE, 128, bits=False))
+    start.playable_area.p0.x = start.playable_area.p0.y = 0
+    start.playable_area.p1.x = start.playable_area.p1.y = MAP_SIZE
+    start.start_locations.add(x=ENEMY_MAIN[0], y=ENEMY_MAIN[1])
+    return response
+
+
+class _Units:
+    """Accumulates raw units with increasing tags."""
+
+    def __init__(self):
+        self.units: List[raw_pb.Unit] = []
+        self._tag = 1
+
+    def add(self, unit_type: U, position: Tuple[float, float], alliance: int = raw_pb.Self,
+            owner: int = PLAYER_ID, **fields) -> raw_pb.Unit:
+        footprint = UNIT_DATA.get(unit_type, (0,) * 6)[5]
+        unit = raw_pb.Unit(
+            display_type=raw_pb.Visible, alliance=alliance, tag=self._tag, unit_type=unit_type.value,
+            owner=owner, pos=common_pb.Point(x=position[0], y=position[1], z=10),
+            radius=STRUCTURE_RADII.get(footprint, 0.375), build_progress=fields.pop('build_progress', 1.0),
+            health=fields.pop('health', 100), health_max=100, is_on_screen=True, **fields,
+        )
+        self._tag += 1
+        self.units.append(unit)
+        return unit
+
+    def base_resources(self, center: Tuple[float, float]) -> Tuple[List[raw_pb.Unit], List[raw_pb.Unit]]:
+        """Eight mineral fields west of a townhall center and two geysers north and south."""
+        x, y = center
+        minerals = [
+            self.add(U.MINERALFIELD, (x - 7 - (i % 2), y - 3.5 + i), alliance=raw_pb.Neutral, owner=16,
+                     mineral_contents=1800 if i % 3 else 900)
+            for i in range(8)
+        ]
+        geysers = [
+            self.add(U.VESPENEGEYSER, (x + dx, y + dy), alliance=raw_pb.Neutral, owner=16, vespene_contents=2250)
+            for dx, dy in ((0.0, 7.0), (0.0, -7.0))
+        ]
+        return minerals, geysers
+
+
+def build_observation(race: Race) -> sc_pb.ResponseObservation:
+    """Our main with workers and a few structures, a free natural and enemies near it."""
+    townhall_type, worker_type, supply_type, production_type, gas_type, army_type = RACE_OF[race]
+    units = _Units()
+    minerals, geysers = units.base_resources(MAIN)
+    units.base_resources(NATURAL)
+    units.base_resources(ENEMY_MAIN)
+
+    townhall = units.add(townhall_type, MAIN, assigned_harvesters=14, ideal_harvesters=16, energy=50,
+                         energy_max=200)
+    units.add(gas_type, (geysers[0].pos.x, geysers[0].pos.y), vespene_contents=2250, assigned_harvesters=2,
+              ideal_harvesters=3)
+    for i in range(16):
+        angle = i * math.pi / 8
+        worker = units.add(worker_type, (MAIN[0] - 4 + math.cos(angle), MAIN[1] + 2 * math.sin(angle)))
+        if i < 12:
+            worker.orders.add(ability_id=AbilityId.HARVEST_GATHER.value, target_unit_tag=minerals[i % 8].tag)
+    for i in range(2):
+        units.add(supply_type, (MAIN[0] + 4 + 2 * i, MAIN[1] + 5))
+    units.add(production_type, (MAIN[0] + 6.5, MAIN[1] - 0.5))
+    units.add(production_type, (MAIN[0] + 6.5, MAIN[1] - 4.5), build_progress=0.5)
+    for i in range(8):
+        units.add(army_type, (MAIN[0] + 8 + i % 4, MAIN[1] + 8 + i // 4))
+    if race == Race.Zerg:
+        for i in range(3):
+            units.add(U.LARVA, (MAIN[0] + i, MAIN[1] - 3))
+        units.add(U.QUEEN, (MAIN[0] + 3, MAIN[1] + 3), energy=25, energy_max=200)
+    for i in range(4):
+        units.add(U.ZERGLING, (NATURAL[0] + 6 + i, NATURAL[1]), alliance=raw_pb.Enemy, owner=2)
+
+    observation = sc_pb.ResponseObservation()
+    obs = observation.observation
+    obs.game_loop = GAME_LOOP
+    obs.player_common.player_id = PLAYER_ID
+    obs.player_common.minerals = 450
+    obs.player_common.vespene = 150
+    obs.player_common.food_cap = 31
+    obs.player_common.food_used = 24
+    obs.player_common.food_workers = 16
+    obs.player_common.food_army = 8
+    obs.player_common.army_count = 8
+    obs.player_common.larva_count = 3 if race == Race.Zerg else 0
+    obs.raw_data.units.extend(units.units)
+    obs.raw_data.map_state.visibility.CopyFrom(_image(MAP_SIZE, 2, bits=False))  # Everything visible
+    obs.raw_data.map_state.creep.CopyFrom(_image(MAP_SIZE, 1 if race == Race.Zerg else 0, bits=True))
+    obs.raw_data.player.camera.x, obs.raw_data.player.camera.y = townhall.pos.x, townhall.pos.y
+    return observation
+
+
+class SyntheticClient(ReplayClient):
+    """Answers queries without a game: placements succeed, pathing is straight-line."""
+
+    def __init__(self, query_latency: float = 0.0):
+        """Initialize the client.
+
+        Args:
+            query_latency: Seconds each query takes, like a round trip to the game
+        """
+        super().__init__()
+        self.query_latency = query_latency
+
+    async def _execute(self, **kwargs) -> sc_pb.Response:
+        if 'query' not in kwargs:
+            return await super()._execute(**kwargs)
+        if self.query_latency:
+            await asyncio.sleep(self.query_latency)
+        request = kwargs['query']
+        response = sc_pb.Response()
+        for pathing in request.pathing:
+            start = pathing.start_pos if pathing.HasField('start_pos') else common_pb.Point2D(x=MAIN[0], y=MAIN[1])
+            distance = math.hypot(pathing.end_pos.x - start.x, pathing.end_pos.y - start.y)
+            response.query.pathing.add(distance=distance)
+        for _ in request.placements:
+            response.query.placements.add(result=1)  # ActionResult.Success
+        for ability in request.abilities:
+            response.query.abilities.add(unit_tag=ability.unit_tag)
+        return response
+
+
+class SyntheticGame:
+    """Runs a bot on the synthetic state of one race."""
+
+    def __init__(self, race: Race = Race.Terran, bot_factory: Optional[Callable] = None,
+                 query_latency: float = 0.0):
+        """Initialize the game.
+
+        Args:
+            race: Race the bot plays
+            bot_factory: Creates the bot (default: CompetitiveBot)
+            query_latency: Seconds each query takes (0 answers at once)
+        """
+        if bot_factory is None:
+            from bot.bot import CompetitiveBot
+            bot_factory = CompetitiveBot
+        self.race = race
+        self.bot_factory = bot_factory
+        self.query_latency = query_latency
+        self.bot = None
+        self.iteration = 0
+        self._game_info = build_game_info(race)
+        self._game_data = GameData(build_game_data())
+        self._observation = build_observation(race)
+
+    def _prepare_step(self) -> None:
+        self.bot._prepare_step(GameState(self._observation), self._game_info)
+
+    async def start(self):
+        """Create the bot, prepare the first step and run on_start."""
+        bot = self.bot = self.bot_factory()
+        bot._initialize_variables()
+        bot._prepare_start(SyntheticClient(self.query_latency), PLAYER_ID, GameInfo(self._game_info.game_info), self._game_data)
+        self._prepare_step()
+        # python-sc2's own first step analysis: the map cache stays out of synthetic runs
+        BotAI._prepare_first_step(bot)
+        await bot.on_start()
+        return bot
+
+    async def step(self) -> None:
+        """Run one on_step on a fresh copy of the synthetic observation."""
+        self._prepare_step()
+        await self.bot.issue_events()
+        await self.bot.on_step(self.iteration)
+        await self.bot._after_step()
+        self.iteration += 1
@@ -0,0 +1,199 @@
+"""
+Telemetry Recorder for B0B - The Builder Bot
+
+Records one fixed-width record per game step into a preallocated NumPy buffer
+and flushes it in chunks to a memory-mapped binary file. The per-manager
+columns are kept in fixed arrays that the HeadManager writes as it measures
+them (set_manager); writing a record is then one struct.pack_into of the
+base fields and two byte copies, so telemetry can stay enabled in
+production games.
+
+FILE FORMAT:
+- A HEADER_SIZE byte header: magic, version, record count, and a JSON
+  description of the manager columns
+- Followed by packed little-endian records (see telemetry_dtype)
+
+USAGE:
+```python
+from telemetry.telemetry_recorder import load_telemetry
+
+data, managers = load_telemetry("telemetry/game.b0bt")
+print(data['minerals'][-1], data['step_time'][:, managers.index('economy')].max())
+```
+"""
+
+import json
+import struct
+from array import array
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+MAGIC = b"B0BTELEM"
+VERSION = 1
+HEADER_SIZE = 4096
+_HEADER = struct.Struct("<8sIIQI")  # magic, version, header size, record count, json length
+
+# Fixed fields of every record, followed by per-manager step time and action count
+BASE_FIELDS = [
+    ('time', '<f4', 'f'),
+    ('game_loop', '<u4', 'I'),
+    ('minerals', '<i4', 'i'),
+    ('vespene', '<i4', 'i'),
+    ('mineral_income', '<f4', 'f'),
+    ('gas_income', '<f4', 'f'),
+    ('supply_used', '<f4', 'f'),
+    ('supply_cap', '<f4', 'f'),
+    ('workers', '<u2', 'H'),
+    ('army_value', '<f4', 'f'),
+]
+
+
+def telemetry_dtype(manager_count: int) -> np.dtype:
+    """Get the packed record dtype for the given number of manager columns."""
+    fields = [(name, dtype) for name, dtype, _ in BASE_FIELDS]
+    fields.append(('step_time', '<f4', (manager_count,)))
+    fields.append(('actions', '<u2', (manager_count,)))
+    return np.dtype(fields)
+
+
+def _record_struct() -> struct.Struct:
+    return struct.Struct("<" + "".join(code for _, _, code in BASE_FIELDS))
+
+
+class TelemetryRecorder:
+    """Appends per-step records to a chunked, memory-mapped telemetry file."""
+
+    def __init__(self, path: Union[str, Path], manager_names: Sequence[str], chunk_size: int = 4096):
+        """Create the telemetry file and preallocate the write buffer.
+
+        Args:
+            path: Output file path
+            manager_names: Names of the step time / action count columns
+            chunk_size: Records buffered in memory between flushes
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.manager_names = list(manager_names)
+        self.chunk_size = chunk_size
+        self.dtype = telemetry_dtype(len(self.manager_names))
+        self._struct = _record_struct()
+        if self._struct.size != self.dtype.fields['step_time'][1]:
+            raise ValueError("Telemetry struct layout does not match its dtype")
+
+        # Manager columns of the next record; a manager that did not step keeps its last values
+        self.columns = {name: index for index, name in enumerate(self.manager_names)}
+        self.step_times = array('f', bytes(4 * len(self.manager_names)))
+        self.actions = array('H', bytes(2 * len(self.manager_names)))
+        self._step_times = memoryview(self.step_times).cast('B')
+        self._actions = memoryview(self.actions).cast('B')
+        self._times_start = self._struct.size
+        self._actions_start = self.dtype.fields['actions'][1]
+
+        self.buffer = np.zeros(chunk_size, dtype=self.dtype)
+        self._view = memoryview(self.buffer).cast('B')
+        self._pack = self._struct.pack_into
+        self._itemsize = self.dtype.itemsize
+        self._offset = 0  # Byte offset of the next record in the buffer
+        self._end = chunk_size * self._itemsize
+        self.count = 0  # Records flushed to disk
+        self._map = None
+        self._capacity = 0
+        self._closed = False
+
+        meta = json.dumps({'managers': self.manager_names}).encode()
+        if _HEADER.size + len(meta) > HEADER_SIZE:
+            raise ValueError("Too many telemetry columns for the header")
+        with open(self.path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, HEADER_SIZE, 0, len(meta)) + meta)
+            f.truncate(HEADER_SIZE)
+
+    def set_manager(self, name: str, step_time: Optional[float] = None, actions: Optional[int] = None) -> None:
+        """Set a manager's columns for the next record (names without a column are ignored)."""
+        index = self.columns.get(name)
+        if index is None:
+            return
+        if step_time is not None:
+            self.step_times[index] = step_time
+        if actions is not None:
+            self.actions[index] = actions
+
+    def record(self, time, game_loop, minerals, vespene, mineral_income, gas_income,
+               supply_used, supply_cap, workers, army_value) -> None:
+        """Append one step record with the current manager columns; flushes automatically when the buffer is full."""
+        offset = self._offset
+        view = self._view
+        self._pack(view, offset, time, game_loop, minerals, vespene,
+                   mineral_income, gas_income, supply_used, supply_cap, workers, army_value)
+        actions_start = offset + self._actions_start
+        end = offset + self._itemsize
+        view[offset + self._times_start:actions_start] = self._step_times
+        view[actions_start:end] = self._actions
+        self._offset = end
+        if end == self._end:
+            self.flush()
+
+    @property
+    def pending(self) -> int:
+        """Records buffered in memory and not yet flushed."""
+        return self._offset // self._itemsize
+
+    def flush(self) -> None:
+        """Copy buffered records into the memory-mapped file and update the header."""
+        pending = self.pending
+        if not pending or self._closed:
+            return
+        needed = self.count + pending
+        if needed > self._capacity:
+            self._grow(max(needed, self._capacity * 2, self.chunk_size))
+        # Byte copy (a structured assignment copies field by field); the page cache keeps
+        # the mapped records if the process dies, close() syncs them to disk
+        self._map[self.count:needed].view(np.uint8)[:] = self.buffer[:pending].view(np.uint8)
+        self.count = needed
+        self._offset = 0
+        self._write_count()
+
+    def close(self) -> None:
+        """Flush remaining records and trim the file to the recorded length."""
+        if self._closed:
+            return
+        self.flush()
+        if self._map is not None:
+            self._map.flush()
+        self._map = None
+        with open(self.path, "r+b") as f:
+            f.truncate(HEADER_SIZE + self.count * self._itemsize)
+        self._closed = True
+
+    def _grow(self, capacity: int) -> None:
+        self._map = None
+        with open(self.path, "r+b") as f:
+            f.truncate(HEADER_SIZE + capacity * self._itemsize)
+        self._map = np.memmap(self.path, dtype=self.dtype, mode="r+", offset=HEADER_SIZE, shape=(capacity,))
+        self._capacity = capacity
+
+    def _write_count(self) -> None:
+        with open(self.path, "r+b") as f:
+            f.seek(16)  # Record count, after magic, version and header size
+            f.write(struct.pack("<Q", self.count))
+
+
+def load_telemetry(path: Union[str, Path]) -> Tuple[np.memmap, List[str]]:
+    """Open a telemetry file zero-copy.
+
+    Returns:
+        Tuple of the read-only record array (memory-mapped) and the manager column names
+    """
+    with open(path, "rb") as f:
+        magic, version, header_size, count, meta_length = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a telemetry file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported telemetry version {version}")
+        managers = json.loads(f.read(meta_length))['managers']
+    dtype = telemetry_dtype(len(managers))
+    if count == 0:
+        return np.zeros(0, dtype=dtype), managers
+    data = np.memmap(path, dtype=dtype, mode="r", offset=header_size, shape=(count,))
+    return data, managers
@@ -0,0 +1,6 @@
+"""Test setup: the bot's top-level packages live in src/ (see bot/bootstrap.py)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,31 @@
+"""Per-step allocation budgets of every manager on the synthetic state (see telemetry/allocation_profiler.py).
+
+Budgets are about 1.5x the peaks measured when they were set, so a manager
+that starts building per-step lists or dicts fails here before it shows up
+as collector stalls in games. Raise a budget deliberately, with the new
+measurement, when a manager needs more.
+"""
+
+import contextlib
+import io
+
+import pytest
+from sc2.data import Race
+
+from telemetry.allocation_profiler import assert_allocation_budget
+
+KIB = 1024
+STEPS = 20
+
+# Peak bytes allocated by one step, per manager ('state' is the HeadManager's game state update)
+BUDGETS = {
+    Race.Terran: {'state': 3 * KIB, 'bases': 6 * KIB, 'economy': 12 * KIB, 'military': 16 * KIB},
+    Race.Protoss: {'state': 3 * KIB, 'bases': 6 * KIB, 'economy': 12 * KIB, 'military': 6 * KIB},
+    Race.Zerg: {'state': 3 * KIB, 'bases': 6 * KIB, 'economy': 13 * KIB, 'military': 6 * KIB, 'larva': 2 * KIB},
+}
+
+
+@pytest.mark.parametrize('race', list(BUDGETS), ids=lambda race: race.name)
+def test_managers_stay_within_allocation_budget(race):
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert_allocation_budget(BUDGETS[race], race=race, steps=STEPS, statistic='peak_allocated')
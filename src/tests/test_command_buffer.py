@@ -0,0 +1,94 @@
+"""Concurrent manager stages must send what a sequential run sends (see managers/command_buffer.py)."""
+
+import asyncio
+import contextlib
+import io
+from collections import Counter
+
+import pytest
+from sc2.data import Race, Result
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId
+
+from telemetry.synthetic_state import SyntheticGame
+
+STEPS = 12
+# Commands that never replace one another in the game and must survive the buffer
+PRODUCTION = ('TRAIN', 'BUILD_REACTOR', 'BUILD_TECHLAB', 'EFFECT_', 'RESEARCH', 'RALLY')
+
+
+async def _sent_abilities(race: Race, concurrent: bool) -> Counter:
+    """Abilities sent to the game over STEPS synthetic steps."""
+    game = SyntheticGame(race)
+    bot = await game.start()
+    bot.head.concurrent_managers = concurrent
+    sent = Counter()
+    execute = bot.client._execute
+
+    async def recording_execute(**kwargs):
+        if 'action' in kwargs:
+            for action in kwargs['action'].actions:
+                command = action.action_raw.unit_command
+                if command.ability_id:
+                    sent[AbilityId(command.ability_id).name] += max(len(command.unit_tags), 1)
+        return await execute(**kwargs)
+
+    bot.client._execute = recording_execute
+    for _ in range(STEPS):
+        await game.step()
+    await bot.on_end(Result.Tie)
+    return sent
+
+
+def _run(coroutine):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(coroutine)
+
+
+@pytest.mark.parametrize('race', [Race.Terran, Race.Protoss, Race.Zerg])
+def test_concurrent_stage_keeps_production_commands(race):
+    sequential = _run(_sent_abilities(race, concurrent=False))
+    concurrent = _run(_sent_abilities(race, concurrent=True))
+    production = {name for name in sequential | concurrent if any(marker in name for marker in PRODUCTION)}
+    assert production
+    assert {name: concurrent[name] for name in production} == {name: sequential[name] for name in production}
+    if race == Race.Terran:
+        assert concurrent['BUILD_REACTOR_BARRACKS'] > 0
+
+
+async def _stage(orders):
+    """Commit one stage where orders is a list of (manager, issue) in issue order; returns the bot's actions."""
+    game = SyntheticGame(Race.Terran)
+    bot = await game.start()
+    game._prepare_step()
+    buffer = bot.head.command_buffer
+    start = len(bot.actions)  # on_start's own commands are still waiting to be sent
+    buffer.begin(['economy', 'military'])
+    for manager, issue in orders:
+        with buffer.manager(manager):
+            issue(bot)
+    buffer.commit()
+    actions = [(action.unit.type_id, action.ability) for action in bot.actions[start:]]
+    await bot.on_end(Result.Tie)
+    return actions
+
+
+def _worker(bot):
+    return bot.workers.sorted(lambda unit: unit.tag).first
+
+
+def test_later_manager_replaces_earlier_manager_order():
+    actions = _run(_stage([
+        ('military', lambda bot: _worker(bot).move(bot.game_info.map_center)),
+        ('economy', lambda bot: _worker(bot).gather(bot.mineral_field.closest_to(_worker(bot)))),
+    ]))
+    # Committed in manager order: economy's gather first, then military's move replaces it
+    assert actions == [(UnitTypeId.SCV, AbilityId.MOVE_MOVE)]
+
+
+def test_same_manager_orders_are_all_kept():
+    actions = _run(_stage([
+        ('economy', lambda bot: _worker(bot).move(bot.game_info.map_center)),
+        ('economy', lambda bot: _worker(bot).gather(bot.mineral_field.closest_to(_worker(bot)))),
+    ]))
+    assert actions == [(UnitTypeId.SCV, AbilityId.MOVE_MOVE), (UnitTypeId.SCV, AbilityId.HARVEST_GATHER)]
@@ -0,0 +1,55 @@
+"""A single build order simulates exactly like a batch (see simulation/economy_simulator.py)."""
+
+import numpy as np
+import pytest
+from sc2.data import Race
+from sc2.ids.unit_typeid import UnitTypeId
+
+from simulation.economy_simulator import generate_variants, simulate_batch, simulate_build_order
+
+BUILD_ORDERS = {
+    Race.Terran: [
+        (UnitTypeId.SUPPLYDEPOT, 14, "Depot"),
+        (UnitTypeId.BARRACKS, 16, "Barracks"),
+        (UnitTypeId.REFINERY, 16, "Refinery"),
+        (UnitTypeId.ORBITALCOMMAND, 19, "Orbital"),
+        (UnitTypeId.BARRACKSREACTOR, 19, "Reactor"),
+        (UnitTypeId.MARINE, 20, "Marine"),
+        (UnitTypeId.MARINE, 20, "Marine"),
+    ],
+    Race.Protoss: [
+        (UnitTypeId.PYLON, 14, "Pylon"),
+        (UnitTypeId.GATEWAY, 15, "Gateway"),
+        (UnitTypeId.ASSIMILATOR, 16, "Assimilator"),
+        (UnitTypeId.CYBERNETICSCORE, 17, "Cyber Core"),
+        (UnitTypeId.STALKER, 20, "Stalker"),
+    ],
+    Race.Zerg: [
+        (UnitTypeId.SPAWNINGPOOL, 17, "Pool"),
+        (UnitTypeId.QUEEN, 18, "Queen"),
+        (UnitTypeId.ZERGLING, 20, "Zerglings"),
+        (UnitTypeId.ROACHWARREN, 20, "Roach Warren"),
+        (UnitTypeId.ROACH, 22, "Roach"),
+    ],
+}
+
+
+@pytest.mark.parametrize("race", list(BUILD_ORDERS))
+def test_single_build_order_matches_batch(race):
+    variants = generate_variants(BUILD_ORDERS[race], 12, seed=1, max_shift=4, swap_probability=0.5)
+    batch = simulate_batch(variants, race=race)
+    for index, variant in enumerate(variants):
+        single = simulate_build_order(variant, race=race)
+        expected = batch.result(index)
+        assert single.start_times == expected.start_times
+        assert single.completion_times == expected.completion_times
+        assert single.workers == expected.workers
+        assert single.minerals_collected == expected.minerals_collected
+        assert single.vespene_collected == expected.vespene_collected
+        assert single.supply_blocked_time == expected.supply_blocked_time
+        assert np.isclose(single.score, expected.score)
+
+
+def test_generate_variants_rejects_empty_count():
+    with pytest.raises(ValueError, match="at least 1"):
+        generate_variants(BUILD_ORDERS[Race.Terran], 0)
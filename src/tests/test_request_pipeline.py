@@ -0,0 +1,59 @@
+"""Concurrent requests share one websocket through the pipeline (see bot/request_pipeline.py)."""
+
+import asyncio
+
+import pytest
+from s2clientprotocol import sc2api_pb2 as sc_pb
+from sc2.protocol import Protocol
+
+from bot.request_pipeline import RequestPipeline
+
+
+class EchoSocket:
+    """Answers every request, in order, with an empty response carrying its id."""
+
+    def __init__(self):
+        self.responses = asyncio.Queue()
+
+    async def send_bytes(self, data: bytes) -> None:
+        request = sc_pb.Request()
+        request.ParseFromString(data)
+        await self.responses.put(sc_pb.Response(id=request.id).SerializeToString())
+
+    async def receive_bytes(self) -> bytes:
+        await asyncio.sleep(0.01)
+        return await self.responses.get()
+
+
+class FakeClient(Protocol):
+    def __init__(self):
+        self._ws = EchoSocket()
+
+
+def _ping() -> sc_pb.Request:
+    return sc_pb.Request(ping=sc_pb.RequestPing())
+
+
+def test_cancelled_requester_does_not_strand_the_others():
+    async def run():
+        pipeline = RequestPipeline(FakeClient())
+        pipeline.install()
+        first = asyncio.create_task(pipeline.request(_ping()))
+        others = [asyncio.create_task(pipeline.request(_ping())) for _ in range(3)]
+        await asyncio.sleep(0)
+        first.cancel()
+        responses = await asyncio.wait_for(asyncio.gather(*others), timeout=1.0)
+        pipeline.uninstall()
+        return pipeline, responses
+
+    pipeline, responses = asyncio.run(run())
+    assert len(responses) == 3
+    assert pipeline.max_in_flight == 4
+
+
+def test_install_requires_the_replaced_round_trip():
+    class Client:
+        _ws = None
+
+    with pytest.raises(RuntimeError):
+        RequestPipeline(Client()).install()
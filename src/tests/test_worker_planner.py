@@ -0,0 +1,41 @@
+"""Workers in production count towards the worker target (see managers/worker_planner.py)."""
+
+from types import SimpleNamespace
+
+import pytest
+from sc2.data import Race
+from sc2.ids.unit_typeid import UnitTypeId
+
+from managers.worker_planner import WorkerPlanner
+
+TARGET = 16
+
+
+def _planner(race: Race, workers: int, pending: dict) -> WorkerPlanner:
+    """A planner with a fixed target over a stub bot with workers alive and pending per type."""
+    ai = SimpleNamespace(
+        race=race,
+        supply_workers=workers,
+        already_pending=lambda unit_type: pending.get(unit_type, 0),
+        state=SimpleNamespace(game_loop=1),
+        time=0.0,
+    )
+    planner = WorkerPlanner(ai, distributor=None)
+    planner.base_targets = {1: TARGET}
+    planner._last_refresh = ai.time  # Keep the fixed target
+    return planner
+
+
+def _claims(planner: WorkerPlanner, tries: int = 10) -> int:
+    return sum(planner.claim() for _ in range(tries))
+
+
+@pytest.mark.parametrize('race, worker, pending', [
+    (Race.Zerg, UnitTypeId.DRONE, 4),  # Drones in eggs
+    (Race.Terran, UnitTypeId.SCV, 2),  # SCVs queued at two command centers
+    (Race.Protoss, UnitTypeId.PROBE, 1),
+])
+def test_workers_in_production_reach_the_target(race, worker, pending):
+    assert _claims(_planner(race, TARGET - pending, {worker: pending})) == 0
+    assert _claims(_planner(race, TARGET - pending - 1, {worker: pending})) == 1
+    assert _claims(_planner(race, TARGET - pending, {})) == pending